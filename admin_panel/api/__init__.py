@@ -0,0 +1,7 @@
+__all__ = [
+    "chats_router",
+    "usage_router",
+]
+
+from .chats import router as chats_router
+from .usage import router as usage_router
@@ -0,0 +1,42 @@
+from typing import Annotated
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPBasic, HTTPBasicCredentials
+
+from database.dtos.user import UserCredentials
+from di_config import get_injector
+from services.authentication import AuthenticationError, AuthenticationService
+from services.chat_admin import ChatAdminService
+from services.usage_service import UsageService
+
+__all__ = [
+    "get_chat_admin_service",
+    "get_usage_service",
+    "require_superuser",
+]
+
+_basic_auth = HTTPBasic()
+
+
+async def require_superuser(credentials: Annotated[HTTPBasicCredentials, Depends(_basic_auth)]) -> UserCredentials:
+    """Authenticate the request with HTTP Basic credentials and require a superuser account."""
+    authentication = get_injector().get(AuthenticationService)
+    try:
+        user = await authentication.authenticate(credentials.username, credentials.password)
+    except AuthenticationError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(exc),
+            headers={"WWW-Authenticate": "Basic"},
+        ) from exc
+    if not user.is_superuser:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Superuser access required.")
+    return user
+
+
+def get_chat_admin_service() -> ChatAdminService:
+    return get_injector().get(ChatAdminService)
+
+
+def get_usage_service() -> UsageService:
+    return get_injector().get(UsageService)
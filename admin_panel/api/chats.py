@@ -0,0 +1,58 @@
+"""Bulk chat administration endpoints."""
+
+from typing import Annotated
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import BaseModel, Field
+
+from errors import ConfigError
+from services.chat_admin import ChatAdminService
+
+from ._dependencies import get_chat_admin_service, require_superuser
+
+router = APIRouter(prefix="/api/chats", tags=["chats"], dependencies=[Depends(require_superuser)])
+
+ChatAdmin = Annotated[ChatAdminService, Depends(get_chat_admin_service)]
+
+_MAX_BULK_CHATS = 10_000
+
+
+class BulkChatsRequest(BaseModel):
+    chat_ids: list[int] = Field(min_length=1, max_length=_MAX_BULK_CHATS)
+
+
+class BulkAccessRequest(BulkChatsRequest):
+    allowed: bool = True
+
+
+class BulkSwitchModelRequest(BulkChatsRequest):
+    model_id: UUID
+
+
+class BulkUpdateResponse(BaseModel):
+    updated: int
+
+
+@router.post("/access")
+async def set_access(payload: BulkAccessRequest, service: ChatAdmin) -> BulkUpdateResponse:
+    """Approve (or revoke) access for the listed chats."""
+    updated = await service.set_allowed(payload.chat_ids, allowed=payload.allowed)
+    return BulkUpdateResponse(updated=updated)
+
+
+@router.post("/model")
+async def switch_model(payload: BulkSwitchModelRequest, service: ChatAdmin) -> BulkUpdateResponse:
+    """Switch the listed chats to another model."""
+    try:
+        updated = await service.switch_model(payload.chat_ids, payload.model_id)
+    except ConfigError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail=str(exc)) from exc
+    return BulkUpdateResponse(updated=updated)
+
+
+@router.post("/sampling/reset")
+async def reset_sampling(payload: BulkChatsRequest, service: ChatAdmin) -> BulkUpdateResponse:
+    """Clear sampling overrides for the listed chats."""
+    updated = await service.reset_sampling_params(payload.chat_ids)
+    return BulkUpdateResponse(updated=updated)
@@ -0,0 +1,50 @@
+"""AI usage and cost reporting endpoints."""
+
+from datetime import datetime, timedelta, timezone
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel
+
+from services.usage_service import UsageService
+
+from ._dependencies import get_usage_service, require_superuser
+
+router = APIRouter(prefix="/api/usage", tags=["usage"], dependencies=[Depends(require_superuser)])
+
+Usage = Annotated[UsageService, Depends(get_usage_service)]
+
+
+class ChatUsageResponse(BaseModel):
+    telegram_chat_id: int
+    requests: int
+    prompt_tokens: int
+    cached_prompt_tokens: int
+    completion_tokens: int
+    cost: float
+    average_latency_seconds: float
+    max_latency_seconds: float
+
+
+@router.get("/chats")
+async def top_chats(
+    service: Usage,
+    days: Annotated[int, Query(ge=1, le=366)] = 7,
+    limit: Annotated[int, Query(ge=1, le=1000)] = 50,
+) -> list[ChatUsageResponse]:
+    """List the chats driving AI cost over the last ``days`` UTC days, most expensive first."""
+    since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+    usage = await service.top_chats(since, limit)
+    return [
+        ChatUsageResponse(
+            telegram_chat_id=item.telegram_chat_id,
+            requests=item.requests,
+            prompt_tokens=item.prompt_tokens,
+            cached_prompt_tokens=item.cached_prompt_tokens,
+            completion_tokens=item.completion_tokens,
+            cost=item.cost,
+            average_latency_seconds=item.average_latency_seconds,
+            max_latency_seconds=item.max_latency_seconds,
+        )
+        for item in usage
+    ]
@@ -5,8 +5,11 @@ from fastapi import FastAPI
 from starlette.responses import RedirectResponse
 
 from .admin_models.user import UserAdmin  # noqa: F401
+from .api import chats_router, usage_router
 
 app = FastAPI()
+app.include_router(chats_router)
+app.include_router(usage_router)
 app.mount("/admin", admin_app)
 
 
@@ -1,56 +1,104 @@
+import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from enum import StrEnum
-from typing import TYPE_CHECKING, Any, ClassVar, Sequence
+from contextlib import AbstractAsyncContextManager, aclosing, nullcontext
+from typing import TYPE_CHECKING, Any, AsyncGenerator, AsyncIterator, ClassVar, Final, Hashable, Sequence
 
 from errors import ConfigError
+from logging_config.common import WithLogger
 from settings.ai_client.base_settings import GeneralAiSettings
 from utils.di import Registry
 
+from .batch import AiBatchJob, AiBatchRunner
+from .coalescer import RequestCoalescer
+from .completion_cache import CompletionCache
+from .limiter import AiRateLimiter, RateLimitTimeout
+from .messages import AiMessage as AiMessage
+from .messages import AiRole as AiRole
+from .messages import MessageChain as MessageChain
 from .model_params import BaseModelParams
+from .resilience import AiResilience, CircuitOpenError
+from .tokens import MessageBudgeter
+from .usage import AiUsage, UsageRecorder
 
 if TYPE_CHECKING:
     from database.models import ModelConfiguration
 
 
-class AiRole(StrEnum):
-    SYSTEM = "system"
-    USER = "user"
-    ASSISTANT = "assistant"
+class BaseAiClient[TSettings: GeneralAiSettings](WithLogger, ABC):
+    """
+    Base class for AI providers.
 
+    :meth:`answer` and :meth:`stream` are the public entry points; they serve repeated requests from the completion
+    cache, admit the remaining calls through the provider limiter, and then delegate to the provider-specific
+    :meth:`_answer` and :meth:`_stream` implementations. Concurrent identical calls share a single provider call (or a
+    single upstream stream) through the request coalescer. Provider calls run under the resilience policy (deadlines,
+    retries, circuit breaker). :meth:`generate` and :meth:`generate_stream` raise on failure, which lets callers such
+    as the router fail over; the public entry points turn errors into a user-facing reply instead, and neither caches
+    them. :meth:`submit_batch` runs non-interactive workloads as background calls.
+    """
 
-@dataclass(slots=True)
-class AiMessage:
-    role: AiRole
-    content: str
-    name: str | None = None
+    PROVIDER_NAME: ClassVar[str | None] = None
+    BUSY_REPLY: ClassVar[str] = "I am getting too many requests right now. Please try again in a minute."
+    UNAVAILABLE_REPLY: ClassVar[str] = "The AI provider is unavailable right now. Please try again later."
+    ERROR_REPLY: ClassVar[str] = "Something went wrong while generating a reply. Please try again later."
 
-    def as_payload(self) -> dict[str, Any]:
-        payload: dict[str, Any] = {
-            "role": self.role.value,
-            "content": self.content,
-        }
-        if self.name:
-            payload["name"] = self.name
-        return payload
+    _CHARS_PER_TOKEN: Final[int] = 4
+    _DEFAULT_COMPLETION_TOKENS: Final[int] = 1024
+    _PARAMS_CACHE_SIZE: Final[int] = 256
+    # Scalar configuration fields read by ``BaseModelParams.build``; together with the model name, system message and
+    # stop sequences they key the parameter cache.
+    _PARAM_FIELDS: Final[tuple[str, ...]] = (
+        "temperature",
+        "top_p",
+        "top_k",
+        "max_output_tokens",
+        "presence_penalty",
+        "frequency_penalty",
+        "response_format",
+    )
 
+    def __init__(
+        self,
+        settings: TSettings,
+        limiter: AiRateLimiter | None = None,
+        completion_cache: CompletionCache | None = None,
+        coalescer: RequestCoalescer | None = None,
+        resilience: AiResilience | None = None,
+        budgeter: MessageBudgeter | None = None,
+        usage_recorder: UsageRecorder | None = None,
+        batch_runner: AiBatchRunner | None = None,
+    ) -> None:
+        self._settings = settings
+        self._limiter = limiter
+        self._completion_cache = completion_cache
+        self._coalescer = coalescer
+        self._resilience = resilience
+        self._budgeter = budgeter
+        self._usage_recorder = usage_recorder
+        self._batch_runner = batch_runner
+        self._params_cache: dict[Hashable, tuple[BaseModelParams, dict[str, Any]]] = {}
 
-type MessageChain = Sequence[AiMessage]
+    def build_model_params(self, model_config: ModelConfiguration | None) -> BaseModelParams:
+        return self._resolve_params(model_config)[0]
 
+    def provider_kwargs(self, model_config: ModelConfiguration | None) -> dict[str, Any]:
+        """
+        Return the request parameters in the provider's own format.
 
-class BaseAiClient[TSettings: GeneralAiSettings](ABC):
-    PROVIDER_NAME: ClassVar[str | None] = None
+        Parameters are resolved once per distinct set of parameter values (resolved model name, system message and the
+        configuration's parameter fields) and shared by all configurations with the same values; an admin edit changes
+        the key, so it takes effect on the next call.
 
-    def __init__(self, settings: TSettings) -> None:
-        self._settings = settings
+        :param model_config: Model configuration of the chat, or ``None`` for the provider defaults.
+        :returns: A fresh copy of the cached keyword arguments that the caller may extend.
+        """
+        return dict(self._resolve_params(model_config)[1])
 
-    def build_model_params(self, model_config: ModelConfiguration | None) -> BaseModelParams:
-        return BaseModelParams.build(
-            model=self.resolve_model_name(model_config),
-            system_message=self.resolve_system_message(model_config),
-            settings=self._settings,
-            model_config=model_config,
-        )
+    def convert_params(self, params: BaseModelParams) -> dict[str, Any]:
+        """
+        Hook for providers to convert resolved parameters into the keyword arguments of their API.
+        """
+        return params.model_dump(exclude_none=True, exclude={"system_message"})
 
     def resolve_model_name(self, model_config: ModelConfiguration | None) -> str:
         if model_config is None or model_config.model is None or model_config.model.name is None:
@@ -68,8 +116,21 @@ class BaseAiClient[TSettings: GeneralAiSettings](ABC):
         return self._settings.system_message
 
     def build_messages(self, message_chain: MessageChain, model_config: ModelConfiguration | None) -> list[AiMessage]:
-        chain = list(message_chain)
-        return self.inject_system_messages(chain, model_config)
+        """
+        Build the messages sent to the provider: the chain with system messages injected, fitted to the token budget.
+
+        The layout is deterministic and prefix-cache friendly: static system text first, then the history in
+        chronological order, trimmed in whole blocks so that consecutive calls share the longest possible prefix.
+        """
+        messages = self.inject_system_messages(list(message_chain), model_config)
+        if self._budgeter is None:
+            return messages
+        return self._budgeter.fit(
+            messages,
+            provider_name=self.get_name(),
+            model=self.resolve_model_name(model_config),
+            max_output_tokens=self.resolve_max_output_tokens(model_config),
+        )
 
     def inject_system_messages(
         self,
@@ -91,7 +152,6 @@ class BaseAiClient[TSettings: GeneralAiSettings](ABC):
             return cls.PROVIDER_NAME.lower()
         return cls.__name__.removesuffix("AiClient").lower()
 
-    @abstractmethod
     async def answer(
         self,
         message_chain: MessageChain,
@@ -103,11 +163,302 @@ class BaseAiClient[TSettings: GeneralAiSettings](ABC):
         :param message_chain: Sequence of :class:`AiMessage` representing the conversation so far.
         :param model_configuration: Configuration for the model to use. If not specified, the default configuration
             will be used.
-        :returns: The assistant's reply text.
+        :returns: The assistant's reply text, or a user-facing error reply when the call failed.
+        """
+        try:
+            return await self.generate(message_chain, model_configuration)
+        except Exception as error:  # noqa: BLE001 - reply boundary, error_reply logs the failure with its traceback
+            return self.error_reply(error)
+
+    async def stream(
+        self,
+        message_chain: MessageChain,
+        model_configuration: ModelConfiguration | None = None,
+    ) -> AsyncIterator[str]:
+        """
+        Generate a response incrementally, yielding text deltas as the provider produces them.
+
+        :param message_chain: Sequence of :class:`AiMessage` representing the conversation so far.
+        :param model_configuration: Configuration for the model to use. If not specified, the default configuration
+            will be used.
+        :returns: Async iterator over reply text fragments; concatenated they form the full reply. A failed call ends
+            with a user-facing error reply.
+        """
+        produced = False
+        try:
+            async for delta in self.generate_stream(message_chain, model_configuration):
+                produced = True
+                yield delta
+        except Exception as error:  # noqa: BLE001 - reply boundary, error_reply logs the failure with its traceback
+            reply = self.error_reply(error)
+            yield f"\n\n{reply}" if produced else reply
+
+    async def generate(
+        self,
+        message_chain: MessageChain,
+        model_configuration: ModelConfiguration | None = None,
+    ) -> str:
+        """
+        Same as :meth:`answer`, but failures propagate as exceptions instead of being turned into replies.
+
+        :raises RateLimitTimeout: If the limiter did not admit the call in time.
+        :raises CircuitOpenError: If the provider's circuit is open.
+        """
+        cache_key = self._completion_cache_key(message_chain, model_configuration)
+        if cache_key is not None and (cached := await self._get_cached(cache_key)) is not None:
+            return cached
+
+        async def call() -> str:
+            async with self._limit(message_chain, model_configuration):
+                started = time.monotonic()
+                text = await self._resilient_answer(message_chain, model_configuration)
+            if cache_key is not None:
+                await self._store_cached(cache_key, text, time.monotonic() - started)
+            return text
+
+        if cache_key is None or self._coalescer is None:
+            return await call()
+        return await self._coalescer.run(self.get_name(), cache_key, call)
+
+    async def generate_stream(
+        self,
+        message_chain: MessageChain,
+        model_configuration: ModelConfiguration | None = None,
+    ) -> AsyncGenerator[str]:
+        """
+        Same as :meth:`stream`, but failures propagate as exceptions instead of being turned into replies.
+
+        :raises RateLimitTimeout: If the limiter did not admit the call in time.
+        :raises CircuitOpenError: If the provider's circuit is open.
+        """
+        cache_key = self._completion_cache_key(message_chain, model_configuration)
+        if cache_key is not None and (cached := await self._get_cached(cache_key)) is not None:
+            yield cached
+            return
+
+        async def call() -> AsyncGenerator[str]:
+            chunks: list[str] = []
+            async with self._limit(message_chain, model_configuration):
+                started = time.monotonic()
+                async for delta in self._resilient_stream(message_chain, model_configuration):
+                    chunks.append(delta)
+                    yield delta
+            if cache_key is not None:
+                await self._store_cached(cache_key, "".join(chunks), time.monotonic() - started)
+
+        if cache_key is None or self._coalescer is None:
+            deltas = call()
+        else:
+            deltas = self._coalescer.stream(self.get_name(), cache_key, call)
+        async with aclosing(deltas):
+            async for delta in deltas:
+                yield delta
+
+    def submit_batch(
+        self,
+        chains: Sequence[MessageChain],
+        model_configuration: ModelConfiguration | None = None,
+        chat_id: int | None = None,
+    ) -> AiBatchJob:
+        """
+        Submit many conversations for non-interactive completion and collect the replies asynchronously.
+
+        Every conversation becomes a :meth:`generate` call in the dispatcher's background priority class, queued by
+        :class:`AiBatchRunner` behind interactive calls.
+
+        :param chains: Conversations to complete.
+        :param model_configuration: Configuration for the model to use for every conversation.
+        :param chat_id: Chat the calls are made for.
+        :raises ConfigError: If batch execution is not configured for this client.
+        :returns: Job handle whose :meth:`AiBatchJob.results` lists the outcomes in submission order.
+        """
+        if self._batch_runner is None:
+            raise ConfigError(f"Batch execution is not configured for {self.__class__.__name__}.")
+
+        async def generate(chain: MessageChain) -> str:
+            return await self.generate(chain, model_configuration)
+
+        return self._batch_runner.enqueue(self.get_name(), generate, chains, chat_id)
+
+    async def aclose(self) -> None:
+        """
+        Close the provider's network connections; providers holding a pooled client override this.
+
+        The next call opens a new connection pool.
+        """
+
+    def error_reply(self, error: Exception) -> str:
+        """
+        Log a failed call and return the reply shown to the user instead of the completion.
+        """
+        match error:
+            case RateLimitTimeout():
+                self._logger.warning("Rejected %s call: %s", self.get_name(), error)
+                return self.BUSY_REPLY
+            case CircuitOpenError():
+                self._logger.warning("Rejected %s call: %s", self.get_name(), error)
+                return self.UNAVAILABLE_REPLY
+            case _:
+                self._logger.error("%s API call failed", self.get_name(), exc_info=error)
+                return self.ERROR_REPLY
+
+    def is_available(self) -> bool:
+        """
+        Report whether the provider currently accepts calls, i.e. its circuit is not open.
+        """
+        return self._resilience is None or self._resilience.is_available(self.get_name())
+
+    @abstractmethod
+    async def _answer(
+        self,
+        message_chain: MessageChain,
+        model_configuration: ModelConfiguration | None,
+    ) -> str:
+        """
+        Call the provider for a complete reply.
         """
         raise NotImplementedError
 
+    async def _stream(
+        self,
+        message_chain: MessageChain,
+        model_configuration: ModelConfiguration | None,
+    ) -> AsyncGenerator[str]:
+        """
+        Call the provider for a streamed reply.
+
+        Providers without a streaming API inherit this fallback, which yields the complete :meth:`_answer` at once.
+        """
+        yield await self._answer(message_chain, model_configuration)
+
+    def is_retryable(self, error: BaseException) -> bool:
+        """
+        Decide whether a provider error is transient and worth retrying.
+
+        Providers extend this with their SDK-specific error types.
+        """
+        return isinstance(error, (TimeoutError, ConnectionError))
+
+    async def _resilient_answer(self, message_chain: MessageChain, model_config: ModelConfiguration | None) -> str:
+        if self._resilience is None:
+            return await self._answer(message_chain, model_config)
+        return await self._resilience.call(
+            self.get_name(),
+            lambda: self._answer(message_chain, model_config),
+            self.is_retryable,
+        )
+
+    def _resilient_stream(
+        self,
+        message_chain: MessageChain,
+        model_config: ModelConfiguration | None,
+    ) -> AsyncIterator[str]:
+        if self._resilience is None:
+            return self._stream(message_chain, model_config)
+        return self._resilience.stream(
+            self.get_name(),
+            lambda: self._stream(message_chain, model_config),
+            self.is_retryable,
+        )
+
+    def resolve_max_output_tokens(self, model_config: ModelConfiguration | None) -> int:
+        if model_config is not None and model_config.max_output_tokens is not None:
+            return model_config.max_output_tokens
+        return self._settings.max_output_tokens or self._DEFAULT_COMPLETION_TOKENS
+
+    def estimate_tokens(self, message_chain: MessageChain, model_config: ModelConfiguration | None) -> int:
+        """
+        Roughly estimate the tokens a call consumes: the prompt plus the completion budget.
+        """
+        if self._budgeter is not None:
+            prompt_tokens = self._budgeter.estimator.count_messages(message_chain)
+        else:
+            prompt_tokens = sum(len(message.content) for message in message_chain) // self._CHARS_PER_TOKEN
+        return prompt_tokens + self.resolve_max_output_tokens(model_config)
+
+    def _resolve_params(self, model_config: ModelConfiguration | None) -> tuple[BaseModelParams, dict[str, Any]]:
+        key = self._params_key(model_config)
+        resolved = self._params_cache.get(key)
+        if resolved is not None:
+            return resolved
+        params = BaseModelParams.build(
+            model=self.resolve_model_name(model_config),
+            system_message=self.resolve_system_message(model_config),
+            settings=self._settings,
+            model_config=model_config,
+        )
+        resolved = params, self.convert_params(params)
+        if len(self._params_cache) >= self._PARAMS_CACHE_SIZE:
+            del self._params_cache[next(iter(self._params_cache))]
+        self._params_cache[key] = resolved
+        return resolved
+
+    def _params_key(self, model_config: ModelConfiguration | None) -> Hashable:
+        if model_config is None:
+            return ()
+        # ``updated_at`` is second-granular on SQLite, so two edits within a second would share a timestamp key.
+        stop_sequences = model_config.stop_sequences
+        return (
+            self.resolve_model_name(model_config),
+            self.resolve_system_message(model_config),
+            *[getattr(model_config, field) for field in self._PARAM_FIELDS],
+            tuple(stop_sequences) if stop_sequences is not None else None,
+        )
+
+    def _limit(
+        self,
+        message_chain: MessageChain,
+        model_config: ModelConfiguration | None,
+    ) -> AbstractAsyncContextManager[None]:
+        if self._limiter is None:
+            return nullcontext()
+        return self._limiter.acquire(
+            self.get_name(),
+            self.resolve_model_name(model_config),
+            self.estimate_tokens(message_chain, model_config),
+        )
+
+    async def _report_usage(
+        self,
+        model_config: ModelConfiguration | None,
+        usage: AiUsage,
+        started: float,
+    ) -> None:
+        """
+        Hand the usage of a finished provider call to the recorder.
+
+        :param started: Monotonic time the call was sent at.
+        """
+        if self._usage_recorder is not None:
+            latency = time.monotonic() - started
+            await self._usage_recorder.record(self.get_name(), self.resolve_model_name(model_config), usage, latency)
+
+    def _completion_cache_key(self, message_chain: MessageChain, model_config: ModelConfiguration | None) -> str | None:
+        if self._completion_cache is None:
+            return None
+        return self._completion_cache.key_for(
+            self.get_name(),
+            self.build_model_params(model_config),
+            self.build_messages(message_chain, model_config),
+        )
+
+    async def _get_cached(self, cache_key: str) -> str | None:
+        if self._completion_cache is None:
+            return None
+        return await self._completion_cache.get(self.get_name(), cache_key)
+
+    async def _store_cached(self, cache_key: str, text: str, latency: float) -> None:
+        if self._completion_cache is not None:
+            await self._completion_cache.set(cache_key, text, latency)
+
 
 class AiClientRegistry(Registry[str, BaseAiClient[Any]]):
     def __init__(self) -> None:
         super().__init__(BaseAiClient)
+
+    async def aclose(self) -> None:
+        """
+        Close the network connections of every registered client on shutdown.
+        """
+        for client in self.values():
+            await client.aclose()
@@ -0,0 +1,129 @@
+__all__ = ["AiBatchJob", "AiBatchResult", "AiBatchRunner"]
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Sequence
+
+from injector import inject
+
+from logging_config.common import WithLogger
+from settings.ai_client.batch_settings import AiBatchSettings
+from utils.metrics import MetricsRegistry
+
+from .dispatcher import AiDispatcher, AiPriority
+from .messages import MessageChain
+
+
+@dataclass(frozen=True, slots=True)
+class AiBatchResult:
+    """Outcome of one request of a batch: the completion text or the error that prevented it."""
+
+    text: str | None = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class AiBatchJob:
+    """
+    Handle of a submitted batch whose results are collected in the background.
+    """
+
+    def __init__(self, provider_name: str, size: int, task: asyncio.Task[list[AiBatchResult]]) -> None:
+        self._provider_name = provider_name
+        self._size = size
+        self._task = task
+
+    @property
+    def provider_name(self) -> str:
+        return self._provider_name
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def done(self) -> bool:
+        return self._task.done()
+
+    async def results(self) -> list[AiBatchResult]:
+        """
+        Wait for the batch to finish.
+
+        :returns: One result per submitted chain, in submission order.
+        """
+        return await asyncio.shield(self._task)
+
+    def cancel(self) -> None:
+        """
+        Stop the batch; requests already sent to the provider are not recalled.
+        """
+        self._task.cancel()
+
+
+class AiBatchRunner(WithLogger):
+    """
+    Execute batches submitted through :meth:`BaseAiClient.submit_batch`.
+
+    Every request of a batch is an individual call queued in the dispatcher's background priority class, so it is
+    admitted behind interactive replies and on-demand summaries without polling. At most ``queue_concurrency`` calls
+    of all batches per provider are in flight at a time, which keeps a large batch from filling the provider's queue.
+    Submitted requests are counted in ``ai.batch_requests``, outcomes in ``ai.batch_results`` and batch completion
+    times in ``ai.batch_duration``.
+    """
+
+    @inject
+    def __init__(self, settings: AiBatchSettings, metrics: MetricsRegistry) -> None:
+        self._settings = settings
+        self._metrics = metrics
+        self._slots: dict[str, asyncio.Semaphore] = {}
+
+    def enqueue(
+        self,
+        provider_name: str,
+        generate: Callable[[MessageChain], Awaitable[str]],
+        chains: Sequence[MessageChain],
+        chat_id: int | None = None,
+    ) -> AiBatchJob:
+        """
+        Run a batch as individual background calls.
+
+        :param provider_name: Registry name of the provider the calls are accounted to.
+        :param generate: Call producing the completion of one chain; it raises on failure.
+        :param chains: Conversations to complete.
+        :param chat_id: Chat the calls are queued for in the dispatcher; ``None`` shares one queue.
+        :returns: Job handle whose :meth:`AiBatchJob.results` lists the outcomes in submission order.
+        """
+        self._metrics.counter("ai.batch_requests", provider=provider_name).inc(len(chains))
+        work = self._run(provider_name, generate, chains, chat_id)
+        return AiBatchJob(provider_name, len(chains), asyncio.get_running_loop().create_task(work))
+
+    async def _run(
+        self,
+        provider_name: str,
+        generate: Callable[[MessageChain], Awaitable[str]],
+        chains: Sequence[MessageChain],
+        chat_id: int | None,
+    ) -> list[AiBatchResult]:
+        slots = self._slots.get(provider_name)
+        if slots is None:
+            slots = asyncio.Semaphore(max(1, self._settings.queue_concurrency))
+            self._slots[provider_name] = slots
+
+        async def run(chain: MessageChain) -> AiBatchResult:
+            async with slots:
+                with AiDispatcher.context(AiPriority.BACKGROUND, chat_id):
+                    try:
+                        return AiBatchResult(text=await generate(chain))
+                    except Exception as error:  # noqa: BLE001 - collected per request
+                        return AiBatchResult(error=error)
+
+        started = time.monotonic()
+        results = list(await asyncio.gather(*(run(chain) for chain in chains)))
+        self._metrics.summary("ai.batch_duration", provider=provider_name).observe(time.monotonic() - started)
+        for result in results:
+            outcome = "ok" if result.ok else "error"
+            self._metrics.counter("ai.batch_results", provider=provider_name, result=outcome).inc()
+        return results
@@ -0,0 +1,231 @@
+__all__ = ["RequestCoalescer"]
+
+import asyncio
+import time
+from contextlib import aclosing
+from typing import AsyncGenerator, Awaitable, Callable, Final
+from uuid import uuid4
+
+from injector import inject
+from valkey.exceptions import ValkeyError
+
+from cache.valkey import ValkeyCache
+from logging_config.common import WithLogger
+from settings.ai_client.cache_settings import AiCacheSettings
+from utils.metrics import MetricsRegistry
+
+
+class RequestCoalescer(WithLogger):
+    """
+    Share one provider call between concurrent requests with the same completion cache key.
+
+    Within a process the first caller becomes the leader and every concurrent caller awaits its future. When
+    ``coalesce_across_processes`` is enabled the leader additionally holds a Valkey lock; leaders of other processes
+    that find the lock taken poll for the published result instead of calling the provider. Followers are counted in
+    ``ai.coalesce`` by scope, leaders as ``scope=leader``.
+
+    Streams are shared within a process only: :meth:`stream` runs one upstream stream and fans its deltas out to every
+    concurrent caller, replaying what was already produced to late joiners. Waiting for another process to publish a
+    whole reply would defeat the point of streaming it.
+    """
+
+    _RELEASE_SCRIPT: Final[str] = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+    @inject
+    def __init__(self, settings: AiCacheSettings, cache: ValkeyCache, metrics: MetricsRegistry) -> None:
+        self._settings = settings
+        self._cache = cache
+        self._client = cache.client
+        self._metrics = metrics
+        self._inflight: dict[str, asyncio.Future[str]] = {}
+        self._streams: dict[str, _StreamBroadcast] = {}
+
+    async def run(self, provider_name: str, key: str, call: Callable[[], Awaitable[str]]) -> str:
+        """
+        Return the result of ``call``, sharing it with concurrent callers of the same ``key``.
+
+        :param provider_name: Registry name of the provider, used for metric labels.
+        :param key: Completion cache key of the request.
+        :param call: Performs the provider call; invoked at most once per burst of identical requests.
+        :returns: Reply text produced by ``call``, possibly by another caller.
+        """
+        if not self._settings.coalesce_enabled:
+            return await call()
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._metrics.counter("ai.coalesce", provider=provider_name, scope="local").inc()
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                task = asyncio.current_task()
+                if task is not None and task.cancelling():
+                    raise
+                # The leader was cancelled, not us: take over the request.
+                return await self.run(provider_name, key, call)
+
+        future: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._lead(provider_name, key, call)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark the exception as retrieved; followers may not exist.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+
+    async def stream(
+        self, provider_name: str, key: str, call: Callable[[], AsyncGenerator[str]]
+    ) -> AsyncGenerator[str]:
+        """
+        Yield the deltas of ``call``, sharing one upstream stream with concurrent callers of the same ``key``.
+
+        The upstream stream runs in its own task and keeps going while at least one caller still consumes it; it is
+        cancelled once every caller has stopped.
+
+        :param provider_name: Registry name of the provider, used for metric labels.
+        :param key: Completion cache key of the request.
+        :param call: Opens the provider stream; invoked at most once per burst of identical requests.
+        :returns: Async iterator over the reply text fragments, from the first one on.
+        """
+        if not self._settings.coalesce_enabled:
+            async with aclosing(call()) as deltas:
+                async for delta in deltas:
+                    yield delta
+            return
+
+        broadcast = self._streams.get(key)
+        if broadcast is None:
+            broadcast = _StreamBroadcast(call())
+            self._streams[key] = broadcast
+            broadcast.task.add_done_callback(lambda _: self._forget_stream(key, broadcast))
+            self._metrics.counter("ai.coalesce", provider=provider_name, scope="leader").inc()
+        else:
+            self._metrics.counter("ai.coalesce", provider=provider_name, scope="local").inc()
+
+        broadcast.subscribers += 1
+        try:
+            async for delta in broadcast.replay():
+                yield delta
+        finally:
+            broadcast.subscribers -= 1
+            if broadcast.subscribers == 0 and not broadcast.task.done():
+                # Nobody reads the reply any more; stop paying for it and let the next caller start afresh.
+                self._forget_stream(key, broadcast)
+                broadcast.task.cancel()
+
+    def _forget_stream(self, key: str, broadcast: "_StreamBroadcast") -> None:
+        if self._streams.get(key) is broadcast:
+            del self._streams[key]
+
+    async def _lead(self, provider_name: str, key: str, call: Callable[[], Awaitable[str]]) -> str:
+        if not self._settings.coalesce_across_processes:
+            self._metrics.counter("ai.coalesce", provider=provider_name, scope="leader").inc()
+            return await call()
+
+        lock_key, result_key = self._remote_keys(key)
+        token = uuid4().hex
+        deadline = time.monotonic() + self._settings.coalesce_lock_ttl
+        try:
+            while time.monotonic() < deadline:
+                if await self._client.set(lock_key, token, nx=True, px=int(self._settings.coalesce_lock_ttl * 1000)):
+                    break
+                result = await self._wait_remote(lock_key, result_key, deadline)
+                if result is not None:
+                    self._metrics.counter("ai.coalesce", provider=provider_name, scope="remote").inc()
+                    return result
+        except ValkeyError as exc:
+            self._logger.warning("Valkey coalescing unavailable for %s, calling provider directly: %s", key, exc)
+            self._metrics.counter("ai.coalesce", provider=provider_name, scope="leader").inc()
+            return await call()
+
+        self._metrics.counter("ai.coalesce", provider=provider_name, scope="leader").inc()
+        try:
+            result = await call()
+            try:
+                await self._client.set(result_key, result, ex=self._settings.coalesce_result_ttl)
+            except ValkeyError as exc:
+                self._logger.debug("Failed to publish coalesced result %s: %s", key, exc)
+            return result
+        finally:
+            try:
+                await self._cache.eval_script(self._RELEASE_SCRIPT, [lock_key], [token])
+            except ValkeyError as exc:
+                self._logger.debug("Failed to release coalescing lock %s: %s", key, exc)
+
+    async def _wait_remote(self, lock_key: str, result_key: str, deadline: float) -> str | None:
+        """
+        Poll for the result of another process until it appears, the lock is released, or ``deadline`` passes.
+        """
+        while time.monotonic() < deadline:
+            payload: bytes | None = await self._client.get(result_key)
+            if payload is None and not await self._client.exists(lock_key):
+                # The result is published before the lock is released, so look once more before giving up.
+                payload = await self._client.get(result_key)
+                return payload.decode("utf-8") if payload is not None else None
+            if payload is not None:
+                return payload.decode("utf-8")
+            await asyncio.sleep(self._settings.coalesce_poll_interval)
+        return None
+
+    @staticmethod
+    def _remote_keys(key: str) -> tuple[str, str]:
+        return f"ai:inflight:{key}:lock", f"ai:inflight:{key}:result"
+
+
+class _StreamBroadcast:
+    """
+    One upstream stream pumped by a background task into a buffer that every subscriber replays from the start.
+    """
+
+    def __init__(self, upstream: AsyncGenerator[str]) -> None:
+        self.chunks: list[str] = []
+        self.error: BaseException | None = None
+        self.finished = False
+        self.subscribers = 0
+        self._changed = asyncio.Event()
+        self.task = asyncio.get_running_loop().create_task(self._pump(upstream))
+
+    async def replay(self) -> AsyncGenerator[str]:
+        position = 0
+        while True:
+            while position < len(self.chunks):
+                yield self.chunks[position]
+                position += 1
+            if self.finished:
+                if self.error is not None:
+                    raise self.error
+                return
+            await self._changed.wait()
+
+    async def _pump(self, upstream: AsyncGenerator[str]) -> None:
+        try:
+            async with aclosing(upstream) as deltas:
+                async for delta in deltas:
+                    self.chunks.append(delta)
+                    self._notify()
+        except asyncio.CancelledError as exc:
+            self.error = exc
+            raise
+        except Exception as exc:  # noqa: BLE001 - handed to every subscriber by replay()
+            self.error = exc
+        finally:
+            self.finished = True
+            self._notify()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
@@ -0,0 +1,132 @@
+__all__ = ["CompletionCache"]
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Sequence
+
+from injector import inject
+from pydantic import BaseModel, ValidationError
+from valkey.exceptions import ValkeyError
+
+from cache.valkey import ValkeyCache
+from logging_config.common import WithLogger
+from settings.ai_client.cache_settings import AiCacheSettings
+from utils.metrics import MetricsRegistry
+
+from .messages import AiMessage
+from .model_params import BaseModelParams
+
+
+class _CachedCompletion(BaseModel):
+    text: str
+    latency: float
+
+
+class CompletionCache(WithLogger):
+    """
+    Two-tier cache of AI completions keyed by model parameters and the exact message list sent to the provider.
+
+    Lookups try an in-process LRU first and Valkey second, so identical prompts from different worker processes share
+    results. Every hit adds the provider latency recorded with the entry to ``ai.cache_saved_seconds``; hits, misses,
+    and bypasses are counted in ``ai.cache``.
+    """
+
+    @inject
+    def __init__(self, settings: AiCacheSettings, cache: ValkeyCache, metrics: MetricsRegistry) -> None:
+        self._settings = settings
+        self._client = cache.client
+        self._metrics = metrics
+        self._local: OrderedDict[str, tuple[float, _CachedCompletion]] = OrderedDict()
+
+    def key_for(self, provider_name: str, params: BaseModelParams, messages: Sequence[AiMessage]) -> str | None:
+        """
+        Build the cache key for a request.
+
+        :param provider_name: Registry name of the provider.
+        :param params: Fully resolved model parameters.
+        :param messages: Messages exactly as they will be sent, including injected system messages.
+        :returns: Stable hash of the request, or ``None`` when the request must bypass the cache.
+        """
+        if not self._settings.enabled:
+            return None
+        if params.temperature != 0 and not self._settings.cache_nonzero_temperature:
+            self._metrics.counter("ai.cache", provider=provider_name, result="bypass").inc()
+            return None
+        payload = {
+            "provider": provider_name,
+            "params": params.model_dump(mode="json"),
+            "messages": [message.as_payload() for message in messages],
+        }
+        encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    async def get(self, provider_name: str, key: str) -> str | None:
+        """
+        Return the cached completion for ``key``, if any.
+        """
+        entry = self._get_local(key)
+        if entry is None and self._settings.valkey_enabled:
+            entry = await self._get_remote(key)
+            if entry is not None:
+                self._put_local(key, entry)
+        if entry is None:
+            self._metrics.counter("ai.cache", provider=provider_name, result="miss").inc()
+            return None
+        self._metrics.counter("ai.cache", provider=provider_name, result="hit").inc()
+        self._metrics.counter("ai.cache_saved_seconds", provider=provider_name).inc(entry.latency)
+        return entry.text
+
+    async def set(self, key: str, text: str, latency: float) -> None:
+        """
+        Store a completion.
+
+        :param key: Key returned by :meth:`key_for`.
+        :param text: Completion text.
+        :param latency: Provider latency of the call that produced the completion, in seconds.
+        """
+        entry = _CachedCompletion(text=text, latency=latency)
+        self._put_local(key, entry)
+        if not self._settings.valkey_enabled:
+            return
+        try:
+            await self._client.set(name=self._remote_key(key), value=entry.model_dump_json(), ex=self._settings.ttl)
+        except ValkeyError as exc:
+            self._logger.debug("Failed to store completion %s in Valkey: %s", key, exc)
+
+    def _get_local(self, key: str) -> _CachedCompletion | None:
+        item = self._local.get(key)
+        if item is None:
+            return None
+        expires_at, entry = item
+        if expires_at <= time.monotonic():
+            del self._local[key]
+            return None
+        self._local.move_to_end(key)
+        return entry
+
+    def _put_local(self, key: str, entry: _CachedCompletion) -> None:
+        self._local[key] = (time.monotonic() + self._settings.ttl, entry)
+        self._local.move_to_end(key)
+        while len(self._local) > self._settings.local_max_entries:
+            self._local.popitem(last=False)
+
+    async def _get_remote(self, key: str) -> _CachedCompletion | None:
+        try:
+            payload = await self._client.get(self._remote_key(key))
+        except ValkeyError as exc:
+            self._logger.debug("Failed to read completion %s from Valkey: %s", key, exc)
+            return None
+        if payload is None:
+            return None
+        try:
+            return _CachedCompletion.model_validate_json(payload)
+        except ValidationError as exc:
+            # Entries written by an older release or corrupted in transit are treated as a miss and overwritten.
+            self._logger.debug("Failed to parse cached completion %s: %s", key, exc)
+            return None
+
+    @staticmethod
+    def _remote_key(key: str) -> str:
+        return f"ai:completion:{key}"
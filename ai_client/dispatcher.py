@@ -0,0 +1,158 @@
+__all__ = ["AiCallContext", "AiDispatcher", "AiPriority"]
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import StrEnum
+from typing import Final, Iterator
+
+from injector import inject
+
+from settings.ai_client.dispatch_settings import AiDispatchSettings
+from settings.ai_client.limiter_settings import AiLimiterSettings
+
+# Finish tags at or below the virtual time carry no information and are dropped once this many flows are tracked.
+_MAX_TRACKED_FLOWS: Final[int] = 1024
+
+
+class AiPriority(StrEnum):
+    INTERACTIVE = "interactive"
+    SUMMARY = "summary"
+    BACKGROUND = "background"
+
+
+@dataclass(frozen=True, slots=True)
+class AiCallContext:
+    """Priority class and chat that provider calls made in the current context are queued under."""
+
+    priority: AiPriority = AiPriority.INTERACTIVE
+    chat_id: int | None = None
+
+
+# ``None`` outside of :meth:`AiDispatcher.context`; :meth:`AiDispatcher.current` resolves it to an interactive call.
+_context: ContextVar[AiCallContext | None] = ContextVar("ai_call_context", default=None)
+_INTERACTIVE: Final[AiCallContext] = AiCallContext()
+
+
+@dataclass(slots=True)
+class _Queue:
+    """
+    Start-time fair queue of one provider.
+
+    Every flow (priority class and chat) advances its own finish tag by ``1 / weight`` per call, so a chat with many
+    queued calls is interleaved with the others and classes are served in proportion to their weights.
+    """
+
+    capacity: int
+    in_flight: int = 0
+    virtual_time: float = 0.0
+    finish_tags: dict[AiCallContext, float] = field(default_factory=dict)
+    waiters: list[tuple[float, int, asyncio.Future[None]]] = field(default_factory=list)
+
+    def push(self, flow: AiCallContext, weight: float, sequence: int, waiter: asyncio.Future[None]) -> None:
+        if len(self.finish_tags) >= _MAX_TRACKED_FLOWS:
+            self.finish_tags = {key: tag for key, tag in self.finish_tags.items() if tag > self.virtual_time}
+        start = max(self.virtual_time, self.finish_tags.get(flow, self.virtual_time))
+        self.finish_tags[flow] = start + 1.0 / weight
+        heapq.heappush(self.waiters, (start, sequence, waiter))
+
+    def dispatch(self) -> None:
+        while self.in_flight < self.capacity and self.waiters:
+            start, _, waiter = heapq.heappop(self.waiters)
+            if waiter.done():
+                continue
+            self.virtual_time = max(self.virtual_time, start)
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self.dispatch()
+
+
+class AiDispatcher:
+    """
+    Order the admission of provider calls by priority class and chat.
+
+    Each provider admits at most ``max_in_flight`` calls at a time. Once saturated, queued calls are admitted by
+    weighted fair queuing: priority classes share the provider by their configured weights and chats within a class
+    share it equally, so an interactive reply never waits behind the chunks of a long summary and one busy chat cannot
+    starve the others. Callers declare their class and chat with :meth:`context`; calls outside of it are interactive.
+    """
+
+    @inject
+    def __init__(self, settings: AiDispatchSettings, limiter_settings: AiLimiterSettings) -> None:
+        self._settings = settings
+        self._limiter_settings = limiter_settings
+        self._queues: dict[str, _Queue | None] = {}
+        self._sequence = itertools.count()
+
+    @staticmethod
+    @contextmanager
+    def context(priority: AiPriority, chat_id: int | None = None) -> Iterator[None]:
+        """
+        Queue the provider calls made within the block, including tasks started from it, under a class and chat.
+
+        :param priority: Priority class of the calls.
+        :param chat_id: Chat the calls are made for; ``None`` shares one queue per class.
+        """
+        token = _context.set(AiCallContext(priority=priority, chat_id=chat_id))
+        try:
+            yield
+        finally:
+            _context.reset(token)
+
+    @staticmethod
+    def current() -> AiCallContext:
+        return _context.get() or _INTERACTIVE
+
+    async def enter(self, provider_name: str, deadline: float) -> bool:
+        """
+        Wait for the turn of the current context's call.
+
+        :param provider_name: Registry name of the provider.
+        :param deadline: Monotonic time after which waiting is abandoned.
+        :returns: ``True`` when a slot was taken and must be returned with :meth:`exit`, ``False`` when the provider
+            is not queued.
+        :raises TimeoutError: If the call was not admitted before the deadline.
+        """
+        queue = self._get_queue(provider_name)
+        if queue is None:
+            return False
+
+        flow = self.current()
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        queue.push(flow, self._weight(flow.priority), next(self._sequence), waiter)
+        queue.dispatch()
+        if waiter.done():
+            return True
+
+        try:
+            async with asyncio.timeout(max(0.0, deadline - time.monotonic())):
+                await waiter
+        except BaseException:
+            # Admitted right before the timeout or cancellation hit: hand the slot to the next caller.
+            if waiter.done() and not waiter.cancelled():
+                queue.release()
+            raise
+        return True
+
+    def exit(self, provider_name: str) -> None:
+        queue = self._queues.get(provider_name)
+        if queue is not None:
+            queue.release()
+
+    def _weight(self, priority: AiPriority) -> float:
+        return max(self._settings.weights.get(priority.value, 1.0), 1e-6)
+
+    def _get_queue(self, provider_name: str) -> _Queue | None:
+        if provider_name not in self._queues:
+            capacity = self._settings.max_in_flight.get(provider_name)
+            if capacity is None:
+                capacity = self._limiter_settings.provider_limits(provider_name).max_concurrency
+            self._queues[provider_name] = _Queue(capacity=capacity) if self._settings.enabled and capacity else None
+        return self._queues[provider_name]
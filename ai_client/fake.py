@@ -0,0 +1,148 @@
+__all__ = ["FakeAiClient", "FakeAiError"]
+
+import asyncio
+import math
+import random
+import re
+import time
+from typing import TYPE_CHECKING, AsyncGenerator, Final, Self
+
+from injector import Inject, inject, provider, singleton
+
+from settings.ai_client.fake_settings import FakeAiSettings
+
+from .base import BaseAiClient
+from .batch import AiBatchRunner
+from .coalescer import RequestCoalescer
+from .completion_cache import CompletionCache
+from .limiter import AiRateLimiter
+from .messages import AiRole, MessageChain
+from .resilience import AiResilience
+from .tokens import MessageBudgeter
+from .usage import AiUsage, UsageRecorder
+
+if TYPE_CHECKING:
+    from database.models import ModelConfiguration
+
+
+class FakeAiError(RuntimeError):
+    """Non-retryable error injected by :class:`FakeAiClient`."""
+
+
+class FakeAiClient(BaseAiClient[FakeAiSettings]):
+    """
+    Local provider that answers without any network call, for load tests and benchmarks of the bot.
+
+    It goes through the same cache, limiter, resilience and usage accounting as real providers, so only the provider
+    latency is simulated: a first-token delay drawn from the configured distribution, token-rate streaming and
+    injected errors. Replies echo the last user message or return a fixed text.
+    """
+
+    PROVIDER_NAME = "fake"
+
+    _TOKEN_PATTERN: Final[re.Pattern[str]] = re.compile(r"\s*\S+")
+
+    @inject
+    def __init__(
+        self,
+        settings: FakeAiSettings,
+        limiter: AiRateLimiter,
+        completion_cache: CompletionCache,
+        coalescer: RequestCoalescer,
+        resilience: AiResilience,
+        budgeter: MessageBudgeter,
+        usage_recorder: UsageRecorder,
+        batch_runner: AiBatchRunner,
+    ) -> None:
+        super().__init__(
+            settings, limiter, completion_cache, coalescer, resilience, budgeter, usage_recorder, batch_runner
+        )
+        self._random = random.Random(settings.random_seed)  # noqa: S311 - simulation only, not security relevant
+
+    @classmethod
+    @provider
+    @singleton
+    def build(
+        cls,
+        settings: Inject[FakeAiSettings],
+        limiter: Inject[AiRateLimiter],
+        completion_cache: Inject[CompletionCache],
+        coalescer: Inject[RequestCoalescer],
+        resilience: Inject[AiResilience],
+        budgeter: Inject[MessageBudgeter],
+        usage_recorder: Inject[UsageRecorder],
+        batch_runner: Inject[AiBatchRunner],
+    ) -> Self:
+        return cls(settings, limiter, completion_cache, coalescer, resilience, budgeter, usage_recorder, batch_runner)
+
+    async def _answer(
+        self,
+        message_chain: MessageChain,
+        model_config: ModelConfiguration | None = None,
+    ) -> str:
+        started = time.monotonic()
+        await asyncio.sleep(self._latency())
+        self._inject_error()
+        text = self._reply(message_chain)
+        await self._report_usage(model_config, self._usage(message_chain, model_config, text), started)
+        return text
+
+    async def _stream(
+        self,
+        message_chain: MessageChain,
+        model_config: ModelConfiguration | None = None,
+    ) -> AsyncGenerator[str]:
+        started = time.monotonic()
+        await asyncio.sleep(self._latency())
+        self._inject_error()
+        text = self._reply(message_chain)
+        rate = self._settings.tokens_per_second
+        if not rate:
+            yield text
+        else:
+            for position, token in enumerate(self._TOKEN_PATTERN.findall(text)):
+                if position:
+                    await asyncio.sleep(1.0 / rate)
+                yield token
+        await self._report_usage(model_config, self._usage(message_chain, model_config, text), started)
+
+    def _latency(self) -> float:
+        settings = self._settings
+        match settings.latency_distribution:
+            case "constant":
+                value = settings.latency
+            case "uniform":
+                value = self._random.uniform(
+                    settings.latency - settings.latency_jitter, settings.latency + settings.latency_jitter
+                )
+            case "exponential":
+                value = self._random.expovariate(1.0 / settings.latency) if settings.latency > 0 else 0.0
+            case "lognormal":
+                value = (
+                    self._random.lognormvariate(math.log(settings.latency), settings.latency_jitter)
+                    if settings.latency > 0
+                    else 0.0
+                )
+        return max(0.0, value)
+
+    def _inject_error(self) -> None:
+        if self._settings.error_rate <= 0 or self._random.random() >= self._settings.error_rate:
+            return
+        if self._settings.error_retryable:
+            raise ConnectionError("Injected transient error of the fake AI provider.")
+        raise FakeAiError("Injected error of the fake AI provider.")
+
+    def _reply(self, message_chain: MessageChain) -> str:
+        if self._settings.response_mode == "echo":
+            for message in reversed(message_chain):
+                if message.role is AiRole.USER:
+                    return message.content
+        return self._settings.fixed_response
+
+    def _usage(self, message_chain: MessageChain, model_config: ModelConfiguration | None, text: str) -> AiUsage:
+        messages = self.build_messages(message_chain, model_config)
+        if self._budgeter is not None:
+            prompt_tokens = self._budgeter.estimator.count_messages(messages)
+        else:
+            prompt_tokens = sum(len(message.content) for message in messages) // self._CHARS_PER_TOKEN
+        return AiUsage(prompt_tokens=prompt_tokens, completion_tokens=len(self._TOKEN_PATTERN.findall(text)))
@@ -1,58 +1,179 @@
-import logging
-from typing import TYPE_CHECKING, Any, Self
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, AsyncGenerator, Final, Self
 
+import grpc  # type: ignore[import-untyped]
 from injector import Inject, inject, provider, singleton
 from xai_sdk import AsyncClient  # type: ignore[import-untyped]
 from xai_sdk.chat import assistant, system, user  # type: ignore[import-untyped]
 
 from settings.ai_client.grok_settings import GrokSettings
 
-from .base import AiMessage, AiRole, BaseAiClient, MessageChain
-from .model_params import GrokModelParams
+from .base import BaseAiClient
+from .batch import AiBatchRunner
+from .coalescer import RequestCoalescer
+from .completion_cache import CompletionCache
+from .dispatcher import AiDispatcher, AiPriority
+from .limiter import AiRateLimiter
+from .messages import AiMessage, AiRole, MessageChain
+from .model_params import BaseModelParams, GrokModelParams
+from .resilience import AiResilience
+from .tokens import MessageBudgeter
+from .usage import AiUsage, UsageRecorder
 
 if TYPE_CHECKING:
     from database.models import ModelConfiguration
 
 
-logger = logging.getLogger(__name__)
+_RETRYABLE_STATUS_CODES = frozenset(
+    {
+        grpc.StatusCode.UNAVAILABLE,
+        grpc.StatusCode.DEADLINE_EXCEEDED,
+        grpc.StatusCode.RESOURCE_EXHAUSTED,
+        grpc.StatusCode.ABORTED,
+        grpc.StatusCode.INTERNAL,
+    }
+)
 
 
 class GrokAiClient(BaseAiClient[GrokSettings]):
+    _MESSAGE_CACHE_SIZE: Final[int] = 4096
+    # Bound on the summed text of the cached messages, so that a few very long messages cannot pin megabytes.
+    _MESSAGE_CACHE_CHARS: Final[int] = 1_000_000
+
     @inject
-    def __init__(self, settings: GrokSettings) -> None:
-        super().__init__(settings)
+    def __init__(
+        self,
+        settings: GrokSettings,
+        limiter: AiRateLimiter,
+        completion_cache: CompletionCache,
+        coalescer: RequestCoalescer,
+        resilience: AiResilience,
+        budgeter: MessageBudgeter,
+        usage_recorder: UsageRecorder,
+        batch_runner: AiBatchRunner,
+    ) -> None:
+        super().__init__(
+            settings, limiter, completion_cache, coalescer, resilience, budgeter, usage_recorder, batch_runner
+        )
+        # gRPC-level backstop; the resilience layer enforces the actual per-attempt timeouts.
+        self._rpc_timeout = resilience.policy_for(self.get_name()).deadline
         self._client: AsyncClient | None = None
+        # Converted messages are shared between requests: ``Chat.append`` copies them into the request proto.
+        self._message_cache: OrderedDict[tuple[AiRole, str | None, str], Any] = OrderedDict()
+        self._message_cache_chars = 0
 
     @classmethod
     @provider
     @singleton
-    def build(cls, settings: Inject[GrokSettings]) -> Self:
-        return cls(settings)
+    def build(
+        cls,
+        settings: Inject[GrokSettings],
+        limiter: Inject[AiRateLimiter],
+        completion_cache: Inject[CompletionCache],
+        coalescer: Inject[RequestCoalescer],
+        resilience: Inject[AiResilience],
+        budgeter: Inject[MessageBudgeter],
+        usage_recorder: Inject[UsageRecorder],
+        batch_runner: Inject[AiBatchRunner],
+    ) -> Self:
+        return cls(settings, limiter, completion_cache, coalescer, resilience, budgeter, usage_recorder, batch_runner)
 
-    async def answer(
+    async def _answer(
         self,
         message_chain: MessageChain,
         model_config: ModelConfiguration | None = None,
     ) -> str:
-        params = self.build_model_params(model_config)
-        grok_params = params.convert(GrokModelParams)
-        grok_kwargs = grok_params.to_grok_kwargs()
+        grok_kwargs, converted_messages = self._prepare_request(message_chain, model_config)
+        chat = self._create_chat(grok_kwargs, converted_messages)
+        started = time.monotonic()
+        response: Any = await chat.sample()
+        await self._report_usage(model_config, self._usage_from(response), started)
+        return str(response.content)
+
+    async def _stream(
+        self,
+        message_chain: MessageChain,
+        model_config: ModelConfiguration | None = None,
+    ) -> AsyncGenerator[str]:
+        grok_kwargs, converted_messages = self._prepare_request(message_chain, model_config)
+        chat = self._create_chat(grok_kwargs, converted_messages)
+        started = time.monotonic()
+        # The SDK yields the accumulated response with every chunk; the last one carries the usage of the call.
+        final: Any = None
+        async for response, chunk in chat.stream():
+            final = response
+            if chunk.content:
+                yield chunk.content
+        if final is not None:
+            await self._report_usage(model_config, self._usage_from(final), started)
+
+    def convert_params(self, params: BaseModelParams) -> dict[str, Any]:
+        return params.convert(GrokModelParams).to_grok_kwargs()
+
+    def is_retryable(self, error: BaseException) -> bool:
+        if isinstance(error, grpc.aio.AioRpcError):
+            return error.code() in _RETRYABLE_STATUS_CODES
+        return super().is_retryable(error)
+
+    def _prepare_request(
+        self,
+        message_chain: MessageChain,
+        model_config: ModelConfiguration | None,
+    ) -> tuple[dict[str, Any], list[Any]]:
+        grok_kwargs = self.provider_kwargs(model_config)
         converted_messages = self.convert_messages(self.build_messages(message_chain, model_config))
+        return grok_kwargs, converted_messages
+
+    def _create_chat(self, grok_kwargs: dict[str, Any], converted_messages: list[Any]) -> Any:
+        chat = self._get_client().chat.create(**grok_kwargs)
+        for message in converted_messages:
+            chat.append(message)
+        return chat
 
-        try:
-            chat = self._get_client().chat.create(**grok_kwargs)
-            for message in converted_messages:
-                chat.append(message)
-            response: Any = await chat.sample()
-            return str(response.content)
-        except Exception as error:  # noqa: BLE001 - TODO: resolve for specific errors later
-            logger.exception("Grok API call failed")
-            return str(error)
+    @staticmethod
+    def _usage_from(response: Any) -> AiUsage:
+        usage = response.usage
+        return AiUsage(
+            prompt_tokens=usage.prompt_tokens,
+            cached_prompt_tokens=usage.cached_prompt_text_tokens,
+            completion_tokens=usage.completion_tokens,
+        )
 
     def convert_messages(self, messages: list[AiMessage]) -> list[Any]:
-        return [self.convert_message(message) for message in messages]
+        # Summaries and background jobs convert thousands of history messages that are rarely sent again; storing them
+        # would evict the conversations that are, so those calls only read the cache.
+        store = AiDispatcher.current().priority is AiPriority.INTERACTIVE
+        return [self.convert_message(message, store=store) for message in messages]
 
-    def convert_message(self, message: AiMessage) -> Any:
+    def convert_message(self, message: AiMessage, store: bool = True) -> Any:
+        """
+        Convert a message into an xai_sdk message, reusing the one built for an identical earlier message.
+
+        :param store: Whether a newly built message is added to the cache.
+        """
+        key = (message.role, message.name, message.content)
+        converted = self._message_cache.get(key)
+        if converted is not None:
+            self._message_cache.move_to_end(key)
+            return converted
+        converted = self._build_message(message)
+        if store:
+            self._message_cache[key] = converted
+            self._message_cache_chars += self._message_chars(key)
+            while len(self._message_cache) > self._MESSAGE_CACHE_SIZE or (
+                self._message_cache_chars > self._MESSAGE_CACHE_CHARS
+            ):
+                evicted, _ = self._message_cache.popitem(last=False)
+                self._message_cache_chars -= self._message_chars(evicted)
+        return converted
+
+    @staticmethod
+    def _message_chars(key: tuple[AiRole, str | None, str]) -> int:
+        return len(key[2]) + len(key[1] or "")
+
+    @staticmethod
+    def _build_message(message: AiMessage) -> Any:
         match message.role:
             case AiRole.SYSTEM:
                 return system(message.content)
@@ -65,11 +186,16 @@ class GrokAiClient(BaseAiClient[GrokSettings]):
             case _:
                 raise NotImplementedError("Unsupported AI message role for Grok conversion")
 
+    async def aclose(self) -> None:
+        client, self._client = self._client, None
+        if client is not None:
+            await client.close()
+
     def _get_client(self) -> AsyncClient:
         if self._client is None:
             api_key = self._settings.api_key
             if not api_key:
                 msg = "Grok API key is not configured"
                 raise ValueError(msg)
-            self._client = AsyncClient(api_key=api_key, timeout=3600)
+            self._client = AsyncClient(api_key=api_key, timeout=self._rpc_timeout)
         return self._client
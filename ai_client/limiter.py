@@ -0,0 +1,240 @@
+__all__ = ["AiRateLimiter", "RateLimitTimeout", "TokenBucket", "ValkeyTokenBucket"]
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Final
+
+from injector import inject
+from valkey.exceptions import ValkeyError
+
+from cache.valkey import ValkeyCache
+from logging_config.common import WithLogger
+from settings.ai_client.limiter_settings import AiLimiterSettings, ProviderLimits
+from utils.metrics import MetricsRegistry
+
+from .dispatcher import AiDispatcher
+
+_SECONDS_PER_MINUTE: Final[float] = 60.0
+
+
+class RateLimitTimeout(RuntimeError):
+    """Raised when a provider call could not obtain a limiter slot before its queue deadline."""
+
+
+class BaseTokenBucket(ABC):
+    """
+    Token bucket refilled continuously up to ``capacity`` at ``capacity`` tokens per minute.
+    """
+
+    def __init__(self, capacity: float) -> None:
+        self._capacity = capacity
+        self._rate = capacity / _SECONDS_PER_MINUTE
+
+    @abstractmethod
+    async def try_acquire(self, amount: float) -> float:
+        """
+        Take ``amount`` tokens when available.
+
+        :param amount: Number of tokens to take; clamped to the bucket capacity.
+        :returns: ``0`` when the tokens were taken, otherwise the number of seconds until they will be available.
+        """
+
+    async def acquire(self, amount: float, deadline: float) -> None:
+        """
+        Wait until ``amount`` tokens are taken or ``deadline`` (monotonic time) passes.
+
+        :raises RateLimitTimeout: If the tokens cannot be obtained before the deadline.
+        """
+        while True:
+            wait = await self.try_acquire(amount)
+            if wait <= 0:
+                return
+            if time.monotonic() + wait > deadline:
+                raise RateLimitTimeout(f"Rate limit queue deadline exceeded (needed {wait:.1f}s more).")
+            await asyncio.sleep(wait)
+
+
+class TokenBucket(BaseTokenBucket):
+    """In-process token bucket."""
+
+    def __init__(self, capacity: float) -> None:
+        super().__init__(capacity)
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+
+    async def try_acquire(self, amount: float) -> float:
+        amount = min(amount, self._capacity)
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated_at) * self._rate)
+        self._updated_at = now
+        if self._tokens >= amount:
+            self._tokens -= amount
+            return 0.0
+        return (amount - self._tokens) / self._rate
+
+
+class ValkeyTokenBucket(BaseTokenBucket, WithLogger):
+    """
+    Token bucket stored in Valkey so that every worker process draws from the same budget.
+
+    Refill and withdrawal happen in one Lua script using the server clock. When Valkey is unreachable the bucket
+    degrades to a process-local fallback instead of failing the call.
+    """
+
+    _SCRIPT: Final[str] = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local amount = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= amount then
+    tokens = tokens - amount
+else
+    wait = (amount - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+    def __init__(self, cache: ValkeyCache, key: str, capacity: float) -> None:
+        super().__init__(capacity)
+        self._cache = cache
+        self._key = key
+        self._fallback = TokenBucket(capacity)
+        self._degraded = False
+
+    async def try_acquire(self, amount: float) -> float:
+        amount = min(amount, self._capacity)
+        try:
+            wait = await self._cache.eval_script(self._SCRIPT, [self._key], [self._capacity, self._rate, amount])
+        except ValkeyError as exc:
+            if not self._degraded:
+                self._logger.warning("Valkey rate limiter unavailable for %s, using local bucket: %s", self._key, exc)
+                self._degraded = True
+            return await self._fallback.try_acquire(amount)
+        if self._degraded:
+            self._logger.info("Valkey rate limiter for %s recovered", self._key)
+            self._degraded = False
+        return float(wait)
+
+
+@dataclass(slots=True)
+class _Limits:
+    semaphore: asyncio.Semaphore | None
+    requests: BaseTokenBucket | None
+    tokens: BaseTokenBucket | None
+
+    async def enter(self, tokens: int, deadline: float) -> None:
+        if self.semaphore is not None:
+            try:
+                async with asyncio.timeout(max(0.0, deadline - time.monotonic())):
+                    await self.semaphore.acquire()
+            except TimeoutError as exc:
+                raise RateLimitTimeout("Concurrency limit queue deadline exceeded.") from exc
+        try:
+            if self.requests is not None:
+                await self.requests.acquire(1, deadline)
+            if self.tokens is not None:
+                await self.tokens.acquire(tokens, deadline)
+        except BaseException:
+            self.exit()
+            raise
+
+    def exit(self) -> None:
+        if self.semaphore is not None:
+            self.semaphore.release()
+
+
+class AiRateLimiter(WithLogger):
+    """
+    Combine a concurrency cap, a requests-per-minute bucket, and a tokens-per-minute bucket per provider and model.
+
+    Provider-wide limits apply to every model of the provider; ``provider/model`` overrides add a further, model
+    specific layer. Callers queue until every layer admits them or until ``queue_timeout`` elapses, in which case
+    :class:`RateLimitTimeout` is raised. Calls first wait for their turn at the :class:`AiDispatcher`, which orders
+    them by priority class and chat once the provider is saturated. Queue wait times are reported as the
+    ``ai.limiter_wait`` metric by provider and priority class.
+    """
+
+    @inject
+    def __init__(
+        self,
+        settings: AiLimiterSettings,
+        cache: ValkeyCache,
+        dispatcher: AiDispatcher,
+        metrics: MetricsRegistry,
+    ) -> None:
+        self._settings = settings
+        self._cache = cache
+        self._dispatcher = dispatcher
+        self._metrics = metrics
+        self._layers: dict[str, _Limits | None] = {}
+
+    @asynccontextmanager
+    async def acquire(self, provider_name: str, model: str, tokens: int) -> AsyncIterator[None]:
+        """
+        Hold limiter slots for one provider call.
+
+        :param provider_name: Registry name of the provider.
+        :param model: Provider model identifier.
+        :param tokens: Estimated tokens consumed by the call (prompt plus completion budget).
+        :raises RateLimitTimeout: If the call cannot be admitted before the queue deadline.
+        """
+        if not self._settings.enabled:
+            yield
+            return
+
+        started = time.monotonic()
+        deadline = started + self._settings.queue_timeout
+        dispatched = False
+        entered: list[_Limits] = []
+        try:
+            try:
+                dispatched = await self._dispatcher.enter(provider_name, deadline)
+            except TimeoutError as exc:
+                raise RateLimitTimeout("Dispatch queue deadline exceeded.") from exc
+            for layer in self._get_layers(provider_name, model):
+                await layer.enter(tokens, deadline)
+                entered.append(layer)
+            self._metrics.summary(
+                "ai.limiter_wait", provider=provider_name, priority=self._dispatcher.current().priority.value
+            ).observe(time.monotonic() - started)
+            yield
+        finally:
+            for layer in reversed(entered):
+                layer.exit()
+            if dispatched:
+                self._dispatcher.exit(provider_name)
+
+    def _get_layers(self, provider_name: str, model: str) -> list[_Limits]:
+        provider_key = provider_name
+        model_key = f"{provider_name}/{model}"
+        if provider_key not in self._layers:
+            self._layers[provider_key] = self._build_layer(provider_key, self._settings.provider_limits(provider_name))
+        if model_key not in self._layers:
+            model_limits = self._settings.model_limits(provider_name, model)
+            self._layers[model_key] = self._build_layer(model_key, model_limits) if model_limits else None
+        return [layer for layer in (self._layers[provider_key], self._layers[model_key]) if layer is not None]
+
+    def _build_layer(self, key: str, config: ProviderLimits) -> _Limits:
+        return _Limits(
+            semaphore=asyncio.Semaphore(config.max_concurrency) if config.max_concurrency else None,
+            requests=self._build_bucket(f"{key}:requests", config.requests_per_minute),
+            tokens=self._build_bucket(f"{key}:tokens", config.tokens_per_minute),
+        )
+
+    def _build_bucket(self, name: str, per_minute: float | None) -> BaseTokenBucket | None:
+        if not per_minute:
+            return None
+        if self._settings.backend == "valkey":
+            return ValkeyTokenBucket(self._cache, f"ai:limiter:{name}", per_minute)
+        return TokenBucket(per_minute)
@@ -0,0 +1,30 @@
+__all__ = ["AiRole", "AiMessage", "MessageChain"]
+
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import Any, Sequence
+
+
+class AiRole(StrEnum):
+    SYSTEM = "system"
+    USER = "user"
+    ASSISTANT = "assistant"
+
+
+@dataclass(slots=True)
+class AiMessage:
+    role: AiRole
+    content: str
+    name: str | None = None
+
+    def as_payload(self) -> dict[str, Any]:
+        payload: dict[str, Any] = {
+            "role": self.role.value,
+            "content": self.content,
+        }
+        if self.name:
+            payload["name"] = self.name
+        return payload
+
+
+type MessageChain = Sequence[AiMessage]
@@ -77,3 +77,24 @@ class GrokModelParams(BaseModelParams):
             exclude_none=True,
             exclude={"system_message"},
         )
+
+
+class OpenAiModelParams(BaseModelParams):
+    def to_openai_kwargs(self) -> dict[str, Any]:
+        """
+        Map the parameters onto the OpenAI chat completions request body.
+
+        ``top_k`` and ``repetition_penalty`` are not part of the OpenAI API but are accepted by common self-hosted
+        servers (vLLM, llama.cpp); they are only sent when configured.
+        """
+        kwargs = self.model_dump(
+            exclude_none=True,
+            exclude={"system_message", "max_output_tokens", "stop_sequences", "response_format"},
+        )
+        if self.max_output_tokens is not None:
+            kwargs["max_tokens"] = self.max_output_tokens
+        if self.stop_sequences is not None:
+            kwargs["stop"] = self.stop_sequences
+        if self.response_format is not None:
+            kwargs["response_format"] = {"type": self.response_format}
+        return kwargs
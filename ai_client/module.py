@@ -1,7 +1,22 @@
 from injector import Binder, Module, singleton
 
+from settings.ai_client.fake_settings import FakeAiSettings
+
 from .base import AiClientRegistry
+from .batch import AiBatchRunner
+from .coalescer import RequestCoalescer
+from .completion_cache import CompletionCache
+from .dispatcher import AiDispatcher
+from .fake import FakeAiClient
 from .grok import GrokAiClient
+from .limiter import AiRateLimiter
+from .openai_compatible import OpenAiCompatibleAiClient
+from .quota import AiQuota
+from .resilience import AiResilience
+from .router import AiRouter
+from .summarizer import ConversationSummarizer
+from .tokens import MessageBudgeter, TokenEstimator
+from .usage import UsageRecorder
 
 
 class AiClientModule(Module):
@@ -12,6 +27,22 @@ class AiClientModule(Module):
     """
 
     def configure(self, binder: Binder) -> None:
+        binder.bind(AiDispatcher, to=AiDispatcher, scope=singleton)
+        binder.bind(AiRateLimiter, to=AiRateLimiter, scope=singleton)
+        binder.bind(CompletionCache, to=CompletionCache, scope=singleton)
+        binder.bind(RequestCoalescer, to=RequestCoalescer, scope=singleton)
+        binder.bind(AiResilience, to=AiResilience, scope=singleton)
+        binder.bind(TokenEstimator, to=TokenEstimator, scope=singleton)
+        binder.bind(MessageBudgeter, to=MessageBudgeter, scope=singleton)
+        binder.bind(UsageRecorder, to=UsageRecorder, scope=singleton)
+        binder.bind(AiBatchRunner, to=AiBatchRunner, scope=singleton)
+        binder.bind(AiQuota, to=AiQuota, scope=singleton)
         registry = AiClientRegistry()
         registry.register(GrokAiClient.get_name(), binder.injector.create_object(GrokAiClient))
+        registry.register(OpenAiCompatibleAiClient.get_name(), binder.injector.create_object(OpenAiCompatibleAiClient))
+        fake_settings = binder.injector.get(FakeAiSettings)
+        if fake_settings.enabled:
+            registry.register(fake_settings.provider_name.lower(), binder.injector.create_object(FakeAiClient))
         binder.bind(AiClientRegistry, to=registry, scope=singleton)
+        binder.bind(AiRouter, to=AiRouter, scope=singleton)
+        binder.bind(ConversationSummarizer, to=ConversationSummarizer, scope=singleton)
@@ -0,0 +1,181 @@
+import json
+import time
+from typing import TYPE_CHECKING, Any, AsyncGenerator, Final, Self
+
+import httpx
+from injector import Inject, inject, provider, singleton
+
+from errors import ConfigError
+from settings.ai_client.openai_compatible_settings import OpenAiCompatibleSettings
+
+from .base import BaseAiClient
+from .batch import AiBatchRunner
+from .coalescer import RequestCoalescer
+from .completion_cache import CompletionCache
+from .limiter import AiRateLimiter
+from .messages import AiMessage, AiRole, MessageChain
+from .model_params import BaseModelParams, OpenAiModelParams
+from .resilience import AiResilience
+from .tokens import MessageBudgeter
+from .usage import AiUsage, UsageRecorder
+
+if TYPE_CHECKING:
+    from database.models import ModelConfiguration
+
+
+_RETRYABLE_STATUS_CODES: Final[frozenset[int]] = frozenset({408, 409, 429, 500, 502, 503, 504})
+_SSE_DATA_PREFIX: Final[str] = "data:"
+_SSE_DONE: Final[str] = "[DONE]"
+
+
+class OpenAiCompatibleAiClient(BaseAiClient[OpenAiCompatibleSettings]):
+    """
+    Client for servers implementing the OpenAI chat completions API, such as self-hosted vLLM or llama.cpp servers.
+
+    All calls share one pooled ``httpx.AsyncClient`` that keeps connections alive between calls and multiplexes
+    concurrent requests over HTTP/2 when the server supports it. Streamed replies are decoded event by event from the
+    server-sent events stream, so deltas reach the caller as soon as the server flushes them.
+    """
+
+    PROVIDER_NAME = "openai_compatible"
+
+    @inject
+    def __init__(
+        self,
+        settings: OpenAiCompatibleSettings,
+        limiter: AiRateLimiter,
+        completion_cache: CompletionCache,
+        coalescer: RequestCoalescer,
+        resilience: AiResilience,
+        budgeter: MessageBudgeter,
+        usage_recorder: UsageRecorder,
+        batch_runner: AiBatchRunner,
+    ) -> None:
+        super().__init__(
+            settings, limiter, completion_cache, coalescer, resilience, budgeter, usage_recorder, batch_runner
+        )
+        # Transport-level backstop; the resilience layer enforces the actual per-attempt timeouts.
+        self._read_timeout = resilience.policy_for(self.get_name()).deadline
+        self._client: httpx.AsyncClient | None = None
+
+    @classmethod
+    @provider
+    @singleton
+    def build(
+        cls,
+        settings: Inject[OpenAiCompatibleSettings],
+        limiter: Inject[AiRateLimiter],
+        completion_cache: Inject[CompletionCache],
+        coalescer: Inject[RequestCoalescer],
+        resilience: Inject[AiResilience],
+        budgeter: Inject[MessageBudgeter],
+        usage_recorder: Inject[UsageRecorder],
+        batch_runner: Inject[AiBatchRunner],
+    ) -> Self:
+        return cls(settings, limiter, completion_cache, coalescer, resilience, budgeter, usage_recorder, batch_runner)
+
+    async def _answer(
+        self,
+        message_chain: MessageChain,
+        model_config: ModelConfiguration | None = None,
+    ) -> str:
+        body = self._request_body(message_chain, model_config)
+        started = time.monotonic()
+        response = await self._get_client().post("chat/completions", json=body)
+        response.raise_for_status()
+        payload: dict[str, Any] = response.json()
+        usage = payload.get("usage")
+        if usage:
+            await self._report_usage(model_config, self._usage_from(usage), started)
+        return str(payload["choices"][0]["message"].get("content") or "")
+
+    async def _stream(
+        self,
+        message_chain: MessageChain,
+        model_config: ModelConfiguration | None = None,
+    ) -> AsyncGenerator[str]:
+        body = self._request_body(message_chain, model_config)
+        body["stream"] = True
+        body["stream_options"] = {"include_usage": True}
+        started = time.monotonic()
+        async with self._get_client().stream("POST", "chat/completions", json=body) as response:
+            if response.is_error:
+                await response.aread()
+                response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith(_SSE_DATA_PREFIX):
+                    continue
+                data = line.removeprefix(_SSE_DATA_PREFIX).strip()
+                if data == _SSE_DONE:
+                    break
+                event: dict[str, Any] = json.loads(data)
+                for choice in event.get("choices") or ():
+                    content = (choice.get("delta") or {}).get("content")
+                    if content:
+                        yield content
+                usage = event.get("usage")
+                if usage:
+                    await self._report_usage(model_config, self._usage_from(usage), started)
+
+    def convert_params(self, params: BaseModelParams) -> dict[str, Any]:
+        return params.convert(OpenAiModelParams).to_openai_kwargs()
+
+    def is_retryable(self, error: BaseException) -> bool:
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in _RETRYABLE_STATUS_CODES
+        if isinstance(error, httpx.TransportError):
+            return True
+        return super().is_retryable(error)
+
+    def _request_body(self, message_chain: MessageChain, model_config: ModelConfiguration | None) -> dict[str, Any]:
+        body = self.provider_kwargs(model_config)
+        body["messages"] = self.convert_messages(self.build_messages(message_chain, model_config))
+        return body
+
+    @staticmethod
+    def _usage_from(usage: dict[str, Any]) -> AiUsage:
+        details = usage.get("prompt_tokens_details") or {}
+        return AiUsage(
+            prompt_tokens=usage.get("prompt_tokens") or 0,
+            cached_prompt_tokens=details.get("cached_tokens") or 0,
+            completion_tokens=usage.get("completion_tokens") or 0,
+        )
+
+    def convert_messages(self, messages: list[AiMessage]) -> list[dict[str, str]]:
+        return [self.convert_message(message) for message in messages]
+
+    def convert_message(self, message: AiMessage) -> dict[str, str]:
+        match message.role:
+            case AiRole.SYSTEM | AiRole.ASSISTANT:
+                return {"role": message.role.value, "content": message.content}
+            case AiRole.USER:
+                # The API restricts ``name`` to ``[a-zA-Z0-9_-]``, which Telegram display names rarely satisfy.
+                if message.name:
+                    return {"role": "user", "content": f"{message.name}: {message.content}"}
+                return {"role": "user", "content": message.content}
+            case _:
+                raise NotImplementedError("Unsupported AI message role for OpenAI-compatible conversion")
+
+    async def aclose(self) -> None:
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            base_url = self._settings.base_url
+            if not base_url:
+                raise ConfigError("OpenAI-compatible base URL is not configured")
+            headers = {"Authorization": f"Bearer {self._settings.api_key}"} if self._settings.api_key else {}
+            self._client = httpx.AsyncClient(
+                base_url=base_url.rstrip("/") + "/",
+                headers=headers,
+                http2=self._settings.http2,
+                limits=httpx.Limits(
+                    max_connections=self._settings.max_connections,
+                    max_keepalive_connections=self._settings.max_keepalive_connections,
+                    keepalive_expiry=self._settings.keepalive_expiry,
+                ),
+                timeout=httpx.Timeout(self._read_timeout, connect=self._settings.connect_timeout),
+            )
+        return self._client
@@ -0,0 +1,185 @@
+__all__ = ["AiQuota"]
+
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Final
+
+from injector import inject
+from pydantic import ValidationError
+from valkey.exceptions import ValkeyError
+
+from cache.valkey import ValkeyCache
+from logging_config.common import WithLogger
+from settings.ai_client.quota_settings import AiQuotaSettings, QuotaLimits
+from utils.metrics import MetricsRegistry
+
+if TYPE_CHECKING:
+    from database.models import ModelConfiguration
+
+_SECONDS_PER_HOUR: Final[float] = 3600.0
+# Bounds the process-local fallback buckets; evicted buckets simply start full again.
+_LOCAL_BUCKETS_SIZE: Final[int] = 10_000
+
+
+@dataclass(frozen=True, slots=True)
+class _Bucket:
+    key: str
+    capacity: float
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / _SECONDS_PER_HOUR
+
+
+class AiQuota(WithLogger):
+    """
+    Enforce the request quotas of chats and of users within a chat before AI requests are made.
+
+    The chat bucket and the user bucket are checked and charged together by one Lua script, so a request is either
+    admitted by both or charged to neither, in a single Valkey round trip. When Valkey is unreachable the quota degrades
+    to process-local buckets instead of failing the request. Decisions are counted in ``ai.quota`` by result.
+    """
+
+    _SCRIPT: Final[str] = """
+local amount = tonumber(ARGV[1])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local levels = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i + 1])
+    local rate = capacity / 3600
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    local needed = math.min(amount, capacity)
+    if tokens < needed then
+        wait = math.max(wait, (needed - tokens) / rate)
+    end
+    levels[i] = tokens
+end
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[i + 1])
+    local tokens = levels[i]
+    if wait == 0 then
+        tokens = tokens - math.min(amount, capacity)
+    end
+    redis.call('HSET', key, 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', key, 3601)
+end
+return tostring(wait)
+"""
+
+    _THROTTLED_REPLY: Final[str] = (
+        "This chat is sending AI requests faster than its quota allows. Please try again in about {minutes} min."
+    )
+
+    @inject
+    def __init__(self, settings: AiQuotaSettings, cache: ValkeyCache, metrics: MetricsRegistry) -> None:
+        self._settings = settings
+        self._cache = cache
+        self._metrics = metrics
+        self._local: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._degraded = False
+
+    async def acquire(
+        self,
+        chat_id: int,
+        user_id: int | None,
+        model_config: ModelConfiguration | None = None,
+        cost: float = 1.0,
+    ) -> float:
+        """
+        Charge one request to the quotas of a chat and of its sender.
+
+        :param chat_id: Telegram chat identifier.
+        :param user_id: Telegram user identifier of the sender; ``None`` checks the chat quota only.
+        :param model_config: Configuration of the chat, whose ``extras["quota"]`` overrides the default quotas.
+        :param cost: Number of requests charged, e.g. ``summary_cost`` for summaries.
+        :returns: ``0`` when the request is admitted, otherwise the number of seconds until it would be.
+        """
+        if not self._settings.enabled:
+            return 0.0
+        limits = self.limits_for(model_config)
+        buckets = [
+            _Bucket(key, capacity)
+            for key, capacity in (
+                (f"ai:quota:{{{chat_id}}}", limits.chat_requests_per_hour),
+                (f"ai:quota:{{{chat_id}}}:user:{user_id}", limits.user_requests_per_hour if user_id else None),
+            )
+            if capacity
+        ]
+        if not buckets:
+            return 0.0
+        if self._settings.backend == "valkey":
+            wait = await self._take_shared(buckets, cost)
+        else:
+            wait = self._take_local(buckets, cost)
+        self._metrics.counter("ai.quota", result="throttled" if wait > 0 else "admitted").inc()
+        return wait
+
+    def throttled_reply(self, retry_after: float) -> str:
+        """
+        Build the reply sent instead of an AI answer when a quota is exhausted.
+
+        :param retry_after: Seconds until the request would be admitted, as returned by :meth:`acquire`.
+        """
+        return self._THROTTLED_REPLY.format(minutes=max(1, math.ceil(retry_after / 60)))
+
+    def limits_for(self, model_config: ModelConfiguration | None) -> QuotaLimits:
+        """
+        Resolve the quotas of a chat.
+
+        :param model_config: Configuration of the chat, if any.
+        :returns: Default quotas overlaid with ``extras["quota"]``; invalid overrides are logged and ignored.
+        """
+        if model_config is None or not model_config.extras:
+            return self._settings.default
+        override = model_config.extras.get("quota")
+        if override is None:
+            return self._settings.default
+        try:
+            return self._settings.default.merged_with(QuotaLimits.model_validate(override))
+        except ValidationError as exc:
+            self._logger.warning("Ignoring invalid quota override of model configuration %s: %s", model_config.id, exc)
+            return self._settings.default
+
+    async def _take_shared(self, buckets: list[_Bucket], amount: float) -> float:
+        try:
+            wait = await self._cache.eval_script(
+                self._SCRIPT,
+                [bucket.key for bucket in buckets],
+                [amount, *(bucket.capacity for bucket in buckets)],
+            )
+        except ValkeyError as exc:
+            if not self._degraded:
+                self._logger.warning("Valkey quota storage unavailable, using local buckets: %s", exc)
+                self._degraded = True
+            return self._take_local(buckets, amount)
+        if self._degraded:
+            self._logger.info("Valkey quota storage recovered")
+            self._degraded = False
+        return float(wait)
+
+    def _take_local(self, buckets: list[_Bucket], amount: float) -> float:
+        now = time.monotonic()
+        levels: list[float] = []
+        wait = 0.0
+        for bucket in buckets:
+            tokens, updated_at = self._local.get(bucket.key, (bucket.capacity, now))
+            tokens = min(bucket.capacity, tokens + max(0.0, now - updated_at) * bucket.rate)
+            needed = min(amount, bucket.capacity)
+            if tokens < needed:
+                wait = max(wait, (needed - tokens) / bucket.rate)
+            levels.append(tokens)
+        for bucket, tokens in zip(buckets, levels, strict=True):
+            if wait == 0:
+                tokens -= min(amount, bucket.capacity)
+            self._local[bucket.key] = (tokens, now)
+            self._local.move_to_end(bucket.key)
+        while len(self._local) > _LOCAL_BUCKETS_SIZE:
+            self._local.popitem(last=False)
+        return wait
@@ -0,0 +1,266 @@
+__all__ = ["AiResilience", "CircuitBreaker", "CircuitOpenError"]
+
+import asyncio
+import random
+import time
+from contextlib import aclosing
+from enum import StrEnum
+from typing import AsyncGenerator, Awaitable, Callable
+
+from injector import inject
+
+from logging_config.common import WithLogger
+from settings.ai_client.resilience_settings import AiResilienceSettings, ResiliencePolicy
+from utils.metrics import MetricsRegistry
+
+type RetryPredicate = Callable[[BaseException], bool]
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a provider call is rejected because the provider's circuit is open."""
+
+
+class CircuitState(StrEnum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker(WithLogger):
+    """
+    Consecutive-failure circuit breaker with half-open probing.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and rejects calls for ``reset_timeout`` seconds.
+    It then lets up to ``half_open_max_calls`` probe calls through: a successful probe closes the circuit, a failed one
+    opens it again.
+    """
+
+    def __init__(self, name: str, policy: ResiliencePolicy) -> None:
+        self._name = name
+        self._policy = policy
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+    @property
+    def state(self) -> CircuitState:
+        return self._state
+
+    @property
+    def available(self) -> bool:
+        """
+        ``False`` while the circuit is open and still cooling down.
+        """
+        return self._state is not CircuitState.OPEN or time.monotonic() - self._opened_at >= self._policy.reset_timeout
+
+    def before_call(self) -> None:
+        """
+        Admit a call or reject it.
+
+        :raises CircuitOpenError: If the circuit is open or all half-open probe slots are taken.
+        """
+        if self._state is CircuitState.OPEN:
+            if time.monotonic() - self._opened_at < self._policy.reset_timeout:
+                raise CircuitOpenError(f"Circuit for {self._name} is open.")
+            self._transition(CircuitState.HALF_OPEN)
+            self._probes = 0
+        if self._state is CircuitState.HALF_OPEN:
+            if self._probes >= self._policy.half_open_max_calls:
+                raise CircuitOpenError(f"Circuit for {self._name} is half-open and already probing.")
+            self._probes += 1
+
+    def record_success(self) -> None:
+        self._failures = 0
+        if self._state is not CircuitState.CLOSED:
+            self._transition(CircuitState.CLOSED)
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._state is CircuitState.HALF_OPEN or self._failures >= self._policy.failure_threshold:
+            self._opened_at = time.monotonic()
+            if self._state is not CircuitState.OPEN:
+                self._transition(CircuitState.OPEN)
+
+    def record_ignored(self) -> None:
+        """
+        Release a half-open probe slot after a call that neither proved nor disproved provider health.
+        """
+        if self._state is CircuitState.HALF_OPEN:
+            self._probes = max(0, self._probes - 1)
+
+    def _transition(self, state: CircuitState) -> None:
+        self._logger.warning("Circuit for %s changed from %s to %s", self._name, self._state, state)
+        self._state = state
+
+
+class AiResilience(WithLogger):
+    """
+    Apply per-call deadlines, bounded retries with exponential backoff and full jitter, and a per-provider circuit
+    breaker to AI provider calls.
+
+    Only errors accepted by the caller's retry predicate are retried and count as breaker failures; other errors (for
+    example invalid requests) propagate immediately. Retries are counted in ``ai.retries`` and calls rejected by an
+    open circuit in ``ai.circuit_rejected``.
+    """
+
+    @inject
+    def __init__(self, settings: AiResilienceSettings, metrics: MetricsRegistry) -> None:
+        self._settings = settings
+        self._metrics = metrics
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    def policy_for(self, provider_name: str) -> ResiliencePolicy:
+        return self._settings.policy_for(provider_name)
+
+    def is_available(self, provider_name: str) -> bool:
+        """
+        Report whether calls to the provider would currently pass its circuit breaker.
+        """
+        breaker = self._breakers.get(provider_name)
+        return breaker is None or breaker.available
+
+    async def call[T](self, provider_name: str, func: Callable[[], Awaitable[T]], is_retryable: RetryPredicate) -> T:
+        """
+        Run ``func`` under the provider's resilience policy.
+
+        :param provider_name: Registry name of the provider.
+        :param func: Performs one attempt.
+        :param is_retryable: Decides whether an error is transient.
+        :raises CircuitOpenError: If the provider's circuit rejects the call.
+        :raises TimeoutError: If the last attempt exceeded its timeout.
+        :returns: Result of the first successful attempt.
+        """
+        if not self._settings.enabled:
+            return await func()
+
+        policy = self.policy_for(provider_name)
+        breaker = self._get_breaker(provider_name)
+        deadline = time.monotonic() + policy.deadline
+        attempt = 0
+        while True:
+            attempt += 1
+            self._admit(provider_name, breaker)
+            try:
+                async with asyncio.timeout(self._attempt_timeout(policy, deadline)):
+                    result = await func()
+            except Exception as exc:  # noqa: BLE001 - the retry predicate classifies it and non-retryable errors re-raise
+                await self._handle_failure(provider_name, policy, breaker, exc, is_retryable, attempt, deadline)
+                continue
+            except BaseException:
+                # Cancellation says nothing about the provider, so hand a half-open probe slot back.
+                breaker.record_ignored()
+                raise
+            breaker.record_success()
+            return result
+
+    async def stream(
+        self,
+        provider_name: str,
+        func: Callable[[], AsyncGenerator[str]],
+        is_retryable: RetryPredicate,
+    ) -> AsyncGenerator[str]:
+        """
+        Stream the output of ``func`` under the provider's resilience policy.
+
+        Each chunk must arrive within ``attempt_timeout`` and the whole stream must end before the policy ``deadline``,
+        even once output has been yielded. Failed attempts are retried only while nothing has been yielded yet, so
+        callers never see duplicated output.
+
+        :param provider_name: Registry name of the provider.
+        :param func: Starts one streaming attempt.
+        :param is_retryable: Decides whether an error is transient.
+        :raises CircuitOpenError: If the provider's circuit rejects the call.
+        :returns: Async generator over the chunks of the successful attempt.
+        """
+        if not self._settings.enabled:
+            async with aclosing(func()) as chunks:
+                async for chunk in chunks:
+                    yield chunk
+            return
+
+        policy = self.policy_for(provider_name)
+        breaker = self._get_breaker(provider_name)
+        deadline = time.monotonic() + policy.deadline
+        attempt = 0
+        while True:
+            attempt += 1
+            self._admit(provider_name, breaker)
+            produced = False
+            try:
+                async with aclosing(func()) as chunks:
+                    while True:
+                        try:
+                            async with asyncio.timeout(self._attempt_timeout(policy, deadline)):
+                                chunk = await anext(chunks)
+                        except StopAsyncIteration:
+                            break
+                        produced = True
+                        yield chunk
+            except Exception as exc:
+                if produced:
+                    if is_retryable(exc):
+                        breaker.record_failure()
+                    else:
+                        breaker.record_ignored()
+                    raise
+                await self._handle_failure(provider_name, policy, breaker, exc, is_retryable, attempt, deadline)
+                continue
+            except BaseException:
+                # Cancellation, or the consumer closing the stream early, says nothing about the provider.
+                breaker.record_ignored()
+                raise
+            breaker.record_success()
+            return
+
+    def _admit(self, provider_name: str, breaker: CircuitBreaker) -> None:
+        try:
+            breaker.before_call()
+        except CircuitOpenError:
+            self._metrics.counter("ai.circuit_rejected", provider=provider_name).inc()
+            raise
+
+    async def _handle_failure(
+        self,
+        provider_name: str,
+        policy: ResiliencePolicy,
+        breaker: CircuitBreaker,
+        exc: Exception,
+        is_retryable: RetryPredicate,
+        attempt: int,
+        deadline: float,
+    ) -> None:
+        """
+        Record a failed attempt and sleep before the next one.
+
+        :raises Exception: Re-raises ``exc`` when it is not retryable or the retry budget is exhausted.
+        """
+        if not is_retryable(exc):
+            breaker.record_ignored()
+            raise exc
+        breaker.record_failure()
+        # Jitter only spreads retries out over time; it does not need a cryptographic generator.
+        delay = random.uniform(0, min(policy.backoff_max, policy.backoff_base * 2 ** (attempt - 1)))  # noqa: S311
+        if attempt >= policy.max_attempts or time.monotonic() + delay >= deadline:
+            raise exc
+        self._logger.warning(
+            "%s call failed (attempt %d/%d), retrying in %.2f seconds: %r",
+            provider_name,
+            attempt,
+            policy.max_attempts,
+            delay,
+            exc,
+        )
+        self._metrics.counter("ai.retries", provider=provider_name).inc()
+        await asyncio.sleep(delay)
+
+    @staticmethod
+    def _attempt_timeout(policy: ResiliencePolicy, deadline: float) -> float:
+        return max(0.0, min(policy.attempt_timeout, deadline - time.monotonic()))
+
+    def _get_breaker(self, provider_name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(provider_name)
+        if breaker is None:
+            breaker = CircuitBreaker(provider_name, self.policy_for(provider_name))
+            self._breakers[provider_name] = breaker
+        return breaker
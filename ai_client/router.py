@@ -0,0 +1,446 @@
+__all__ = ["AiRoute", "AiRouter", "RoutedAiClient"]
+
+import asyncio
+import math
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, AsyncGenerator, AsyncIterator, Awaitable, Callable, Sequence
+
+from injector import inject
+
+from errors import ConfigError
+from logging_config.common import WithLogger
+from settings.ai_client.router_settings import AiRouterSettings
+from utils.metrics import MetricsRegistry
+
+from .base import AiClientRegistry, BaseAiClient
+from .batch import AiBatchJob, AiBatchRunner
+from .limiter import RateLimitTimeout
+from .messages import MessageChain
+
+if TYPE_CHECKING:
+    from database.models import ChatConfiguration, Model, ModelConfiguration
+
+
+@dataclass(frozen=True, slots=True)
+class AiRoute:
+    """A provider client together with the model configuration it is called with."""
+
+    client: BaseAiClient[Any]
+    model_configuration: ModelConfiguration
+
+    @property
+    def key(self) -> str:
+        return f"{self.client.get_name()}/{self.client.resolve_model_name(self.model_configuration)}"
+
+
+class _RouteStats:
+    """
+    Outcomes and latencies of the recent calls of one route.
+
+    Samples older than ``max_age`` seconds expire, so a route demoted after an incident falls back to "not enough
+    samples" once it has not been called for a while instead of being judged by its old errors forever.
+    """
+
+    def __init__(self, window: int, max_age: float) -> None:
+        self._max_age = max_age
+        self._outcomes: deque[tuple[float, bool]] = deque(maxlen=window)
+        self._latencies: deque[tuple[float, float]] = deque(maxlen=window)
+        self.last_used = 0.0
+
+    def record_outcome(self, ok: bool) -> None:
+        self._outcomes.append((time.monotonic(), ok))
+
+    def record_latency(self, latency: float) -> None:
+        self._latencies.append((time.monotonic(), latency))
+
+    def outcome_count(self) -> int:
+        self._expire()
+        return len(self._outcomes)
+
+    def error_rate(self) -> float:
+        self._expire()
+        if not self._outcomes:
+            return 0.0
+        return sum(not ok for _, ok in self._outcomes) / len(self._outcomes)
+
+    def latency_quantile(self, q: float, min_samples: int) -> float | None:
+        self._expire()
+        if len(self._latencies) < min_samples:
+            return None
+        ordered = sorted(latency for _, latency in self._latencies)
+        return ordered[min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))]
+
+    def _expire(self) -> None:
+        horizon = time.monotonic() - self._max_age
+        for samples in (self._outcomes, self._latencies):
+            while samples and samples[0][0] < horizon:
+                samples.popleft()
+
+
+@dataclass(slots=True)
+class _OpenedStream:
+    chunks: AsyncGenerator[str]
+    first: str | None
+    started: float
+
+
+class AiRouter(WithLogger):
+    """
+    Route AI calls of a chat across its primary model and the ordered fallbacks of its model configuration.
+
+    Every call records latency and outcome per ``provider/model`` route; :meth:`order` uses these live statistics to
+    skip unhealthy routes and to prefer a faster one when the primary's p95 latency is clearly worse. Calls fail over
+    to the next route on error and, with ``hedge_delay`` configured, race a second route against a slow first one; a
+    cancelled hedge loser records the time it ran as a latency sample. Samples expire after ``stats_max_age`` and a
+    demoted route gets one call every ``probe_interval`` seconds, so a recovered primary is promoted again.
+    Latencies are exported as ``ai.route_latency``, outcomes as ``ai.route_calls`` and probes as ``ai.route_probes``.
+    """
+
+    @inject
+    def __init__(
+        self,
+        registry: AiClientRegistry,
+        settings: AiRouterSettings,
+        metrics: MetricsRegistry,
+        batch_runner: AiBatchRunner,
+    ) -> None:
+        self._registry = registry
+        self._settings = settings
+        self._metrics = metrics
+        self._batch_runner = batch_runner
+        self._stats: dict[str, _RouteStats] = {}
+
+    def resolve(self, record: ChatConfiguration) -> RoutedAiClient:
+        """
+        Build the routed client of a chat.
+
+        :param record: Chat configuration specifying the model and its fallbacks.
+        :raises ConfigError: If the chat has no model configuration or its primary provider is not registered.
+        :returns: Client that dispatches calls over the chat's routes.
+        """
+        model_configuration = record.model_configuration
+        if model_configuration is None:
+            raise ConfigError("Chat has no model configuration attached.")
+
+        routes = [AiRoute(self._client_for(model_configuration.model), model_configuration)]
+        for fallback in model_configuration.fallbacks:
+            model = fallback.model
+            if fallback.deleted or model.deleted or not model.active:
+                continue
+            try:
+                client = self._client_for(model)
+            except ConfigError as exc:
+                self._logger.warning("Skipping fallback model %s: %s", model.name, exc)
+                continue
+            routes.append(AiRoute(client, model_configuration.with_model(model)))
+        return RoutedAiClient(self, routes)
+
+    def order(self, routes: list[AiRoute]) -> list[AiRoute]:
+        """
+        Order routes for a call: the preferred healthy route first, then the remaining healthy routes in configured
+        order, then unhealthy routes as a last resort.
+
+        A route configured ahead of the preferred one that has not been called for ``probe_interval`` seconds is moved
+        to the front instead, so that its statistics are refreshed; the other routes still back the probe up.
+        """
+        ordered = self._rank(routes)
+        probe = self._probe(routes, ordered[0]) if ordered else None
+        if probe is None:
+            return ordered
+        return [probe, *(route for route in ordered if route is not probe)]
+
+    def _rank(self, routes: list[AiRoute]) -> list[AiRoute]:
+        healthy = [route for route in routes if self._is_healthy(route)]
+        unhealthy = [route for route in routes if route not in healthy]
+        if len(healthy) < 2:
+            return healthy + unhealthy
+
+        latencies = {route.key: self._p95(route) for route in healthy}
+        best = min(latencies.values())
+        if best == math.inf:
+            return healthy + unhealthy
+        limit = best * self._settings.latency_tolerance
+        preferred = next(route for route in healthy if latencies[route.key] <= limit)
+        return [preferred, *(route for route in healthy if route is not preferred), *unhealthy]
+
+    async def generate(self, routes: list[AiRoute], message_chain: MessageChain) -> str:
+        """
+        Produce a complete reply, failing over and hedging across ``routes``.
+
+        :raises Exception: The error of the last route when every route failed.
+        """
+
+        async def start(route: AiRoute) -> str:
+            started = time.monotonic()
+            try:
+                result = await route.client.generate(message_chain, route.model_configuration)
+            except Exception as exc:
+                self._record_failure(route, exc)
+                raise
+            self._record(route, time.monotonic() - started)
+            return result
+
+        _, result = await self._race(self.order(routes), start)
+        return result
+
+    async def generate_stream(self, routes: list[AiRoute], message_chain: MessageChain) -> AsyncIterator[str]:
+        """
+        Stream a reply, failing over and hedging across ``routes`` until the first chunk arrives.
+
+        Once a route produced its first chunk the call is committed to it; later failures propagate.
+        """
+
+        async def start(route: AiRoute) -> _OpenedStream:
+            started = time.monotonic()
+            chunks = route.client.generate_stream(message_chain, route.model_configuration)
+            try:
+                first = await anext(chunks, None)
+            except BaseException as exc:
+                await chunks.aclose()
+                if isinstance(exc, Exception):
+                    self._record_failure(route, exc)
+                raise
+            return _OpenedStream(chunks=chunks, first=first, started=started)
+
+        async def discard(opened: _OpenedStream) -> None:
+            await opened.chunks.aclose()
+
+        route, opened = await self._race(self.order(routes), start, discard)
+        try:
+            if opened.first is not None:
+                yield opened.first
+                async for chunk in opened.chunks:
+                    yield chunk
+        except Exception as exc:
+            self._record_failure(route, exc)
+            raise
+        finally:
+            await opened.chunks.aclose()
+        self._record(route, time.monotonic() - opened.started)
+
+    def submit_batch(
+        self, routes: list[AiRoute], chains: Sequence[MessageChain], chat_id: int | None = None
+    ) -> AiBatchJob:
+        """
+        Submit conversations as a background batch whose calls fail over across ``routes`` like :meth:`generate`.
+
+        :param chat_id: Chat the calls are made for.
+        :returns: Job handle whose :meth:`AiBatchJob.results` lists the outcomes in submission order.
+        """
+
+        async def generate(chain: MessageChain) -> str:
+            return await self.generate(routes, chain)
+
+        return self._batch_runner.enqueue(routes[0].client.get_name(), generate, chains, chat_id)
+
+    async def _race[T](
+        self,
+        routes: list[AiRoute],
+        start: Callable[[AiRoute], Awaitable[T]],
+        discard: Callable[[T], Awaitable[None]] | None = None,
+    ) -> tuple[AiRoute, T]:
+        remaining = list(routes)
+        pending: dict[asyncio.Future[T], AiRoute] = {}
+        launched: dict[asyncio.Future[T], float] = {}
+        last_error: BaseException | None = None
+        hedged = False
+        won = False
+
+        def launch() -> None:
+            route = remaining.pop(0)
+            task = asyncio.ensure_future(start(route))
+            pending[task] = route
+            launched[task] = time.monotonic()
+
+        launch()
+        try:
+            while pending:
+                timeout = self._settings.hedge_delay if remaining and not hedged else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    self._metrics.counter("ai.hedged", route=remaining[0].key).inc()
+                    launch()
+                    continue
+
+                winner: tuple[AiRoute, T] | None = None
+                for task in done:
+                    route = pending.pop(task)
+                    error = task.exception()
+                    if error is not None:
+                        last_error = error
+                        self._logger.warning("AI route %s failed, trying the next one: %r", route.key, error)
+                    elif winner is None:
+                        winner = (route, task.result())
+                    elif discard is not None:
+                        await discard(task.result())
+                if winner is not None:
+                    won = True
+                    return winner
+                if not pending and remaining:
+                    launch()
+            if last_error is None:
+                raise ConfigError("No AI route is configured.")
+            raise last_error
+        finally:
+            now = time.monotonic()
+            for task, route in pending.items():
+                if task.cancel() and won:
+                    # The loser would have taken at least this long; without the sample a route that keeps losing
+                    # the race never looks slow.
+                    self._record_cancelled(route, now - launched[task])
+            results = await asyncio.gather(*pending, return_exceptions=True)
+            if discard is not None:
+                for result in results:
+                    if not isinstance(result, BaseException):
+                        await discard(result)
+
+    def _client_for(self, model: Model) -> BaseAiClient[Any]:
+        """
+        Return the registered client serving ``model``.
+
+        :raises ConfigError: If the model has no provider or the provider is not registered.
+        """
+        provider = model.provider
+        if provider is None:
+            raise ConfigError("Configured model has no provider assigned.")
+        if not self._registry.contains(provider.name):
+            raise ConfigError(f"AI provider '{provider.name}' is not registered.")
+        return self._registry.get(provider.name)
+
+    def _probe(self, routes: list[AiRoute], preferred: AiRoute) -> AiRoute | None:
+        interval = self._settings.probe_interval
+        if interval is None:
+            return None
+        now = time.monotonic()
+        for route in routes:
+            if route is preferred:
+                return None
+            stats = self._get_stats(route)
+            # An open circuit already lets a trial call through once it cools down.
+            if route.client.is_available() and now - stats.last_used >= interval:
+                stats.last_used = now
+                self._metrics.counter("ai.route_probes", route=route.key).inc()
+                return route
+        return None
+
+    def _is_healthy(self, route: AiRoute) -> bool:
+        if not route.client.is_available():
+            return False
+        stats = self._get_stats(route)
+        if stats.outcome_count() < self._settings.min_samples:
+            return True
+        return stats.error_rate() <= self._settings.max_error_rate
+
+    def _p95(self, route: AiRoute) -> float:
+        p95 = self._get_stats(route).latency_quantile(0.95, self._settings.min_samples)
+        # Never prefer a route without enough samples over one that is known to be fast enough.
+        return math.inf if p95 is None else p95
+
+    def _record(self, route: AiRoute, latency: float | None) -> None:
+        stats = self._get_stats(route)
+        stats.record_outcome(latency is not None)
+        stats.last_used = time.monotonic()
+        self._metrics.counter("ai.route_calls", route=route.key, result="ok" if latency is not None else "error").inc()
+        if latency is not None:
+            stats.record_latency(latency)
+            self._metrics.summary("ai.route_latency", route=route.key).observe(latency)
+
+    def _record_cancelled(self, route: AiRoute, elapsed: float) -> None:
+        stats = self._get_stats(route)
+        stats.record_latency(elapsed)
+        stats.last_used = time.monotonic()
+        self._metrics.counter("ai.route_calls", route=route.key, result="cancelled").inc()
+
+    def _record_failure(self, route: AiRoute, error: Exception) -> None:
+        # The local limiter rejecting a call says nothing about the provider behind the route.
+        if not isinstance(error, RateLimitTimeout):
+            self._record(route, None)
+
+    def _get_stats(self, route: AiRoute) -> _RouteStats:
+        stats = self._stats.get(route.key)
+        if stats is None:
+            stats = _RouteStats(self._settings.stats_window, self._settings.stats_max_age)
+            self._stats[route.key] = stats
+        return stats
+
+
+class RoutedAiClient:
+    """
+    Chat-bound facade over :class:`AiRouter` exposing the reply API of :class:`BaseAiClient`.
+
+    :attr:`calls` counts the requests dispatched through this instance, which lets callers account for the provider
+    calls a multi-step operation such as a map-reduce summary made.
+    """
+
+    def __init__(self, router: AiRouter, routes: list[AiRoute]) -> None:
+        self._router = router
+        self._routes = routes
+        self._calls = 0
+
+    @property
+    def routes(self) -> list[AiRoute]:
+        return list(self._routes)
+
+    @property
+    def calls(self) -> int:
+        return self._calls
+
+    def get_name(self) -> str:
+        return self._routes[0].client.get_name()
+
+    def error_reply(self, error: Exception) -> str:
+        return self._routes[0].client.error_reply(error)
+
+    async def generate(self, message_chain: MessageChain) -> str:
+        """
+        Produce a complete reply over the chat's routes.
+
+        :raises Exception: The error of the last route when every route failed.
+        """
+        self._calls += 1
+        return await self._router.generate(self._routes, message_chain)
+
+    def submit_batch(self, chains: Sequence[MessageChain], chat_id: int | None = None) -> AiBatchJob:
+        """
+        Complete conversations as a background batch over the chat's routes.
+
+        :param chat_id: Chat the calls are made for.
+        :returns: Job handle whose :meth:`AiBatchJob.results` lists the outcomes in submission order.
+        """
+        self._calls += len(chains)
+        return self._router.submit_batch(self._routes, chains, chat_id)
+
+    async def generate_stream(self, message_chain: MessageChain) -> AsyncIterator[str]:
+        """
+        Stream a reply over the chat's routes.
+
+        :raises Exception: The error of the last route when every route failed.
+        """
+        self._calls += 1
+        async for delta in self._router.generate_stream(self._routes, message_chain):
+            yield delta
+
+    async def answer(self, message_chain: MessageChain) -> str:
+        """
+        Generate a reply, turning a failure of every route into the primary provider's error reply.
+        """
+        try:
+            return await self.generate(message_chain)
+        except Exception as error:  # noqa: BLE001 - reply boundary, error_reply logs the failure with its traceback
+            return self.error_reply(error)
+
+    async def stream(self, message_chain: MessageChain) -> AsyncIterator[str]:
+        """
+        Stream a reply, turning a failure of every route into the primary provider's error reply.
+        """
+        produced = False
+        try:
+            async for delta in self.generate_stream(message_chain):
+                produced = True
+                yield delta
+        except Exception as error:  # noqa: BLE001 - reply boundary, error_reply logs the failure with its traceback
+            reply = self.error_reply(error)
+            yield f"\n\n{reply}" if produced else reply
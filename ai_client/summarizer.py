@@ -0,0 +1,317 @@
+__all__ = ["ConversationSummarizer", "HistoryBlock"]
+
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Final, Sequence
+
+from injector import inject
+
+from cache.rolling_summary_storage import RollingSummaryStorage
+from logging_config.common import WithLogger
+from settings.ai_client.summary_settings import AiSummarySettings
+from utils.metrics import MetricsRegistry
+
+from .dispatcher import AiDispatcher, AiPriority
+from .messages import AiMessage, AiRole, MessageChain
+from .router import RoutedAiClient
+from .tokens import TokenEstimator
+
+
+@dataclass(frozen=True, slots=True)
+class HistoryBlock:
+    """
+    Messages of one fixed window of a chat history.
+
+    Only complete blocks are summarized once and reused; incomplete ones (the newest block that is still growing, or
+    an older block cut by the requested limit) are summarized on every request.
+    """
+
+    messages: list[AiMessage]
+    complete: bool
+
+
+class ConversationSummarizer(WithLogger):
+    """
+    Summarize chat histories of any length with bounded request sizes.
+
+    A history that fits into ``chunk_tokens`` is summarized with a single streamed request. Longer histories are split
+    into consecutive token-bounded chunks that are summarized concurrently (map), after which the partial summaries are
+    combined (reduce). When the partial summaries themselves exceed ``chunk_tokens`` they are reduced in further
+    concurrent rounds; only the last request is streamed to the caller. Every request goes through the routed client
+    and therefore the provider limiter; in the background priority class (the summary precomputation) the chunks are
+    submitted as a batch instead. The number of chunks per summary is exported as ``ai.summary_chunks`` and the
+    time spent before the final request as ``ai.summary_map_seconds``.
+    """
+
+    # TODO: Pull the summary/system prompt from chat-level configuration instead of hard-coding English text.
+    #  Different groups will want localized or domain-specific summaries.
+    SUMMARY_INSTRUCTIONS: Final[str] = (
+        "You are a helpful friend to assist. You need to go through the messages of the conversation "
+        "and summarize in general what has been discussed. Do not make up your own ideas. Be concise. "
+        "Do not include any personal opinion until you directly asked."
+    )
+    _MAP_INSTRUCTIONS: Final[str] = (
+        "The messages are one part of a longer conversation. Summarize only this part. Keep the names of the "
+        "participants, decisions and open questions, so that the summary can be combined with the other parts."
+    )
+    _REDUCE_INSTRUCTIONS: Final[str] = (
+        "The messages are summaries of consecutive parts of one conversation, oldest first. Combine them into a single "
+        "summary of the whole conversation without repeating yourself."
+    )
+
+    @inject
+    def __init__(
+        self,
+        settings: AiSummarySettings,
+        estimator: TokenEstimator,
+        storage: RollingSummaryStorage,
+        metrics: MetricsRegistry,
+    ) -> None:
+        self._settings = settings
+        self._estimator = estimator
+        self._storage = storage
+        self._metrics = metrics
+
+    @property
+    def max_messages(self) -> int:
+        return self._settings.max_messages
+
+    @property
+    def block_messages(self) -> int | None:
+        """Number of updates per rolling summary block, or ``None`` when rolling summaries are disabled."""
+        return self._settings.block_messages if self._settings.rolling_enabled else None
+
+    def split(self, messages: Sequence[AiMessage]) -> list[list[AiMessage]]:
+        """
+        Split messages into consecutive chunks of at most ``chunk_tokens`` tokens.
+
+        A single message larger than the limit forms a chunk of its own; the prompt budgeter truncates it if needed.
+
+        :param messages: Chronologically ordered messages.
+        :returns: Non-empty chunks in their original order.
+        """
+        chunks: list[list[AiMessage]] = []
+        current: list[AiMessage] = []
+        current_tokens = 0
+        for message in messages:
+            tokens = self._estimator.count_message(message)
+            if current and current_tokens + tokens > self._settings.chunk_tokens:
+                chunks.append(current)
+                current, current_tokens = [], 0
+            current.append(message)
+            current_tokens += tokens
+        if current:
+            chunks.append(current)
+        return chunks
+
+    async def summarize(
+        self,
+        client: RoutedAiClient,
+        history: Sequence[AiMessage],
+        instructions: str,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a summary of ``history``, turning failures into the primary provider's error reply.
+
+        :param client: Routed client of the chat.
+        :param history: Chronologically ordered conversation without system messages.
+        :param instructions: System prompt describing the expected summary.
+        :returns: Iterator over summary text deltas.
+        """
+        async for delta in self._with_error_reply(client, self._stream(client, history, instructions)):
+            yield delta
+
+    async def summarize_blocks(
+        self,
+        client: RoutedAiClient,
+        chat_id: int,
+        blocks: Sequence[HistoryBlock],
+        instructions: str,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a summary of a chat history split into fixed blocks, reusing stored summaries of complete blocks.
+
+        Complete blocks are summarized once and stored in :class:`RollingSummaryStorage` under a fingerprint of the
+        prompt and their content, so a repeated request only summarizes the incomplete blocks and combines the rest.
+        Histories of at most ``block_messages`` messages or without any complete block fall back to :meth:`summarize`.
+        Block lookups are counted in ``ai.summary_blocks`` by result. Failures are turned into the primary provider's
+        error reply.
+
+        :param client: Routed client of the chat.
+        :param chat_id: Identifier of the chat the history belongs to.
+        :param blocks: Chronologically ordered blocks.
+        :param instructions: System prompt describing the expected summary.
+        :returns: Iterator over summary text deltas.
+        """
+        deltas = self._stream_blocks(client, chat_id, blocks, instructions)
+        async for delta in self._with_error_reply(client, deltas):
+            yield delta
+
+    async def generate_blocks(
+        self,
+        client: RoutedAiClient,
+        chat_id: int,
+        blocks: Sequence[HistoryBlock],
+        instructions: str,
+    ) -> str:
+        """
+        Same as :meth:`summarize_blocks`, but returns the complete summary and lets failures propagate.
+
+        :raises Exception: The error of the failed provider call.
+        """
+        return "".join([delta async for delta in self._stream_blocks(client, chat_id, blocks, instructions)])
+
+    async def _stream(
+        self,
+        client: RoutedAiClient,
+        history: Sequence[AiMessage],
+        instructions: str,
+    ) -> AsyncIterator[str]:
+        chunks = self.split(history)
+        self._metrics.summary("ai.summary_chunks", provider=client.get_name()).observe(len(chunks))
+        if len(chunks) <= 1:
+            async for delta in client.generate_stream([self._system(instructions), *history]):
+                yield delta
+            return
+
+        started = time.monotonic()
+        summaries = await self._summarize_chunks(client, chunks, self._system(instructions, self._MAP_INSTRUCTIONS))
+        async for delta in self._reduce(client, summaries, instructions, started):
+            yield delta
+
+    async def _stream_blocks(
+        self,
+        client: RoutedAiClient,
+        chat_id: int,
+        blocks: Sequence[HistoryBlock],
+        instructions: str,
+    ) -> AsyncIterator[str]:
+        blocks = [block for block in blocks if block.messages]
+        history = [message for block in blocks for message in block.messages]
+        # A history no longer than one block is a single request anyway; storing block summaries would only add calls.
+        if len(history) <= self._settings.block_messages or not any(block.complete for block in blocks):
+            async for delta in self._stream(client, history, instructions):
+                yield delta
+            return
+
+        started = time.monotonic()
+        system = self._system(instructions, self._MAP_INSTRUCTIONS)
+        fingerprints = [self._fingerprint(system, block.messages) if block.complete else None for block in blocks]
+        stored = iter(await self._storage.get_many(chat_id, [item for item in fingerprints if item is not None]))
+        summaries = [next(stored) if fingerprint is not None else None for fingerprint in fingerprints]
+
+        missing = [position for position, summary in enumerate(summaries) if summary is None]
+        computed = await self._summarize_chunks(client, [blocks[position].messages for position in missing], system)
+        for position, summary in zip(missing, computed, strict=True):
+            summaries[position] = summary
+            fingerprint = fingerprints[position]
+            if fingerprint is not None:
+                await self._storage.store(chat_id, fingerprint, summary)
+
+        partial = sum(1 for fingerprint in fingerprints if fingerprint is None)
+        counts = {"hit": len(blocks) - len(missing), "miss": len(missing) - partial, "partial": partial}
+        for result, count in counts.items():
+            self._metrics.counter("ai.summary_blocks", provider=client.get_name(), result=result).inc(count)
+
+        async for delta in self._reduce(client, [summary or "" for summary in summaries], instructions, started):
+            yield delta
+
+    @staticmethod
+    async def _with_error_reply(client: RoutedAiClient, deltas: AsyncIterator[str]) -> AsyncIterator[str]:
+        produced = False
+        try:
+            async for delta in deltas:
+                produced = True
+                yield delta
+        except Exception as error:  # noqa: BLE001 - reply boundary, error_reply logs the failure with its traceback
+            reply = client.error_reply(error)
+            yield f"\n\n{reply}" if produced else reply
+
+    async def _reduce(
+        self,
+        client: RoutedAiClient,
+        summaries: list[str],
+        instructions: str,
+        started: float,
+    ) -> AsyncIterator[str]:
+        """
+        Combine partial summaries in concurrent rounds until they fit one request, then stream the final combination.
+        """
+        system = self._system(instructions, self._REDUCE_INSTRUCTIONS)
+        parts = self._as_parts(summaries)
+        while len(chunks := self.split(parts)) > 1:
+            self._logger.debug("Reducing %s partial summaries in %s chunks", len(parts), len(chunks))
+            parts = self._as_parts(await self._summarize_chunks(client, chunks, system))
+        self._metrics.summary("ai.summary_map_seconds", provider=client.get_name()).observe(time.monotonic() - started)
+        async for delta in client.generate_stream([system, *parts]):
+            yield delta
+
+    async def _summarize_chunks(
+        self,
+        client: RoutedAiClient,
+        chunks: list[list[AiMessage]],
+        system: AiMessage,
+    ) -> list[str]:
+        """
+        Summarize ``chunks`` concurrently and return the summaries in chunk order.
+
+        :raises Exception: The first chunk failure; the remaining requests are cancelled.
+        """
+        context = AiDispatcher.current()
+        if context.priority is AiPriority.BACKGROUND:
+            return await self._summarize_batch(client, [[system, *chunk] for chunk in chunks], context.chat_id)
+
+        semaphore = asyncio.Semaphore(max(1, self._settings.max_parallel_chunks))
+
+        async def run(chunk: list[AiMessage]) -> str:
+            async with semaphore:
+                return (await client.generate([system, *chunk])).strip()
+
+        tasks = [asyncio.ensure_future(run(chunk)) for chunk in chunks]
+        try:
+            return list(await asyncio.gather(*tasks))
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    @staticmethod
+    async def _summarize_batch(client: RoutedAiClient, chains: list[MessageChain], chat_id: int | None) -> list[str]:
+        """
+        Summarize chunks as a batch of background calls.
+
+        :raises Exception: The error of the first failed chunk once the batch finished.
+        """
+        job = client.submit_batch(chains, chat_id)
+        try:
+            results = await job.results()
+        finally:
+            job.cancel()
+        summaries = []
+        for result in results:
+            if result.error is not None:
+                raise result.error
+            summaries.append((result.text or "").strip())
+        return summaries
+
+    @staticmethod
+    def _as_parts(summaries: Sequence[str]) -> list[AiMessage]:
+        return [
+            AiMessage(role=AiRole.USER, content=f"Part {position}:\n{summary}")
+            for position, summary in enumerate(summaries, start=1)
+        ]
+
+    @staticmethod
+    def _fingerprint(system: AiMessage, messages: Sequence[AiMessage]) -> str:
+        digest = hashlib.sha256()
+        for message in (system, *messages):
+            for field in (message.role.value, message.name or "", message.content):
+                digest.update(field.encode("utf-8"))
+                digest.update(b"\x00")
+        return digest.hexdigest()
+
+    @staticmethod
+    def _system(*instructions: str) -> AiMessage:
+        return AiMessage(role=AiRole.SYSTEM, content="\n\n".join(instructions))
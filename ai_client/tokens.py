@@ -0,0 +1,148 @@
+__all__ = ["MessageBudgeter", "TokenEstimator"]
+
+import math
+from dataclasses import replace
+from typing import Final, Sequence
+
+from injector import inject
+
+from logging_config.common import WithLogger
+from settings.ai_client.budget_settings import AiBudgetSettings
+from utils.metrics import MetricsRegistry
+
+from .messages import AiMessage, AiRole
+
+
+class TokenEstimator:
+    """
+    Estimate token counts with a calibrated character heuristic.
+
+    ASCII characters average ``ascii_chars_per_token`` characters per token, while other scripts tokenize much denser.
+    Non-ASCII characters are weighed by the extra bytes of their UTF-8 encoding, which counts three- and four-byte
+    characters (CJK, emoji) more heavily, matching their typical token cost without iterating characters in Python.
+    Both parts of mixed text are counted at their own rate.
+    """
+
+    @inject
+    def __init__(self, settings: AiBudgetSettings) -> None:
+        self._settings = settings
+
+    def count_text(self, text: str) -> int:
+        if not text:
+            return 0
+        ascii_chars = len(text.encode("ascii", "ignore"))
+        non_ascii = len(text.encode("utf-8")) - len(text)
+        return math.ceil(
+            ascii_chars / self._settings.ascii_chars_per_token + non_ascii / self._settings.non_ascii_chars_per_token
+        )
+
+    def count_message(self, message: AiMessage) -> int:
+        tokens = self._settings.message_overhead_tokens + self.count_text(message.content)
+        if message.name:
+            tokens += self.count_text(message.name)
+        return tokens
+
+    def count_messages(self, messages: Sequence[AiMessage]) -> int:
+        return sum(self.count_message(message) for message in messages)
+
+
+class MessageBudgeter(WithLogger):
+    """
+    Fit a prompt into the model's context window minus the completion budget.
+
+    System messages are always kept and placed first. The remaining turns are kept newest first for as long as they
+    fit; older turns are dropped. When even the newest turn does not fit, its middle is cut out. Dropped and truncated
+    messages are counted in ``ai.budget_dropped_messages`` and ``ai.budget_truncated_messages``.
+    """
+
+    _TRUNCATION_MARKER: Final[str] = "\n[…]\n"
+
+    @inject
+    def __init__(self, settings: AiBudgetSettings, estimator: TokenEstimator, metrics: MetricsRegistry) -> None:
+        self._settings = settings
+        self._estimator = estimator
+        self._metrics = metrics
+
+    @property
+    def estimator(self) -> TokenEstimator:
+        return self._estimator
+
+    def input_budget(self, provider_name: str, model: str, max_output_tokens: int) -> int:
+        """
+        Tokens available for the prompt of a call.
+
+        :param provider_name: Registry name of the provider.
+        :param model: Provider model identifier.
+        :param max_output_tokens: Completion budget reserved within the context window.
+        :returns: Prompt token budget.
+        """
+        context = self._settings.context_tokens(provider_name, model)
+        budget = int(context * (1 - self._settings.safety_margin)) - max_output_tokens
+        if self._settings.max_input_tokens is not None:
+            budget = min(budget, self._settings.max_input_tokens)
+        return max(0, budget)
+
+    def fit(
+        self,
+        messages: Sequence[AiMessage],
+        *,
+        provider_name: str,
+        model: str,
+        max_output_tokens: int,
+    ) -> list[AiMessage]:
+        """
+        Lay out ``messages`` with system messages first and trim the oldest turns to the prompt budget of a call.
+
+        Turns are dropped in whole blocks of ``trim_block_messages`` counted from the start of the chain, so the first
+        kept turn, and with it the prompt prefix, only moves once per block as a conversation grows. This keeps
+        provider-side prefix caches warm.
+
+        :param messages: Chronologically ordered messages including system messages.
+        :param provider_name: Registry name of the provider.
+        :param model: Provider model identifier.
+        :param max_output_tokens: Completion budget reserved within the context window.
+        :returns: System messages followed by the turns that fit, each group in its original order.
+        """
+        system = [message for message in messages if message.role is AiRole.SYSTEM]
+        turns = [message for message in messages if message.role is not AiRole.SYSTEM]
+        if not self._settings.enabled or not turns:
+            return [*system, *turns]
+
+        remaining = self.input_budget(provider_name, model, max_output_tokens) - self._estimator.count_messages(system)
+        first_kept = len(turns)
+        for position in range(len(turns) - 1, -1, -1):
+            cost = self._estimator.count_message(turns[position])
+            if cost > remaining:
+                break
+            first_kept = position
+            remaining -= cost
+
+        if first_kept == len(turns):
+            self._metrics.counter("ai.budget_truncated_messages", provider=provider_name).inc()
+            kept = [self._truncate(turns[-1], remaining)]
+        else:
+            block = max(1, self._settings.trim_block_messages)
+            first_kept = min(len(turns) - 1, math.ceil(first_kept / block) * block)
+            kept = turns[first_kept:]
+
+        dropped = len(turns) - len(kept)
+        if dropped:
+            self._logger.debug(
+                "Dropped %s oldest messages to fit the %s/%s prompt budget", dropped, provider_name, model
+            )
+            self._metrics.counter("ai.budget_dropped_messages", provider=provider_name).inc(dropped)
+        return [*system, *kept]
+
+    def _truncate(self, message: AiMessage, tokens: int) -> AiMessage:
+        """
+        Cut the middle of ``message`` so that it costs roughly ``tokens`` tokens.
+        """
+        content = message.content
+        content_tokens = max(1, self._estimator.count_text(content))
+        available = max(0, tokens - (self._estimator.count_message(message) - content_tokens))
+        keep = int(len(content) * available / content_tokens) - len(self._TRUNCATION_MARKER)
+        if keep <= 0:
+            return replace(message, content=self._TRUNCATION_MARKER.strip())
+        head = keep // 2
+        tail = content[len(content) - (keep - head) :]
+        return replace(message, content=content[:head] + self._TRUNCATION_MARKER + tail)
@@ -0,0 +1,155 @@
+__all__ = ["UNATTRIBUTED_CHAT_ID", "AiUsage", "UsageKey", "UsageRecorder", "UsageTotals"]
+
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Final, Mapping
+
+from injector import inject
+
+from settings.ai_client.usage_settings import AiUsageSettings
+from utils.metrics import MetricsRegistry
+
+from .dispatcher import AiDispatcher
+
+# Chat identifier recorded for calls made outside of any chat, e.g. batch jobs; Telegram never uses 0.
+UNATTRIBUTED_CHAT_ID: Final[int] = 0
+
+_TOKENS_PER_PRICE_UNIT: Final[float] = 1_000_000.0
+
+
+@dataclass(frozen=True, slots=True)
+class AiUsage:
+    """Token usage reported by a provider for one call."""
+
+    prompt_tokens: int = 0
+    cached_prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class UsageKey:
+    """Aggregation bucket of usage: one chat, provider model and UTC day."""
+
+    chat_id: int
+    provider: str
+    model: str
+    day: date
+
+
+@dataclass(slots=True)
+class UsageTotals:
+    """Usage summed over the calls of one :class:`UsageKey`."""
+
+    requests: int = 0
+    prompt_tokens: int = 0
+    cached_prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency_seconds: float = 0.0
+    max_latency_seconds: float = 0.0
+    cost: float = 0.0
+
+    def merge(self, other: UsageTotals) -> None:
+        self.requests += other.requests
+        self.prompt_tokens += other.prompt_tokens
+        self.cached_prompt_tokens += other.cached_prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.latency_seconds += other.latency_seconds
+        self.max_latency_seconds = max(self.max_latency_seconds, other.max_latency_seconds)
+        self.cost += other.cost
+
+
+class UsageRecorder:
+    """
+    Record provider-reported token usage, latency and cost.
+
+    Counts go to ``ai.prompt_tokens``, ``ai.cached_prompt_tokens``, and ``ai.completion_tokens`` per provider and model,
+    so the share of prompt tokens served from the provider's prefix cache can be read off directly; costs priced by
+    :class:`AiUsageSettings` go to ``ai.cost`` and call latencies to ``ai.call_latency``.
+
+    Every call is also added to in-memory totals per chat (taken from the :class:`AiDispatcher` context), provider
+    model and UTC day. :meth:`drain` hands the totals collected since the previous drain to the persistence layer,
+    which writes them in one batch instead of one row per call.
+    """
+
+    @inject
+    def __init__(self, settings: AiUsageSettings, metrics: MetricsRegistry) -> None:
+        self._settings = settings
+        self._metrics = metrics
+        self._pending: dict[UsageKey, UsageTotals] = {}
+
+    async def record(self, provider_name: str, model: str, usage: AiUsage, latency: float | None = None) -> None:
+        """
+        Record one provider call.
+
+        :param provider_name: Registry name of the provider.
+        :param model: Provider model identifier.
+        :param usage: Tokens reported by the provider.
+        :param latency: Duration of the call in seconds, when known.
+        """
+        self._metrics.counter("ai.prompt_tokens", provider=provider_name, model=model).inc(usage.prompt_tokens)
+        self._metrics.counter("ai.cached_prompt_tokens", provider=provider_name, model=model).inc(
+            usage.cached_prompt_tokens
+        )
+        self._metrics.counter("ai.completion_tokens", provider=provider_name, model=model).inc(usage.completion_tokens)
+        cost = self.cost(provider_name, model, usage)
+        if cost:
+            self._metrics.counter("ai.cost", provider=provider_name, model=model).inc(cost)
+        if latency is not None:
+            self._metrics.summary("ai.call_latency", provider=provider_name, model=model).observe(latency)
+
+        chat_id = AiDispatcher.current().chat_id
+        key = UsageKey(
+            chat_id=chat_id if chat_id is not None else UNATTRIBUTED_CHAT_ID,
+            provider=provider_name,
+            model=model,
+            day=datetime.now(timezone.utc).date(),
+        )
+        totals = self._pending.get(key)
+        if totals is None:
+            totals = self._pending[key] = UsageTotals()
+        totals.merge(
+            UsageTotals(
+                requests=1,
+                prompt_tokens=usage.prompt_tokens,
+                cached_prompt_tokens=usage.cached_prompt_tokens,
+                completion_tokens=usage.completion_tokens,
+                latency_seconds=latency or 0.0,
+                max_latency_seconds=latency or 0.0,
+                cost=cost,
+            )
+        )
+
+    def cost(self, provider_name: str, model: str, usage: AiUsage) -> float:
+        """
+        Price a call with the configured per-million-token prices.
+
+        :returns: Cost in USD, ``0`` for unpriced models.
+        """
+        prices = self._settings.prices_for(provider_name, model)
+        if prices is None:
+            return 0.0
+        cached_price = prices.cached_prompt if prices.cached_prompt is not None else prices.prompt
+        uncached_tokens = max(0, usage.prompt_tokens - usage.cached_prompt_tokens)
+        return (
+            uncached_tokens * prices.prompt
+            + usage.cached_prompt_tokens * cached_price
+            + usage.completion_tokens * prices.completion
+        ) / _TOKENS_PER_PRICE_UNIT
+
+    def drain(self) -> dict[UsageKey, UsageTotals]:
+        """
+        Take the totals recorded since the previous drain.
+        """
+        pending, self._pending = self._pending, {}
+        return pending
+
+    def restore(self, pending: Mapping[UsageKey, UsageTotals]) -> None:
+        """
+        Return drained totals that could not be persisted, merging them with usage recorded in the meantime.
+        """
+        for key, totals in pending.items():
+            current = self._pending.get(key)
+            if current is None:
+                self._pending[key] = totals
+            else:
+                current.merge(totals)
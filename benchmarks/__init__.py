@@ -0,0 +1,4 @@
+"""Performance benchmarks.
+
+Each module is a standalone script run with ``python -m benchmarks.<name>``; none of them is part of the test suite.
+"""
@@ -0,0 +1,80 @@
+"""Measure how a long summary affects the converted-message cache of :class:`GrokAiClient`.
+
+A chat keeps sending a 200-message conversation while a 5000-message history is summarized in between, as
+``#summarize`` does. The "before" variant stores the summary's messages in the cache like every other call; the
+"after" variant runs the summary in the summary priority class, whose calls only read the cache. For each variant the
+script reports the cache hit rate of the next conversation turn, its conversion time and the memory the cache retains
+according to ``tracemalloc``. ``tracemalloc`` does not see the upb arenas of the protobuf messages, so the retained
+memory is a lower bound.
+
+Usage::
+
+    python -m benchmarks.grok_message_cache [--history N] [--summary N] [--message-chars N]
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from contextlib import AbstractContextManager, nullcontext
+
+from injector import Injector
+
+from ai_client.dispatcher import AiDispatcher, AiPriority
+from ai_client.grok import GrokAiClient
+from ai_client.messages import AiMessage, AiRole
+
+
+def _messages(count: int, prefix: str, message_chars: int) -> list[AiMessage]:
+    messages = []
+    for position in range(count):
+        content = f"{prefix} message {position} ".ljust(message_chars, "x")
+        if position % 2:
+            messages.append(AiMessage(role=AiRole.ASSISTANT, content=content))
+        else:
+            messages.append(AiMessage(role=AiRole.USER, name=f"user{position % 7}", content=content))
+    return messages
+
+
+def _run(label: str, summary_context: AbstractContextManager[None], args: argparse.Namespace) -> None:
+    system = AiMessage(role=AiRole.SYSTEM, content="You are a helpful assistant.")
+    conversation = [system, *_messages(args.history, "chat", args.message_chars)]
+    summary = [system, *_messages(args.summary, "history", args.message_chars)]
+
+    gc.collect()
+    tracemalloc.start()
+    client = Injector().get(GrokAiClient)
+    client.convert_messages(conversation)
+    with summary_context:
+        client.convert_messages(summary)
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    turn = [*conversation, AiMessage(role=AiRole.USER, name="user1", content="and one more question")]
+    hits = sum((message.role, message.name, message.content) in client._message_cache for message in turn)
+    started = time.perf_counter()
+    client.convert_messages(turn)
+    elapsed = time.perf_counter() - started
+    print(
+        f"  {label:<6} next turn hit rate {hits / len(turn):7.2%}  conversion {elapsed * 1e6:8.0f} us  "
+        f"cache {len(client._message_cache):5} entries, {client._message_cache_chars / 1024:7.0f} KiB text  "
+        f"tracemalloc retained {retained / 1024:7.0f} KiB"
+    )
+
+
+def main(args: argparse.Namespace) -> None:
+    print(
+        f"{args.history}-message conversation, {args.summary}-message summary in between, "
+        f"{args.message_chars} characters per message"
+    )
+    _run("before", nullcontext(), args)
+    _run("after", AiDispatcher.context(AiPriority.SUMMARY), args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0] if __doc__ else None)
+    parser.add_argument("--history", type=int, default=200)
+    parser.add_argument("--summary", type=int, default=5000)
+    parser.add_argument("--message-chars", type=int, default=200)
+    main(parser.parse_args())
@@ -0,0 +1,75 @@
+"""Measure the provider request parameter cache of :class:`BaseAiClient`.
+
+Compares resolving the Grok request parameters of a stored model configuration on every call (build, convert and dump
+of the pydantic models, as before the cache) with :meth:`BaseAiClient.provider_kwargs`, which computes the cache key
+from the configuration's parameter values and returns a copy of the cached keyword arguments. A third run edits the
+configuration before every call to show that edits are picked up immediately, at the cost of a rebuild.
+
+Usage::
+
+    python -m benchmarks.model_params [--calls N] [--repeat N]
+"""
+
+import argparse
+import timeit
+from uuid import uuid4
+
+from injector import Injector
+
+from ai_client.grok import GrokAiClient
+from ai_client.model_params import BaseModelParams
+from database.models import Model, ModelConfiguration
+
+
+def _configuration() -> ModelConfiguration:
+    model = Model(id=uuid4(), name="grok-4-fast-reasoning", display_name="Grok 4 Fast")
+    return ModelConfiguration(
+        id=uuid4(),
+        model_id=model.id,
+        model=model,
+        system_message="You are a helpful assistant.",
+        temperature=0.7,
+        top_p=0.9,
+        max_output_tokens=1024,
+        stop_sequences=["</answer>"],
+    )
+
+
+def main(calls: int, repeat: int) -> None:
+    client = Injector().get(GrokAiClient)
+    configuration = _configuration()
+
+    def uncached() -> None:
+        params = BaseModelParams.build(
+            model=client.resolve_model_name(configuration),
+            system_message=client.resolve_system_message(configuration),
+            settings=client._settings,
+            model_config=configuration,
+        )
+        client.convert_params(params)
+
+    def cached() -> None:
+        client.provider_kwargs(configuration)
+
+    temperatures = iter(range(calls * repeat * 2))
+
+    def edited() -> None:
+        configuration.temperature = next(temperatures) / 1000
+        client.provider_kwargs(configuration)
+
+    print(f"best of {repeat} x {calls} calls")
+    for label, call in (
+        ("uncached build + convert", uncached),
+        ("cached provider_kwargs", cached),
+        ("edit + call", edited),
+    ):
+        best = min(timeit.repeat(call, number=calls, repeat=repeat)) / calls
+        print(f"  {label:<26} {best * 1e6:7.2f} us/call")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0] if __doc__ else None)
+    parser.add_argument("--calls", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    arguments = parser.parse_args()
+    main(arguments.calls, arguments.repeat)
@@ -0,0 +1,161 @@
+"""Compare the soft-delete filter of the ``do_orm_execute`` listener before and after the shared loader criteria.
+
+The "before" variant rebuilds ``with_loader_criteria(..., deleted IS false)`` for every SELECT, as the listener used
+to. The "after" variant is the listener from :mod:`database.connection`. Both run ``ChatService.is_allowed`` against
+the same seeded database and report the compiled-statement cache hit rate, the time per call and whether the query
+plans use the ``*_not_deleted`` partial indexes.
+
+Usage::
+
+    python -m benchmarks.soft_delete_filter [--database-url URL] [--iterations N]
+
+Without ``--database-url`` a temporary SQLite database is used; a PostgreSQL URL must point at an empty database.
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import event, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.engine.default import DefaultExecutionContext
+from sqlalchemy.engine.interfaces import CacheStats
+from sqlalchemy.orm import ORMExecuteState, Session, with_loader_criteria
+
+from database.connection import DatabaseConnection, _filter_deleted
+from database.models import Chat, ChatConfiguration, Model, ModelConfiguration, Provider
+from database.models.base import BaseModel, DeletableMixin
+from services.chat_service import ChatService
+from settings.database import DatabaseSettings
+
+_CHATS = 200
+
+
+def _filter_deleted_per_execution(execute_state: ORMExecuteState) -> None:
+    if not execute_state.is_select or execute_state.execution_options.get("include_deleted", False):
+        return
+    execute_state.statement = execute_state.statement.options(
+        with_loader_criteria(DeletableMixin, lambda cls: cls.deleted.is_(False), include_aliases=True)
+    )
+
+
+@contextmanager
+def _soft_delete_listener(listener: Callable[[ORMExecuteState], None]) -> Iterator[None]:
+    event.remove(Session, "do_orm_execute", _filter_deleted)
+    event.listen(Session, "do_orm_execute", listener, propagate=True)
+    try:
+        yield
+    finally:
+        event.remove(Session, "do_orm_execute", listener)
+        event.listen(Session, "do_orm_execute", _filter_deleted, propagate=True)
+
+
+class _StatementRecorder:
+    """Collect cache statistics and distinct SELECT statements from an engine."""
+
+    def __init__(self) -> None:
+        self.cache: Counter[CacheStats] = Counter()
+        self.statements: dict[str, Any] = {}
+
+    def __call__(
+        self,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: DefaultExecutionContext | None,
+        executemany: bool,
+    ) -> None:
+        del conn, cursor, executemany
+        if context is not None:
+            self.cache[context.cache_hit] += 1
+        if statement.lstrip().upper().startswith("SELECT"):
+            self.statements.setdefault(statement, parameters)
+
+
+async def _seed(connection: DatabaseConnection) -> None:
+    async with connection.engine.begin() as conn:
+        await conn.run_sync(BaseModel.metadata.create_all)
+    async with connection.write_session() as session:
+        provider = Provider(name="bench", display_name="Bench", is_default=True)
+        model = Model(provider=provider, name="bench-1", display_name="Bench 1", is_default=True)
+        session.add(model)
+        for chat_id in range(_CHATS):
+            chat = Chat(telegram_chat_id=chat_id, title=f"Chat {chat_id}", chat_type="group")
+            configuration = ModelConfiguration(model=model)
+            session.add(ChatConfiguration(chat=chat, allowed=chat_id % 2 == 0, model_configuration=configuration))
+        await session.commit()
+        # A few soft-deleted rows so the filter has something to hide.
+        stale = (await session.scalars(select(Chat).where(Chat.telegram_chat_id < _CHATS // 10))).all()
+        for chat in stale:
+            chat.mark_deleted()
+        await session.commit()
+
+
+async def _explain(connection: DatabaseConnection, statements: dict[str, Any]) -> list[str]:
+    dialect = connection.engine.dialect.name
+    prefix = "EXPLAIN QUERY PLAN " if dialect == "sqlite" else "EXPLAIN "
+    plans = []
+    async with connection.engine.connect() as conn:
+        for statement, parameters in statements.items():
+            rows = (await conn.exec_driver_sql(prefix + statement, parameters)).all()
+            plans.append(" / ".join(str(row[-1]) for row in rows))
+    return plans
+
+
+async def _measure(
+    connection: DatabaseConnection, service: ChatService, iterations: int
+) -> tuple[Counter[CacheStats], float, list[str]]:
+    recorder = _StatementRecorder()
+    event.listen(connection.engine.sync_engine, "before_cursor_execute", recorder)
+    try:
+        for chat_id in range(_CHATS):  # warm the compiled cache
+            await service.is_allowed(chat_id)
+        recorder.cache.clear()
+        started = time.perf_counter()
+        for iteration in range(iterations):
+            await service.is_allowed(iteration % _CHATS)
+        elapsed = time.perf_counter() - started
+    finally:
+        event.remove(connection.engine.sync_engine, "before_cursor_execute", recorder)
+    return recorder.cache, elapsed / iterations, await _explain(connection, recorder.statements)
+
+
+async def main(database_url: str | None, iterations: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        url = database_url or f"sqlite+aiosqlite:///{Path(directory) / 'bench.db'}"
+        connection = DatabaseConnection(DatabaseSettings(database_url=url))
+        try:
+            await _seed(connection)
+            service = ChatService(connection)
+            with _soft_delete_listener(_filter_deleted_per_execution):
+                before = await _measure(connection, service, iterations)
+            after = await _measure(connection, service, iterations)
+        finally:
+            await connection.dispose()
+
+    print(f"{connection.engine.dialect.name}, {iterations} ChatService.is_allowed calls")
+    for label, (cache, per_call, plans) in (("before", before), ("after", after)):
+        executions = sum(cache.values())
+        hit_rate = cache[CacheStats.CACHE_HIT] / executions if executions else 0.0
+        index_plans = sum("_not_deleted" in plan for plan in plans)
+        print(
+            f"  {label:<6} cache hit rate {hit_rate:7.2%}  {per_call * 1000:7.3f} ms/call  "
+            f"partial index used by {index_plans}/{len(plans)} distinct SELECTs"
+        )
+        for plan in plans:
+            print(f"           {plan}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0] if __doc__ else None)
+    parser.add_argument("--database-url", default=None, help="Async SQLAlchemy URL of an empty database.")
+    parser.add_argument("--iterations", type=int, default=2000)
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.database_url, arguments.iterations))
@@ -3,12 +3,17 @@ from typing import Sequence, cast
 from injector import Inject
 from telegram import Bot, Message, Update
 
-from ai_client.base import AiClientRegistry, AiMessage
+from ai_client.dispatcher import AiDispatcher, AiPriority
+from ai_client.messages import AiMessage
+from ai_client.quota import AiQuota
+from ai_client.router import AiRouter
+from bot_runtime.streaming_reply import StreamingReply
 from bot_types import Context
 from database.models import ChatConfiguration
 from logging_config.common import WithLogger
 from settings.bot import TelegramSettings
-from utils.message_chain import build_message_chain, is_same_user, reply_chain_to_records, resolve_ai_client
+from utils.message_chain import build_message_chain, is_same_user, reply_chain_to_records
+from utils.metrics import MetricsRegistry
 
 from .base import BaseHandler
 from .summarize_message import SummarizeMessageHandler
@@ -17,9 +22,17 @@ from .summarize_message import SummarizeMessageHandler
 class AiMessageHandler(WithLogger, BaseHandler):
     DEPENDENCIES = (SummarizeMessageHandler,)
 
-    def __init__(self, ai_registry: Inject[AiClientRegistry], bot_settings: Inject[TelegramSettings]) -> None:
-        self._ai_registry = ai_registry
+    def __init__(
+        self,
+        ai_router: Inject[AiRouter],
+        bot_settings: Inject[TelegramSettings],
+        metrics: Inject[MetricsRegistry],
+        quota: Inject[AiQuota],
+    ) -> None:
+        self._ai_router = ai_router
         self._bot_settings = bot_settings
+        self._metrics = metrics
+        self._quota = quota
 
     def can_handle(self, update: Update, context: Context, chat_settings: ChatConfiguration | None) -> bool:
         if chat_settings is None or chat_settings.allowed is not True:
@@ -38,10 +51,19 @@ class AiMessageHandler(WithLogger, BaseHandler):
             self._logger.warning("Chat settings missing while handling AI message; skipping response.")
             return
         message = cast(Message, update.message)
+        retry_after = await self._quota.acquire(
+            message.chat_id,
+            message.from_user.id if message.from_user else None,
+            chat_settings.model_configuration,
+        )
+        if retry_after > 0:
+            self._logger.info("AI quota exhausted for chat %s (message_id=%s)", message.chat_id, message.message_id)
+            await message.reply_text(self._quota.throttled_reply(retry_after))
+            return
         # TODO: Inject per-chat persona/model settings (system prompts, temperature overrides, etc.).
         #  We currently respect only `ChatConfiguration.model_configuration`, so other tweaks remain hard-coded.
         message_chain = await self._collect_reply_chain(message, context.bot)
-        ai_client = resolve_ai_client(self._ai_registry, chat_settings)
+        ai_client = self._ai_router.resolve(chat_settings)
         chat_ref = chat_settings.chat.telegram_chat_id if chat_settings.chat else "unknown"
 
         self._logger.info(
@@ -55,15 +77,20 @@ class AiMessageHandler(WithLogger, BaseHandler):
             chat_ref,
             message.message_id,
         )
-        model_configuration = chat_settings.model_configuration
-        answer = await ai_client.answer(message_chain, model_configuration)
+        reply = StreamingReply(
+            message,
+            edit_interval=self._bot_settings.telegram_stream_edit_interval,
+            metrics=self._metrics,
+            provider=ai_client.get_name(),
+        )
+        with AiDispatcher.context(AiPriority.INTERACTIVE, message.chat_id):
+            await reply.run(ai_client.stream(message_chain))
         self._logger.info(
             "Received AI response from %s for chat %s (message_id=%s)",
             ai_client.get_name(),
             chat_ref,
             message.message_id,
         )
-        await message.reply_text(answer)
 
     async def _collect_reply_chain(self, message: Message, bot: Bot) -> Sequence[AiMessage]:
         records = reply_chain_to_records(message)
@@ -1,15 +1,23 @@
 import re
-from typing import Final, Sequence
+from typing import AsyncIterator, Final
 
 from injector import Inject
-from telegram import Bot, Message, Update
+from telegram import Message, Update
 
-from ai_client.base import AiClientRegistry, AiMessage, AiRole
+from ai_client.dispatcher import AiDispatcher, AiPriority
+from ai_client.quota import AiQuota
+from ai_client.router import AiRouter
+from ai_client.summarizer import ConversationSummarizer
+from bot_runtime.streaming_reply import StreamingReply
 from bot_types import Context
+from cache.rolling_summary_storage import RollingSummaryStorage
 from cache.telegram_update_storage import TelegramUpdateRecord, TelegramUpdateStorage
 from database.models import ChatConfiguration
 from logging_config.common import WithLogger
-from utils.message_chain import build_message_chain, resolve_ai_client
+from settings.ai_client.quota_settings import AiQuotaSettings
+from settings.bot import TelegramSettings
+from utils.message_chain import build_history_blocks
+from utils.metrics import MetricsRegistry
 
 from .base import BaseHandler
 from .not_allowed import NotAllowedHandler
@@ -19,8 +27,13 @@ class SummarizeMessageHandler(WithLogger, BaseHandler):
     """
     Handle summarisation commands by aggregating chat history from Valkey.
 
-    Recent messages are compiled into an AI-ready prompt and sent to the configured provider to generate a concise
-    recap.
+    Recent messages are compiled into an AI-ready prompt and summarized by :class:`ConversationSummarizer`, which splits
+    long histories into chunks that are summarized in parallel before being combined into a concise recap. With rolling
+    summaries enabled the history is grouped into fixed blocks whose summaries are reused across commands. A summary
+    precomputed by :class:`SummaryScheduler` is answered instantly when no message arrived since it was prepared;
+    hits and misses are counted in ``ai.summary_precomputed``. Other summaries are charged ``summary_cost`` requests
+    of the chat and user quotas enforced by :class:`AiQuota`. Summary calls are dispatched in the summary priority
+    class, so mention replies of other chats and of the same chat are admitted first when the provider is saturated.
     """
 
     DEPENDENCIES = (NotAllowedHandler,)
@@ -29,15 +42,26 @@ class SummarizeMessageHandler(WithLogger, BaseHandler):
         "#підсумуй",
     )
     _COMMAND_PATTERN: Final[re.Pattern[str]] = re.compile(rf"^({'|'.join(_SUMMARY_KEYWORDS)})\s*(\d+)", re.IGNORECASE)
-    _MAX_MESSAGES: Final[int] = 200
 
     def __init__(
         self,
-        ai_registry: Inject[AiClientRegistry],
+        ai_router: Inject[AiRouter],
+        summarizer: Inject[ConversationSummarizer],
         update_storage: Inject[TelegramUpdateStorage],
+        summary_storage: Inject[RollingSummaryStorage],
+        bot_settings: Inject[TelegramSettings],
+        metrics: Inject[MetricsRegistry],
+        quota: Inject[AiQuota],
+        quota_settings: Inject[AiQuotaSettings],
     ) -> None:
-        self._ai_registry = ai_registry
+        self._ai_router = ai_router
+        self._summarizer = summarizer
         self._update_storage = update_storage
+        self._summary_storage = summary_storage
+        self._bot_settings = bot_settings
+        self._metrics = metrics
+        self._quota = quota
+        self._quota_settings = quota_settings
 
     def can_handle(self, update: Update, context: Context, chat_settings: ChatConfiguration | None) -> bool:
         del context
@@ -65,10 +89,11 @@ class SummarizeMessageHandler(WithLogger, BaseHandler):
             await telegram_message.reply_text("Invalid limit. You must specify a positive number.")
             return
 
-        if limit > self._MAX_MESSAGES:
-            limit = self._MAX_MESSAGES
+        max_messages = self._summarizer.max_messages
+        if limit > max_messages:
+            limit = max_messages
             await telegram_message.reply_text(
-                f"Limit is greater than the maximum allowed ({self._MAX_MESSAGES}). Using {limit}."
+                f"Limit is greater than the maximum allowed ({max_messages}). Using {limit}."
             )
 
         if chat_settings is None:
@@ -81,50 +106,75 @@ class SummarizeMessageHandler(WithLogger, BaseHandler):
             await telegram_message.reply_text("Chat metadata is missing. Cannot retrieve history.")
             return
 
-        try:
-            numeric_chat_id = int(chat_entity.telegram_chat_id)
-        except ValueError:
-            await telegram_message.reply_text("Chat identifier is invalid. Cannot retrieve history.")
-            return
-
-        history = await self._retrieve_history(chat_id=numeric_chat_id, limit=limit)
+        chat_id = chat_entity.telegram_chat_id
+        history = await self._retrieve_history(chat_id=chat_id, limit=limit, exclude_update_id=update.update_id)
         self._logger.info(
             "Retrieved %s cached messages for chat %s (limit=%s)",
             len(history),
             chat_ref,
             limit,
         )
-        message_chain = await self._collect_reply_chain(history, context.bot)
-        ai_client = resolve_ai_client(self._ai_registry, chat_settings)
+        await self._update_storage.record_summary_request(chat_id, limit)
+        ai_client = self._ai_router.resolve(chat_settings)
+        reply = StreamingReply(
+            telegram_message,
+            edit_interval=self._bot_settings.telegram_stream_edit_interval,
+            metrics=self._metrics,
+            provider=ai_client.get_name(),
+        )
+
+        precomputed = await self._summary_storage.get_precomputed(chat_id)
+        if (
+            history
+            and precomputed is not None
+            and precomputed.limit == limit
+            and precomputed.last_update_id == history[0].update_id
+        ):
+            self._metrics.counter("ai.summary_precomputed", result="hit").inc()
+            self._logger.info("Answering with the precomputed summary for chat %s (limit=%s)", chat_ref, limit)
+            await reply.run(self._replay(precomputed.summary))
+            return
+        self._metrics.counter("ai.summary_precomputed", result="miss").inc()
+
+        retry_after = await self._quota.acquire(
+            chat_id,
+            telegram_message.from_user.id if telegram_message.from_user else None,
+            chat_settings.model_configuration,
+            cost=self._quota_settings.summary_cost,
+        )
+        if retry_after > 0:
+            self._logger.info("AI quota exhausted for summary in chat %s (limit=%s)", chat_ref, limit)
+            await telegram_message.reply_text(self._quota.throttled_reply(retry_after))
+            return
+
         self._logger.info(
             "Requesting summary from %s for chat %s (limit=%s)",
             ai_client.get_name(),
             chat_ref,
             limit,
         )
-        model_configuration = chat_settings.model_configuration
-        response = await ai_client.answer(message_chain, model_configuration)
+        blocks = build_history_blocks(history, context.bot, self._summarizer.block_messages)
+        with AiDispatcher.context(AiPriority.SUMMARY, chat_id):
+            await reply.run(
+                self._summarizer.summarize_blocks(ai_client, chat_id, blocks, self._summarizer.SUMMARY_INSTRUCTIONS)
+            )
         self._logger.info(
             "Received summary response from %s for chat %s",
             ai_client.get_name(),
             chat_ref,
         )
-        await telegram_message.reply_text(response)
-
-    async def _collect_reply_chain(self, messages: Sequence[TelegramUpdateRecord], bot: Bot) -> Sequence[AiMessage]:
-        prefix = [
-            AiMessage(
-                role=AiRole.SYSTEM,
-                content=(
-                    "You are a helpful friend to assist. You need to go through the messages of the conversation "
-                    "and summarize in general what has been discussed. Do not make up your own ideas. Be concise. "
-                    "Do not include any personal opinion until you directly asked."
-                ),
-            )
-        ]
-        # TODO: Pull the summary/system prompt from chat-level configuration instead of hard-coding English text.
-        #  Different groups will want localized or domain-specific summaries.
-        return build_message_chain(messages, bot, prefix=prefix)
 
-    async def _retrieve_history(self, chat_id: int, limit: int) -> list[TelegramUpdateRecord]:
-        return await self._update_storage.get_last_messages(chat_id=chat_id, limit=limit)
+    @staticmethod
+    async def _replay(text: str) -> AsyncIterator[str]:
+        yield text
+
+    async def _retrieve_history(
+        self,
+        chat_id: int,
+        limit: int,
+        *,
+        exclude_update_id: int | None = None,
+    ) -> list[TelegramUpdateRecord]:
+        return await self._update_storage.get_last_messages(
+            chat_id=chat_id, limit=limit, exclude_update_id=exclude_update_id
+        )
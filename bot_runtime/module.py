@@ -5,7 +5,9 @@ from .message_handlers import discover_handler_types
 from .message_handlers.base import HandlersRegistry
 from .message_pipeline import MessageHandlerPipeline
 from .runtime import BotRuntime
+from .summary_scheduler import SummaryScheduler
 from .telegram_handlers import TelegramHandlerRegistration, TelegramHandlersSet
+from .usage_flusher import UsageFlusher
 
 
 class BotRuntimeModule(Module):
@@ -17,6 +19,8 @@ class BotRuntimeModule(Module):
 
     def configure(self, binder: Binder) -> None:
         binder.bind(BotRuntime, to=BotRuntime, scope=singleton)
+        binder.bind(SummaryScheduler, to=SummaryScheduler, scope=singleton)
+        binder.bind(UsageFlusher, to=UsageFlusher, scope=singleton)
 
         handler_registry = HandlersRegistry()
         injector = binder.injector
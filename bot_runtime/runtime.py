@@ -1,18 +1,28 @@
 __all__ = ["BotRuntime"]
 
+import asyncio
+import json
+from typing import Any
+
 from injector import Inject
 from telegram import Update
 from telegram.ext import Application
 
+from ai_client.base import AiClientRegistry
 from bot_runtime.message_pipeline import MessageHandlerPipeline
+from bot_runtime.summary_scheduler import SummaryScheduler
 from bot_runtime.telegram_handlers import TelegramHandlersSet
+from bot_runtime.usage_flusher import UsageFlusher
 from bot_types import Context
 from cache.telegram_update_storage import TelegramUpdateStorage
+from database.connection import DatabaseConnection
 from database.models import ChatConfiguration
 from errors import ConfigError
 from logging_config.common import WithLogger
 from services.chat_service import ChatService
 from settings.bot import TelegramSettings
+from settings.logging import LoggingSettings
+from utils.metrics import MetricsRegistry
 
 
 class BotRuntime(WithLogger):
@@ -23,15 +33,34 @@ class BotRuntime(WithLogger):
         message_pipeline: Inject[MessageHandlerPipeline],
         update_storage: Inject[TelegramUpdateStorage],
         chat_service: Inject[ChatService],
+        logging_settings: Inject[LoggingSettings],
+        summary_scheduler: Inject[SummaryScheduler],
+        usage_flusher: Inject[UsageFlusher],
+        metrics: Inject[MetricsRegistry],
+        db_connection: Inject[DatabaseConnection],
+        ai_clients: Inject[AiClientRegistry],
     ) -> None:
         self._settings = telegram_settings
         if self._settings.telegram_token is None:
             raise ConfigError("Telegram token is not provided, bot cannot be started.")
-        self._application = Application.builder().token(self._settings.telegram_token).build()
+        self._application = (
+            Application.builder()
+            .token(self._settings.telegram_token)
+            .post_init(self._start_background_tasks)
+            .post_stop(self._stop_background_tasks)
+            .build()
+        )
         self._telegram_handlers = telegram_handlers
         self._message_pipeline = message_pipeline
         self._update_storage = update_storage
         self._chat_service = chat_service
+        self._logging_settings = logging_settings
+        self._summary_scheduler = summary_scheduler
+        self._usage_flusher = usage_flusher
+        self._metrics = metrics
+        self._db_connection = db_connection
+        self._ai_clients = ai_clients
+        self._metrics_task: asyncio.Task[None] | None = None
         self.add_handlers()
 
     def add_handlers(self) -> None:
@@ -73,11 +102,35 @@ class BotRuntime(WithLogger):
         if chat is None:
             return None
         return await self._chat_service.ensure_exists(
-            str(chat.id),
+            chat.id,
             title=chat.title,
             chat_type=chat.type,
         )
 
+    async def _start_background_tasks(self, application: Application[Any, Any, Any, Any, Any, Any]) -> None:
+        self._summary_scheduler.start(application.bot)
+        self._usage_flusher.start()
+        interval = self._logging_settings.metrics_interval
+        if interval <= 0:
+            return
+        self._metrics_task = asyncio.get_running_loop().create_task(self._report_metrics(interval))
+
+    async def _stop_background_tasks(self, _: Application[Any, Any, Any, Any, Any, Any]) -> None:
+        await self._summary_scheduler.stop()
+        await self._usage_flusher.stop()
+        if self._metrics_task is not None:
+            self._metrics_task.cancel()
+            self._metrics_task = None
+        await self._ai_clients.aclose()
+        await self._db_connection.dispose()
+
+    async def _report_metrics(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            snapshot = self._metrics.snapshot()
+            if snapshot:
+                self._logger.info("Metrics snapshot: %s", json.dumps(snapshot, sort_keys=True))
+
     async def _notify_not_allowed(self, update: Update) -> None:
         if not update.message:
             return
@@ -0,0 +1,123 @@
+__all__ = ["StreamingReply"]
+
+import asyncio
+import time
+from datetime import timedelta
+from typing import AsyncIterator, Final
+
+from telegram import Message
+from telegram.constants import MessageLimit
+from telegram.error import BadRequest, RetryAfter
+
+from logging_config.common import WithLogger
+from utils.metrics import MetricsRegistry
+
+
+class StreamingReply(WithLogger):
+    """
+    Render a streamed AI reply by editing a placeholder message at a throttled cadence.
+
+    Telegram rate-limits message edits, so intermediate edits happen at most once per ``edit_interval`` seconds and
+    back off when Telegram answers with ``RetryAfter``. The final text is always written once the stream ends. Replies
+    longer than a single Telegram message continue in follow-up messages.
+    """
+
+    PLACEHOLDER: Final[str] = "…"
+    EMPTY_REPLY: Final[str] = "No response received."
+    # Forced edits (a full message or the final text) wait out this many ``RetryAfter`` answers before giving up.
+    FORCED_EDIT_ATTEMPTS: Final[int] = 3
+
+    def __init__(
+        self,
+        message: Message,
+        *,
+        edit_interval: float,
+        metrics: MetricsRegistry,
+        provider: str,
+    ) -> None:
+        self._message = message
+        self._edit_interval = edit_interval
+        self._metrics = metrics
+        self._provider = provider
+        self._next_edit_at = 0.0
+
+    async def run(self, deltas: AsyncIterator[str]) -> str:
+        """
+        Consume ``deltas`` and mirror the accumulated text into Telegram.
+
+        :param deltas: Reply text fragments in generation order.
+        :returns: The complete reply text.
+        """
+        current = await self._message.reply_text(self.PLACEHOLDER)
+        # ``deltas`` only issues its request once it is first iterated, so timing starts after the placeholder is sent.
+        started = time.monotonic()
+        chunks: list[str] = []
+        pending = ""
+        rendered = self.PLACEHOLDER
+
+        async for delta in deltas:
+            if not chunks:
+                self._metrics.summary("ai.time_to_first_token", provider=self._provider).observe(
+                    time.monotonic() - started
+                )
+            chunks.append(delta)
+            pending += delta
+            while len(pending) > MessageLimit.MAX_TEXT_LENGTH:
+                head, pending = self._split(pending)
+                await self._edit(current, head, force=True)
+                opening = pending[: MessageLimit.MAX_TEXT_LENGTH]
+                current = await self._message.reply_text(opening if opening.strip() else self.PLACEHOLDER)
+                rendered = current.text or ""
+            if pending != rendered and time.monotonic() >= self._next_edit_at:
+                await self._edit(current, pending)
+                rendered = pending
+
+        reply = "".join(chunks)
+        if not reply.strip():
+            # The model completed without any visible text; replace the placeholder instead of leaving it behind.
+            pending = self.EMPTY_REPLY
+        if pending != rendered:
+            await self._edit(current, pending, force=True)
+        self._metrics.summary("ai.stream_duration", provider=self._provider).observe(time.monotonic() - started)
+        return reply
+
+    async def _edit(self, message: Message, text: str, *, force: bool = False) -> None:
+        if not text.strip():
+            # Telegram rejects blank message text; whitespace-only prefixes of a reply are not worth an edit anyway.
+            return
+        for attempt in range(1, self.FORCED_EDIT_ATTEMPTS + 1):
+            try:
+                await message.edit_text(text)
+            except RetryAfter as exc:
+                delay = self._retry_after_seconds(exc)
+                self._next_edit_at = time.monotonic() + delay
+                if not force:
+                    self._logger.debug("Telegram throttled message edits; retrying in %.1f seconds", delay)
+                    return
+                if attempt == self.FORCED_EDIT_ATTEMPTS:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            except BadRequest as exc:
+                if "not modified" not in str(exc).lower():
+                    raise
+            break
+        self._next_edit_at = max(self._next_edit_at, time.monotonic() + self._edit_interval)
+
+    @staticmethod
+    def _split(text: str) -> tuple[str, str]:
+        """
+        Split ``text`` at the last line break that fits into one Telegram message.
+        """
+        limit = MessageLimit.MAX_TEXT_LENGTH
+        cut = text.rfind("\n", 0, limit)
+        if cut <= 0:
+            cut = limit
+        return text[:cut], text[cut:].lstrip("\n")
+
+    @staticmethod
+    def _retry_after_seconds(exc: RetryAfter) -> float:
+        retry_after: int | timedelta = exc.retry_after
+        if isinstance(retry_after, timedelta):
+            return retry_after.total_seconds()
+        return float(retry_after)
@@ -0,0 +1,171 @@
+__all__ = ["SummaryScheduler"]
+
+import asyncio
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from injector import inject
+from telegram import Bot
+
+from ai_client.dispatcher import AiDispatcher, AiPriority
+from ai_client.router import AiRouter
+from ai_client.summarizer import ConversationSummarizer
+from cache.rolling_summary_storage import PrecomputedSummary, RollingSummaryStorage
+from cache.telegram_update_storage import ChatSummaryActivity, TelegramUpdateStorage
+from logging_config.common import WithLogger
+from services.chat_service import ChatService
+from settings.ai_client.summary_settings import AiSummarySettings
+from utils.message_chain import build_history_blocks
+from utils.metrics import MetricsRegistry
+
+_SECONDS_PER_HOUR = 3600.0
+
+
+class SummaryScheduler(WithLogger):
+    """
+    Precompute summaries of chats that regularly ask for recaps while they are idle.
+
+    Every ``precompute_interval`` seconds the scheduler reads the summary activity kept by
+    :class:`TelegramUpdateStorage` and, for chats with enough recent summary requests and no new update for
+    ``precompute_idle_seconds``, summarizes the last requested number of messages unless the stored summary already
+    covers the newest update. Provider calls are capped at ``precompute_calls_per_hour`` per process; a run is only
+    started while budget is left, so a single run may overshoot by its own calls. ``#summarize`` answers from the
+    precomputed summary when no update arrived since it was prepared. Precomputation runs in the background priority
+    class behind interactive replies and on-demand summaries; its chunk summaries are submitted as a batch.
+
+    Runs are counted in ``ai.summary_precompute`` by result, skipped candidates in ``ai.summary_precompute_skipped``
+    by reason, and spent provider calls in ``ai.summary_precompute_calls``.
+    """
+
+    @inject
+    def __init__(
+        self,
+        settings: AiSummarySettings,
+        update_storage: TelegramUpdateStorage,
+        summary_storage: RollingSummaryStorage,
+        chat_service: ChatService,
+        ai_router: AiRouter,
+        summarizer: ConversationSummarizer,
+        metrics: MetricsRegistry,
+    ) -> None:
+        self._settings = settings
+        self._update_storage = update_storage
+        self._summary_storage = summary_storage
+        self._chat_service = chat_service
+        self._ai_router = ai_router
+        self._summarizer = summarizer
+        self._metrics = metrics
+        self._spent: deque[tuple[float, int]] = deque()
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self, bot: Bot) -> None:
+        """
+        Start the background loop when precomputation is enabled.
+
+        :param bot: Telegram bot used to tell the bot's own messages apart in the history.
+        """
+        if not self._settings.precompute_enabled or self._task is not None:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run(bot))
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    def remaining_budget(self) -> int:
+        """Provider calls that may still be spent within the current hour."""
+        cutoff = time.monotonic() - _SECONDS_PER_HOUR
+        while self._spent and self._spent[0][0] < cutoff:
+            self._spent.popleft()
+        return self._settings.precompute_calls_per_hour - sum(calls for _, calls in self._spent)
+
+    async def run_once(self, bot: Bot) -> int:
+        """
+        Precompute the summaries that are due.
+
+        :param bot: Telegram bot used to tell the bot's own messages apart in the history.
+        :returns: Number of summaries prepared.
+        """
+        now = time.time()
+        settings = self._settings
+        activities = await self._update_storage.get_summary_activity(since=now - settings.precompute_lookback)
+        prepared = 0
+        for activity in sorted(activities, key=lambda item: item.summary_requests, reverse=True):
+            if activity.summary_requests < settings.precompute_min_requests or activity.last_update_id is None:
+                continue
+            if activity.last_activity is not None and now - activity.last_activity < settings.precompute_idle_seconds:
+                self._skip("active")
+                continue
+            precomputed = await self._summary_storage.get_precomputed(activity.chat_id)
+            if (
+                precomputed is not None
+                and precomputed.limit == activity.summary_limit
+                and precomputed.last_update_id == activity.last_update_id
+            ):
+                self._skip("fresh")
+                continue
+            if self.remaining_budget() <= 0:
+                self._skip("budget")
+                break
+            if await self._precompute(bot, activity):
+                prepared += 1
+        return prepared
+
+    async def _run(self, bot: Bot) -> None:
+        while True:
+            await asyncio.sleep(self._settings.precompute_interval)
+            try:
+                await self.run_once(bot)
+            except Exception as exc:  # noqa: BLE001 - keep the scheduler alive, the next round retries
+                self._logger.warning("Summary precomputation round failed: %s", exc)
+
+    async def _precompute(self, bot: Bot, activity: ChatSummaryActivity) -> bool:
+        chat_settings = await self._chat_service.get(activity.chat_id)
+        if chat_settings is None or chat_settings.allowed is not True:
+            self._skip("not_allowed")
+            return False
+        history = await self._update_storage.get_last_messages(chat_id=activity.chat_id, limit=activity.summary_limit)
+        if not history:
+            self._skip("empty")
+            return False
+
+        ai_client = self._ai_router.resolve(chat_settings)
+        blocks = build_history_blocks(history, bot, self._summarizer.block_messages)
+        started = time.monotonic()
+        try:
+            with AiDispatcher.context(AiPriority.BACKGROUND, activity.chat_id):
+                summary = await self._summarizer.generate_blocks(
+                    ai_client, activity.chat_id, blocks, self._summarizer.SUMMARY_INSTRUCTIONS
+                )
+        except Exception as exc:  # noqa: BLE001 - one failing chat must not end the round, it is retried next round
+            self._logger.warning("Failed to precompute summary for chat %s: %s", activity.chat_id, exc)
+            self._metrics.counter("ai.summary_precompute", result="error").inc()
+            return False
+        finally:
+            self._spent.append((time.monotonic(), ai_client.calls))
+            self._metrics.counter("ai.summary_precompute_calls", provider=ai_client.get_name()).inc(ai_client.calls)
+
+        await self._summary_storage.store_precomputed(
+            activity.chat_id,
+            PrecomputedSummary(
+                limit=activity.summary_limit,
+                last_update_id=history[0].update_id,
+                summary=summary,
+                created_at=datetime.now(timezone.utc),
+            ),
+        )
+        self._metrics.counter("ai.summary_precompute", result="ok").inc()
+        self._logger.info(
+            "Precomputed summary of %s messages for chat %s in %.1fs",
+            len(history),
+            activity.chat_id,
+            time.monotonic() - started,
+        )
+        return True
+
+    def _skip(self, reason: str) -> None:
+        self._metrics.counter("ai.summary_precompute_skipped", reason=reason).inc()
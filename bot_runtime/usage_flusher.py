@@ -0,0 +1,68 @@
+__all__ = ["UsageFlusher"]
+
+import asyncio
+
+from injector import inject
+
+from ai_client.usage import UsageRecorder
+from logging_config.common import WithLogger
+from services.usage_service import UsageService
+from settings.ai_client.usage_settings import AiUsageSettings
+
+
+class UsageFlusher(WithLogger):
+    """
+    Persist the usage totals collected by :class:`UsageRecorder` every ``flush_interval`` seconds.
+
+    Each run writes everything recorded since the previous one in a single batch; totals that could not be written
+    are handed back to the recorder and retried with the next run. Stopping the flusher writes the remainder.
+    """
+
+    @inject
+    def __init__(self, settings: AiUsageSettings, recorder: UsageRecorder, usage_service: UsageService) -> None:
+        self._settings = settings
+        self._recorder = recorder
+        self._usage_service = usage_service
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        if not self._settings.persist_enabled or self._task is not None:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        await self.flush()
+
+    async def flush(self) -> int:
+        """
+        Write the pending usage totals.
+
+        :returns: Number of chat/model/day rows written, ``0`` when nothing was pending or the write failed.
+        """
+        pending = self._recorder.drain()
+        if not pending:
+            return 0
+        try:
+            await self._usage_service.add(pending)
+        except Exception as exc:  # noqa: BLE001 - the totals are kept and retried with the next run
+            self._logger.warning("Failed to persist AI usage of %s chat/model rows: %s", len(pending), exc)
+            self._recorder.restore(pending)
+            return 0
+        except asyncio.CancelledError:
+            # Stopped while writing: the rolled back totals are written by the final flush of :meth:`stop`.
+            self._recorder.restore(pending)
+            raise
+        return len(pending)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._settings.flush_interval)
+            try:
+                await self.flush()
+            except Exception as exc:  # noqa: BLE001 - keep the flusher alive, the next round retries
+                self._logger.warning("AI usage flush round failed: %s", exc)
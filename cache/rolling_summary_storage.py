@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Final, Sequence
+
+from injector import inject, provider, singleton
+from pydantic import BaseModel
+from valkey.exceptions import ValkeyError
+
+from cache.valkey import ValkeyCache
+from logging_config.common import WithLogger
+
+
+class PrecomputedSummary(BaseModel):
+    """Summary of the last ``limit`` messages of a chat, prepared while the newest update was ``last_update_id``."""
+
+    limit: int
+    last_update_id: int
+    summary: str
+    created_at: datetime
+
+
+class RollingSummaryStorage(WithLogger):
+    """
+    Persist summaries of fixed chat history blocks and precomputed chat summaries in Valkey.
+
+    Block summaries are addressed by a fingerprint of the summarized content, so a block whose cached messages expired
+    changes the address and the stale summary is never read again. Each chat additionally keeps its latest precomputed
+    summary. Entries share the 24 hour retention of the cached updates.
+    """
+
+    _TTL: Final[int] = int(timedelta(hours=24).total_seconds())
+
+    @inject
+    def __init__(self, cache: ValkeyCache) -> None:
+        self._client = cache.client
+
+    @classmethod
+    @provider
+    @singleton
+    def build(cls, cache: ValkeyCache) -> RollingSummaryStorage:
+        return cls(cache=cache)
+
+    async def get_many(self, chat_id: int, fingerprints: Sequence[str]) -> list[str | None]:
+        """
+        Look up block summaries of a chat.
+
+        :param chat_id: Identifier of the chat the blocks belong to.
+        :param fingerprints: Content fingerprints of the blocks.
+        :returns: Summaries in the order of ``fingerprints``, ``None`` for blocks that are not stored.
+        """
+        if not fingerprints:
+            return []
+        try:
+            keys = [self._summary_key(chat_id, fingerprint) for fingerprint in fingerprints]
+            payloads = await self._client.mget(keys)
+        except ValkeyError as exc:
+            self._logger.warning("Failed to fetch block summaries for chat %s: %s", chat_id, exc)
+            return [None] * len(fingerprints)
+        return [payload.decode() if isinstance(payload, bytes) else payload for payload in payloads]
+
+    async def store(self, chat_id: int, fingerprint: str, summary: str) -> None:
+        """
+        Store the summary of a block.
+
+        :param chat_id: Identifier of the chat the block belongs to.
+        :param fingerprint: Content fingerprint of the block.
+        :param summary: Summary text.
+        """
+        try:
+            await self._client.set(name=self._summary_key(chat_id, fingerprint), value=summary, ex=self._TTL)
+        except ValkeyError as exc:
+            self._logger.warning("Failed to store block summary for chat %s: %s", chat_id, exc)
+
+    async def get_precomputed(self, chat_id: int) -> PrecomputedSummary | None:
+        """
+        Return the latest precomputed summary of a chat.
+
+        :param chat_id: Identifier of the chat.
+        :returns: The stored summary, or ``None`` when there is none or it cannot be read.
+        """
+        try:
+            payload = await self._client.get(self._precomputed_key(chat_id))
+        except ValkeyError as exc:
+            self._logger.warning("Failed to fetch precomputed summary for chat %s: %s", chat_id, exc)
+            return None
+        if payload is None:
+            return None
+        try:
+            return PrecomputedSummary.model_validate_json(payload)
+        except Exception as exc:  # noqa: BLE001 - log and skip malformed payloads
+            self._logger.debug("Failed to parse precomputed summary for chat %s: %s", chat_id, exc)
+            return None
+
+    async def store_precomputed(self, chat_id: int, summary: PrecomputedSummary) -> None:
+        """
+        Replace the precomputed summary of a chat.
+
+        :param chat_id: Identifier of the chat.
+        :param summary: Summary to store.
+        """
+        try:
+            await self._client.set(name=self._precomputed_key(chat_id), value=summary.model_dump_json(), ex=self._TTL)
+        except ValkeyError as exc:
+            self._logger.warning("Failed to store precomputed summary for chat %s: %s", chat_id, exc)
+
+    @staticmethod
+    def _precomputed_key(chat_id: int) -> str:
+        return f"telegram:chat:{chat_id}:summary:latest"
+
+    @staticmethod
+    def _summary_key(chat_id: int, fingerprint: str) -> str:
+        return f"telegram:chat:{chat_id}:summary:{fingerprint}"
+
+
+__all__ = ["PrecomputedSummary", "RollingSummaryStorage"]
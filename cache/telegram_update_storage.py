@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Final
 
 from injector import inject, provider, singleton
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from telegram import Chat, Message, Update, User
 from valkey.exceptions import ValkeyError
 
@@ -13,6 +15,13 @@ from logging_config.common import WithLogger
 
 
 class TelegramUpdateRecord(BaseModel):
+    """
+    Cached Telegram update.
+
+    ``position`` is the zero-based rank of the update in its chat index, counted from the oldest indexed update. It is
+    filled in when the record is read from the history and is not persisted.
+    """
+
     update_id: int
     message_id: int | None = None
     chat_id: int | None = None
@@ -26,22 +35,42 @@ class TelegramUpdateRecord(BaseModel):
     language_code: str | None = None
     message_date: datetime | None = None
     received_at: datetime
+    position: int | None = Field(default=None, exclude=True)
 
     @property
     def redis_key(self) -> str:
         return f"telegram:update:{self.update_id}"
 
 
+@dataclass(frozen=True, slots=True)
+class ChatSummaryActivity:
+    """
+    Summary requests of a chat within the inspected period, the message limit of the most recent one, and the newest
+    indexed update of the chat with the Unix time it was received.
+    """
+
+    chat_id: int
+    summary_requests: int
+    summary_limit: int
+    last_update_id: int | None
+    last_activity: float | None
+
+
 class TelegramUpdateStorage(WithLogger):
     """
     Persist incoming Telegram updates in Valkey for short-term recall.
 
-    Records are retained for 24 hours and automatically indexed per chat to facilitate history lookups.
+    Records are retained for 24 hours and automatically indexed per chat to facilitate history lookups. Summary
+    requests are counted per chat over the same period so that recaps can be prepared ahead of time.
     """
 
     _TTL: Final[int] = int(timedelta(hours=24).total_seconds())
 
-    _MAX_HISTORY_FETCH: Final[int] = 200
+    _MAX_HISTORY_FETCH: Final[int] = 5000
+
+    _FETCH_BATCH_SIZE: Final[int] = 500
+
+    _SUMMARY_CHATS_KEY: Final[str] = "telegram:summary:chats"
 
     @inject
     def __init__(self, cache: ValkeyCache) -> None:
@@ -86,43 +115,110 @@ class TelegramUpdateStorage(WithLogger):
         :param chat_id: Identifier of the chat whose history should be fetched.
         :param limit: Maximum number of records to include in the response.
         :param exclude_update_id: Optional update identifier that should be omitted from the result set.
-        :returns: A list of cached updates ordered from newest to oldest.
+        :returns: A list of cached updates ordered from newest to oldest, with their ``position`` filled in.
         """
         if limit <= 0:
             return []
 
         chat_key = self._chat_updates_key(chat_id)
-        fetch_count = min(limit, self._MAX_HISTORY_FETCH)
+        fetch_count = min(limit, self._MAX_HISTORY_FETCH) + (1 if exclude_update_id is not None else 0)
         try:
-            raw_update_ids = await self._client.zrevrange(chat_key, 0, fetch_count - 1)
+            async with self._client.pipeline(transaction=True) as pipe:
+                pipe.zcard(chat_key)
+                pipe.zrevrange(chat_key, 0, fetch_count - 1)
+                indexed_count, raw_update_ids = await pipe.execute()
         except ValkeyError as exc:
             self._logger.warning("Failed to fetch cached updates for chat %s: %s", chat_id, exc)
             return []
 
-        records: list[TelegramUpdateRecord] = []
-
-        for raw_id in raw_update_ids:
+        update_ids: list[tuple[int, int]] = []
+        for offset, raw_id in enumerate(raw_update_ids):
             try:
                 update_id = int(raw_id)
             except (TypeError, ValueError):
                 continue
             if exclude_update_id is not None and update_id == exclude_update_id:
                 continue
+            update_ids.append((update_id, indexed_count - 1 - offset))
 
-            payload = await self._client.get(self._record_key(update_id))
-            if payload is None:
-                continue
+        records: list[TelegramUpdateRecord] = []
+        for start in range(0, len(update_ids), self._FETCH_BATCH_SIZE):
+            batch = update_ids[start : start + self._FETCH_BATCH_SIZE]
             try:
-                record = TelegramUpdateRecord.model_validate_json(payload)
-            except Exception as exc:  # noqa: BLE001 - log and skip malformed payloads
-                self._logger.debug("Failed to parse cached update %s: %s", update_id, exc)
-                continue
-
-            records.append(record)
-            if len(records) >= limit:
+                payloads = await self._client.mget([self._record_key(update_id) for update_id, _ in batch])
+            except ValkeyError as exc:
+                self._logger.warning("Failed to fetch cached updates for chat %s: %s", chat_id, exc)
                 break
+            for (update_id, position), payload in zip(batch, payloads, strict=True):
+                if payload is None:
+                    continue
+                try:
+                    record = TelegramUpdateRecord.model_validate_json(payload)
+                except Exception as exc:  # noqa: BLE001 - log and skip malformed payloads
+                    self._logger.debug("Failed to parse cached update %s: %s", update_id, exc)
+                    continue
+                record.position = position
+                records.append(record)
+
+        return records[:limit]
+
+    async def record_summary_request(self, chat_id: int, limit: int) -> None:
+        """
+        Count a summary request of a chat.
 
-        return records
+        :param chat_id: Identifier of the chat that requested a summary.
+        :param limit: Number of messages the summary covers.
+        """
+        now = time.time()
+        requests_key = self._summary_requests_key(chat_id)
+        try:
+            async with self._client.pipeline(transaction=True) as pipe:
+                pipe.zadd(requests_key, {f"{now}:{limit}": now})
+                pipe.zremrangebyscore(requests_key, "-inf", now - self._TTL)
+                pipe.expire(requests_key, self._TTL)
+                pipe.zadd(self._SUMMARY_CHATS_KEY, {str(chat_id): now})
+                pipe.zremrangebyscore(self._SUMMARY_CHATS_KEY, "-inf", now - self._TTL)
+                await pipe.execute()
+        except ValkeyError as exc:
+            self._logger.debug("Failed to record summary request for chat %s: %s", chat_id, exc)
+
+    async def get_summary_activity(self, since: float) -> list[ChatSummaryActivity]:
+        """
+        Report the activity of chats that requested summaries since ``since``.
+
+        :param since: Unix time from which summary requests are counted.
+        :returns: Activity per chat, in no particular order.
+        """
+        try:
+            raw_chat_ids = await self._client.zrangebyscore(self._SUMMARY_CHATS_KEY, since, "+inf")
+        except ValkeyError as exc:
+            self._logger.warning("Failed to fetch chats requesting summaries: %s", exc)
+            return []
+
+        result: list[ChatSummaryActivity] = []
+        for raw_chat_id in raw_chat_ids:
+            chat_id = int(raw_chat_id)
+            try:
+                async with self._client.pipeline(transaction=False) as pipe:
+                    pipe.zrangebyscore(self._summary_requests_key(chat_id), since, "+inf")
+                    pipe.zrevrange(self._chat_updates_key(chat_id), 0, 0, withscores=True)
+                    requests, newest = await pipe.execute()
+            except ValkeyError as exc:
+                self._logger.debug("Failed to fetch summary activity for chat %s: %s", chat_id, exc)
+                continue
+            if not requests:
+                continue
+            last_update_id, last_activity = (int(newest[0][0]), float(newest[0][1])) if newest else (None, None)
+            result.append(
+                ChatSummaryActivity(
+                    chat_id=chat_id,
+                    summary_requests=len(requests),
+                    summary_limit=int(requests[-1].rsplit(b":", 1)[1]),
+                    last_update_id=last_update_id,
+                    last_activity=last_activity,
+                )
+            )
+        return result
 
     def _build_record(self, update: Update) -> TelegramUpdateRecord | None:
         message: Message | None = update.effective_message
@@ -168,6 +264,10 @@ class TelegramUpdateStorage(WithLogger):
     def _chat_updates_key(chat_id: int) -> str:
         return f"telegram:chat:{chat_id}:updates"
 
+    @staticmethod
+    def _summary_requests_key(chat_id: int) -> str:
+        return f"telegram:chat:{chat_id}:summary_requests"
+
     @staticmethod
     def _record_key(update_id: int) -> str:
         return f"telegram:update:{update_id}"
@@ -194,4 +294,4 @@ class TelegramUpdateStorage(WithLogger):
             )
 
 
-__all__ = ["TelegramUpdateRecord", "TelegramUpdateStorage"]
+__all__ = ["ChatSummaryActivity", "TelegramUpdateRecord", "TelegramUpdateStorage"]
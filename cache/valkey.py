@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Any, Awaitable, Sequence, cast
+
 from injector import inject, provider, singleton
 from valkey.asyncio import Valkey
 
@@ -28,6 +30,19 @@ class ValkeyCache:
     def client(self) -> Valkey:
         return self._client
 
+    async def eval_script(self, script: str, keys: Sequence[str], args: Sequence[str | int | float] = ()) -> Any:
+        """
+        Run a Lua ``script`` atomically on the server.
+
+        :param script: Lua source; it sees ``keys`` as ``KEYS`` and ``args`` as ``ARGV``.
+        :param keys: Names of the keys the script touches.
+        :param args: Script arguments; numbers arrive as strings and are read with ``tonumber``.
+        :returns: The decoded reply of the script.
+        """
+        # The async client returns an awaitable, but the shared command stubs also allow the synchronous ``str``.
+        reply = self._client.eval(script, len(keys), *keys, *(str(arg) for arg in args))
+        return await cast(Awaitable[Any], reply)
+
     def _create_client(self) -> Valkey:
         """
         Build the Valkey client according to the configured connection details.
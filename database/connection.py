@@ -1,26 +1,58 @@
-from typing import Any, cast
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, cast
 
 from injector import Inject, inject, provider, singleton
-from sqlalchemy import event
+from sqlalchemy import event, false
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import ORMExecuteState, Session, with_loader_criteria
 
 from database.models.base import DeletableMixin
+from database.replicas import ReplicaPool
+from errors import ConfigError
 from settings.database import DatabaseSettings
 
+# Monotonic deadline until which reads in the current context must hit the primary (read-your-writes).
+_primary_reads_until: ContextVar[float] = ContextVar("primary_reads_until", default=0.0)
 
+
+def insert_statement(session: AsyncSession, model: type[Any]) -> postgresql.Insert | sqlite.Insert:
+    """
+    Build a dialect-specific ``INSERT`` that supports ``ON CONFLICT`` clauses.
+
+    :param session: Session whose bound dialect decides the statement flavour.
+    :param model: ORM class to insert into.
+    :raises ConfigError: If the bound dialect has no upsert support.
+    :returns: PostgreSQL or SQLite insert construct for ``model``.
+    """
+    dialect_name = session.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        return postgresql.insert(model)
+    if dialect_name == "sqlite":
+        return sqlite.insert(model)
+    raise ConfigError(f"Upserts are not supported for the '{dialect_name}' dialect.")
+
+
+@singleton
 class DatabaseConnection:
     """
-    Manage the shared SQLAlchemy async engine and session factory for the application.
+    Manage the shared SQLAlchemy async engines and session factories for the application.
 
-    The connection settings originate from :class:`settings.database.DatabaseSettings`.
+    Writes always go to the primary database. Reads are routed round-robin across the configured replicas, falling
+    back to the primary when none is healthy or when the current context committed a write recently.
+    The connection settings originate from :class:`settings.database.DatabaseSettings`. The class is a singleton so
+    that every service shares one set of engines, which :meth:`dispose` closes on shutdown.
     """
 
     @inject
     def __init__(self, settings: DatabaseSettings) -> None:
         self._settings = settings
-        self._engine = self._create_engine()
-        self._session_maker = self._create_session_maker()
+        self._engine = self._create_engine(self._settings.sqlalchemy_async_url)
+        self._session_maker = self._create_session_maker(self._engine)
+        self._register_session_listeners(self._session_maker)
+        self._replicas = self._create_replica_pool()
 
     @property
     def engine(self) -> AsyncEngine:
@@ -30,6 +62,45 @@ class DatabaseConnection:
     def session_maker(self) -> async_sessionmaker[AsyncSession]:
         return self._session_maker
 
+    @property
+    def write_session_maker(self) -> async_sessionmaker[AsyncSession]:
+        return self._session_maker
+
+    @property
+    def read_session_maker(self) -> async_sessionmaker[AsyncSession]:
+        """
+        Pick the session factory for the next read operation.
+
+        :returns: A healthy replica's session maker, or the primary one when reads must observe recent writes.
+        """
+        if time.monotonic() < _primary_reads_until.get():
+            return self._session_maker
+        return self._replicas.next_session_maker() or self._session_maker
+
+    @asynccontextmanager
+    async def read_session(self, *, use_primary: bool = False) -> AsyncIterator[AsyncSession]:
+        """
+        Open a session for read-only work.
+
+        :param use_primary: Force the primary database, e.g. when the caller needs to see its own uncommitted plans.
+        """
+        session_maker = self._session_maker if use_primary else self.read_session_maker
+        async with session_maker() as session:
+            yield session
+
+    @asynccontextmanager
+    async def write_session(self) -> AsyncIterator[AsyncSession]:
+        """
+        Open a session bound to the primary database.
+
+        When the session commits, subsequent reads in the same context are pinned to the primary for
+        ``database_read_your_writes_window`` seconds so that replica lag cannot hide the change.
+        """
+        async with self._session_maker() as session:
+            yield session
+            if session.info.pop("committed", False):
+                _primary_reads_until.set(time.monotonic() + self._settings.database_read_your_writes_window)
+
     @classmethod
     @provider
     @singleton
@@ -39,66 +110,110 @@ class DatabaseConnection:
     @classmethod
     @provider
     @singleton
-    def build_engine(cls, settings: Inject[DatabaseSettings]) -> AsyncEngine:
-        return cls(settings)._engine
+    def build_engine(cls, connection: Inject["DatabaseConnection"]) -> AsyncEngine:
+        return connection.engine
 
     @classmethod
     @provider
     @singleton
-    def build_session_maker(cls, settings: Inject[DatabaseSettings]) -> async_sessionmaker[AsyncSession]:
-        return cls(settings)._session_maker
+    def build_session_maker(cls, connection: Inject["DatabaseConnection"]) -> async_sessionmaker[AsyncSession]:
+        return connection.session_maker
 
-    def _create_engine(self) -> AsyncEngine:
+    async def dispose(self) -> None:
         """
-        Instantiate the SQLAlchemy async engine.
+        Stop the replica health checks and close the connection pools of the primary and every replica.
+        """
+        await self._replicas.dispose()
+        await self._engine.dispose()
 
+    def _create_engine(self, url: str) -> AsyncEngine:
+        """
+        Instantiate an SQLAlchemy async engine.
+
+        :param url: Async SQLAlchemy DSN of the primary or a replica.
         :returns: Configured :class:`sqlalchemy.ext.asyncio.AsyncEngine` instance.
         """
-        return create_async_engine(self._settings.sqlalchemy_async_url, future=True)
+        return create_async_engine(
+            url,
+            future=True,
+            **self._settings.engine_options,
+        )
 
-    def _create_session_maker(self) -> async_sessionmaker[AsyncSession]:
+    def _create_session_maker(self, engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
         """
-        Create a session factory bound to the shared engine.
+        Create a session factory bound to the given engine.
 
+        :param engine: Engine the sessions should use.
         :returns: Async session maker with commit expiry disabled.
         """
-        session_maker = async_sessionmaker(
-            bind=self._engine,
+        return async_sessionmaker(
+            bind=engine,
             expire_on_commit=False,
         )
-        self._register_session_listeners(session_maker)
-        return session_maker
+
+    def _create_replica_pool(self) -> ReplicaPool:
+        replicas = []
+        for url in self._settings.database_replica_urls:
+            engine = self._create_engine(url)
+            replicas.append((engine, self._create_session_maker(engine)))
+        return ReplicaPool(
+            replicas,
+            health_check_interval=self._settings.database_replica_health_check_interval,
+            health_check_timeout=self._settings.database_replica_health_check_timeout,
+        )
 
     def _register_session_listeners(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
         """
         Attach event listeners to implement application-wide behaviours for ORM sessions.
 
-        Listeners handle soft-delete semantics and ensure deleted rows are hidden from default queries.
+        Listeners handle soft-delete semantics and ensure deleted rows are hidden from default queries. They are
+        module-level functions so repeated :class:`DatabaseConnection` construction does not stack duplicates.
         """
 
         sync_session_class = cast(
             type[Session],
             getattr(session_factory, "sync_session_class", Session),
         )
+        listeners = (
+            ("before_flush", _handle_soft_delete),
+            ("after_commit", _track_commit),
+            ("do_orm_execute", _filter_deleted),
+        )
+        for identifier, listener in listeners:
+            if not event.contains(sync_session_class, identifier, listener):
+                event.listen(sync_session_class, identifier, listener, propagate=True)
+
+
+# Built once so every SELECT shares the same option object and compiled-statement cache key. The expression matches
+# the predicate of the partial indexes built by database.models.base.not_deleted_index.
+_NOT_DELETED_CRITERIA = with_loader_criteria(
+    DeletableMixin,
+    lambda cls: cls.deleted == false(),
+    include_aliases=True,
+)
+
+
+def _handle_soft_delete(session: Session, flush_context: Any, _instances: Any) -> None:
+    del flush_context, _instances
+    for instance in list(session.deleted):
+        if isinstance(instance, DeletableMixin):
+            instance.mark_deleted()
+            session.add(instance)
+            session.deleted.discard(instance)
+
+
+def _track_commit(session: Session) -> None:
+    session.info["committed"] = True
+
+
+def _filter_deleted(execute_state: ORMExecuteState) -> None:
+    # Column and relationship loads inherit the criteria from the parent statement already.
+    if (
+        not execute_state.is_select
+        or execute_state.is_column_load
+        or execute_state.is_relationship_load
+        or execute_state.execution_options.get("include_deleted", False)
+    ):
+        return
 
-        @event.listens_for(sync_session_class, "before_flush", propagate=True)
-        def _handle_soft_delete(session: Session, flush_context: Any, _instances: Any) -> None:
-            del flush_context, _instances
-            for instance in list(session.deleted):
-                if isinstance(instance, DeletableMixin):
-                    instance.mark_deleted()
-                    session.add(instance)
-                    session.deleted.discard(instance)
-
-        @event.listens_for(sync_session_class, "do_orm_execute", propagate=True)
-        def _filter_deleted(execute_state: ORMExecuteState) -> None:
-            if not execute_state.is_select or execute_state.execution_options.get("include_deleted", False):
-                return
-
-            execute_state.statement = execute_state.statement.options(
-                with_loader_criteria(
-                    DeletableMixin,
-                    lambda cls: cls.deleted.is_(False),
-                    include_aliases=True,
-                )
-            )
+    execute_state.statement = execute_state.statement.options(_NOT_DELETED_CRITERIA)
@@ -5,16 +5,33 @@ __all__ = [
     "Chat",
     "ChatConfiguration",
     "ModelConfiguration",
+    "ModelFallback",
+    "AiUsageRecord",
 ]
 
+from datetime import date
 from typing import Any
 from uuid import UUID
 
-from sqlalchemy import JSON, Boolean, Float, ForeignKey, Integer, String, Text, UniqueConstraint, false, true
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Boolean,
+    Date,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    false,
+    true,
+)
 from sqlalchemy import Uuid as SqlUuid
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from database.models.base import ActiveMixin, BaseModel, DefaultMixin
+from database.models.base import ActiveMixin, BaseModel, DefaultMixin, not_deleted_index
 
 from .user import User
 
@@ -40,7 +57,10 @@ class Model(DefaultMixin, ActiveMixin, BaseModel):
     """
 
     __tablename__ = "model"
-    __table_args__ = (UniqueConstraint("provider_id", "name", name="uq_model_provider_name"),)
+    __table_args__ = (
+        UniqueConstraint("provider_id", "name", name="uq_model_provider_name"),
+        not_deleted_index("ix_model_default_active_not_deleted", "is_default", "active"),
+    )
 
     provider_id: Mapped[UUID] = mapped_column(
         SqlUuid,
@@ -66,7 +86,7 @@ class Chat(BaseModel):
 
     __tablename__ = "chat"
 
-    telegram_chat_id: Mapped[str] = mapped_column(String, nullable=False, unique=True)
+    telegram_chat_id: Mapped[int] = mapped_column(BigInteger, nullable=False, unique=True, index=True)
     title: Mapped[str | None] = mapped_column(String, nullable=True)
     chat_type: Mapped[str] = mapped_column(String, nullable=False)
 
@@ -79,6 +99,7 @@ class Chat(BaseModel):
 
 class ChatConfiguration(BaseModel):
     __tablename__ = "chat_configuration"
+    __table_args__ = (not_deleted_index("ix_chat_configuration_chat_id_not_deleted", "chat_id"),)
 
     chat_id: Mapped[UUID] = mapped_column(
         SqlUuid,
@@ -142,3 +163,76 @@ class ModelConfiguration(BaseModel):
         foreign_keys=[model_id],
         innerjoin=True,
     )
+    fallbacks: Mapped[list["ModelFallback"]] = relationship(
+        back_populates="model_configuration",
+        cascade="all, delete-orphan",
+        order_by="ModelFallback.position",
+    )
+
+    def with_model(self, model: Model) -> "ModelConfiguration":
+        """
+        Return a transient copy of this configuration that targets ``model`` with the same runtime parameters.
+
+        Used to call fallback models; the copy is never added to a session.
+        """
+        copy = ModelConfiguration(**{column.key: getattr(self, column.key) for column in self.__mapper__.column_attrs})
+        copy.model_id = model.id
+        copy.model = model
+        return copy
+
+
+class ModelFallback(BaseModel):
+    """
+    Ordered fallback model of a model configuration, tried when the primary model's provider is slow or failing.
+    """
+
+    __tablename__ = "model_fallback"
+    __table_args__ = (
+        not_deleted_index("ix_model_fallback_configuration_position_not_deleted", "model_configuration_id", "position"),
+    )
+
+    model_configuration_id: Mapped[UUID] = mapped_column(
+        SqlUuid,
+        ForeignKey("model_configuration.id"),
+        nullable=False,
+    )
+    model_id: Mapped[UUID] = mapped_column(
+        SqlUuid,
+        ForeignKey("model.id"),
+        nullable=False,
+    )
+    position: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    model_configuration: Mapped["ModelConfiguration"] = relationship(back_populates="fallbacks")
+    model: Mapped["Model"] = relationship(
+        foreign_keys=[model_id],
+        innerjoin=True,
+    )
+
+
+class AiUsageRecord(BaseModel):
+    """
+    AI usage of one chat with one provider model on one UTC day.
+
+    Rows are written in batches by the usage flusher, which adds the totals collected since its previous run. Calls
+    made outside of any chat are recorded with ``telegram_chat_id = 0``. ``cost`` is in USD, priced at the time of the
+    call.
+    """
+
+    __tablename__ = "ai_usage"
+    __table_args__ = (
+        UniqueConstraint("telegram_chat_id", "provider", "model", "day", name="uq_ai_usage_chat_model_day"),
+        Index("ix_ai_usage_day", "day"),
+    )
+
+    telegram_chat_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    provider: Mapped[str] = mapped_column(String, nullable=False)
+    model: Mapped[str] = mapped_column(String, nullable=False)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    requests: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    prompt_tokens: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    cached_prompt_tokens: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    completion_tokens: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    latency_seconds: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    max_latency_seconds: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    cost: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
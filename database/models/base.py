@@ -1,7 +1,7 @@
 from datetime import datetime, timezone
 from uuid import UUID, uuid4
 
-from sqlalchemy import Boolean, DateTime, false, true
+from sqlalchemy import Boolean, DateTime, Index, column, false, true
 from sqlalchemy import Uuid as SqlUuid
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 from sqlalchemy.sql import func
@@ -47,6 +47,22 @@ class DeletableMixin:
         self.deleted_on = datetime.now(timezone.utc)
 
 
+def not_deleted_index(name: str, *columns: str) -> Index:
+    """
+    Build a partial index covering only rows that are not soft-deleted.
+
+    The predicate is the expression the soft-delete loader criteria uses, so it renders as ``deleted = false`` on
+    PostgreSQL and ``deleted = 0`` on SQLite just like default queries do. SQLite only picks a partial index when the
+    query repeats its predicate, so the two must not drift apart.
+
+    :param name: Index name.
+    :param columns: Indexed column names.
+    :returns: Index definition understood by both PostgreSQL and SQLite.
+    """
+    predicate = column("deleted", Boolean) == false()
+    return Index(name, *columns, postgresql_where=predicate, sqlite_where=predicate)
+
+
 class ActiveMixin:
     active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True, server_default=true())
 
@@ -1,11 +1,12 @@
 from sqlalchemy import Boolean, String, false
 from sqlalchemy.orm import Mapped, mapped_column
 
-from .base import BaseModel
+from .base import BaseModel, not_deleted_index
 
 
 class User(BaseModel):
     __tablename__ = "user"
+    __table_args__ = (not_deleted_index("ix_user_username_not_deleted", "username"),)
 
     username: Mapped[str] = mapped_column(String(length=255), nullable=False, unique=True)
     hash_password: Mapped[str] = mapped_column(String(length=255), nullable=False)
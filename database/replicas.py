@@ -0,0 +1,100 @@
+__all__ = ["ReplicaPool"]
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Sequence
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from logging_config.common import WithLogger
+
+
+@dataclass(slots=True)
+class _Replica:
+    engine: AsyncEngine
+    session_maker: async_sessionmaker[AsyncSession]
+    healthy: bool = True
+
+
+class ReplicaPool(WithLogger):
+    """
+    Round-robin selector over read replicas that skips members failing their health check.
+
+    Health checks run in the background at most once per ``health_check_interval`` seconds so that picking a replica
+    never waits on the network.
+    """
+
+    def __init__(
+        self,
+        replicas: Sequence[tuple[AsyncEngine, async_sessionmaker[AsyncSession]]],
+        *,
+        health_check_interval: float,
+        health_check_timeout: float,
+    ) -> None:
+        self._replicas = [_Replica(engine=engine, session_maker=maker) for engine, maker in replicas]
+        self._health_check_interval = health_check_interval
+        self._health_check_timeout = health_check_timeout
+        self._cursor = 0
+        self._last_check = 0.0
+        self._check_task: asyncio.Task[None] | None = None
+
+    @property
+    def engines(self) -> list[AsyncEngine]:
+        return [replica.engine for replica in self._replicas]
+
+    def next_session_maker(self) -> async_sessionmaker[AsyncSession] | None:
+        """
+        Return the session factory of the next healthy replica.
+
+        :returns: Replica session maker, or ``None`` when no replica is configured or all are unhealthy.
+        """
+        if not self._replicas:
+            return None
+        self._schedule_health_check()
+        for _ in range(len(self._replicas)):
+            replica = self._replicas[self._cursor]
+            self._cursor = (self._cursor + 1) % len(self._replicas)
+            if replica.healthy:
+                return replica.session_maker
+        return None
+
+    async def dispose(self) -> None:
+        """
+        Cancel a running health check and close the connection pools of every replica.
+        """
+        if self._check_task is not None:
+            self._check_task.cancel()
+            await asyncio.gather(self._check_task, return_exceptions=True)
+            self._check_task = None
+        await asyncio.gather(*(replica.engine.dispose() for replica in self._replicas))
+
+    async def check_health(self) -> None:
+        """
+        Probe every replica with ``SELECT 1`` and update its health flag.
+        """
+        self._last_check = time.monotonic()
+        await asyncio.gather(*(self._probe(replica) for replica in self._replicas))
+
+    def _schedule_health_check(self) -> None:
+        if self._check_task is not None and not self._check_task.done():
+            return
+        if time.monotonic() - self._last_check < self._health_check_interval:
+            return
+        self._check_task = asyncio.get_running_loop().create_task(self.check_health())
+
+    async def _probe(self, replica: _Replica) -> None:
+        try:
+            async with asyncio.timeout(self._health_check_timeout):
+                async with replica.engine.connect() as connection:
+                    await connection.execute(text("SELECT 1"))
+        except (SQLAlchemyError, OSError, TimeoutError) as exc:
+            if replica.healthy:
+                self._logger.warning("Read replica %s failed health check: %s", replica.engine.url, exc)
+            replica.healthy = False
+            return
+        if not replica.healthy:
+            self._logger.info("Read replica %s is healthy again", replica.engine.url)
+        replica.healthy = True
@@ -46,7 +46,7 @@ class SuperuserCreator:
         return cls(db_connection)
 
     async def _ensure_schema(self) -> None:
-        """Ensure database schema exists (SQLite only; safe for first-run setup)."""
+        """Ensure database schema exists (safe for first-run setup on SQLite and PostgreSQL)."""
         async with self._engine.begin() as conn:
             await conn.run_sync(BaseModel.metadata.create_all)
 
@@ -13,6 +13,7 @@ ROOT_DIR = Path(__file__).resolve().parents[1]
 if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
+from database.connection import DatabaseConnection  # noqa: E402
 from database.models.base import BaseModel  # noqa: E402
 from di_config import setup_di  # noqa: E402
 from settings.database import DatabaseSettings  # noqa: E402
@@ -32,7 +33,7 @@ def _get_database_settings() -> DatabaseSettings:
 
 def _get_async_engine() -> AsyncEngine:
     injector = setup_di()
-    engine = injector.get(AsyncEngine)
+    engine = injector.get(DatabaseConnection).engine
     config.set_main_option("sqlalchemy.url", str(engine.url))
     return engine
 
@@ -0,0 +1,31 @@
+"""drop redundant partial indexes"""
+
+from typing import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "aa94b1af59cf"
+down_revision: str | Sequence[str] | None = "7c1e9b4d2a58"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+_NOT_DELETED = sa.text("deleted = false")
+
+# chat_configuration.chat_id and user.username already have unique indexes, and the model table is too small for an
+# index to beat a scan; no query plan used any of these.
+_INDEXES: tuple[tuple[str, str, list[str]], ...] = (
+    ("ix_chat_configuration_chat_id_not_deleted", "chat_configuration", ["chat_id"]),
+    ("ix_model_default_active_not_deleted", "model", ["is_default", "active"]),
+    ("ix_user_username_not_deleted", "user", ["username"]),
+)
+
+
+def upgrade() -> None:
+    for name, table, _ in _INDEXES:
+        op.drop_index(name, table_name=table)
+
+
+def downgrade() -> None:
+    for name, table, columns in reversed(_INDEXES):
+        op.create_index(name, table, columns, postgresql_where=_NOT_DELETED, sqlite_where=_NOT_DELETED)
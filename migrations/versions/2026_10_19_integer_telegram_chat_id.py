@@ -0,0 +1,70 @@
+"""integer telegram chat id"""
+
+from typing import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "8e4f6a1d2b97"
+down_revision: str | Sequence[str] | None = "5b7d0e3a9c41"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# The initial schema created the unique constraint without a name; this convention lets SQLite batch mode find it.
+_NAMING_CONVENTION = {"uq": "uq_%(table_name)s_%(column_0_name)s"}
+_POSTGRESQL_UNIQUE_NAME = "chat_telegram_chat_id_key"
+
+
+def upgrade() -> None:
+    # Superseded by the unique index created below.
+    op.drop_index("ix_chat_telegram_chat_id_not_deleted", table_name="chat")
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_constraint(_POSTGRESQL_UNIQUE_NAME, "chat", type_="unique")
+        op.alter_column(
+            "chat",
+            "telegram_chat_id",
+            type_=sa.BigInteger(),
+            existing_type=sa.String(),
+            existing_nullable=False,
+            postgresql_using="telegram_chat_id::bigint",
+        )
+    else:
+        with op.batch_alter_table("chat", recreate="always", naming_convention=_NAMING_CONVENTION) as batch_op:
+            batch_op.drop_constraint("uq_chat_telegram_chat_id", type_="unique")
+            batch_op.alter_column(
+                "telegram_chat_id",
+                type_=sa.BigInteger(),
+                existing_type=sa.String(),
+                existing_nullable=False,
+            )
+    op.create_index("ix_chat_telegram_chat_id", "chat", ["telegram_chat_id"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_chat_telegram_chat_id", table_name="chat")
+    if op.get_bind().dialect.name == "postgresql":
+        op.alter_column(
+            "chat",
+            "telegram_chat_id",
+            type_=sa.String(),
+            existing_type=sa.BigInteger(),
+            existing_nullable=False,
+            postgresql_using="telegram_chat_id::text",
+        )
+        op.create_unique_constraint(_POSTGRESQL_UNIQUE_NAME, "chat", ["telegram_chat_id"])
+    else:
+        with op.batch_alter_table("chat", recreate="always", naming_convention=_NAMING_CONVENTION) as batch_op:
+            batch_op.alter_column(
+                "telegram_chat_id",
+                type_=sa.String(),
+                existing_type=sa.BigInteger(),
+                existing_nullable=False,
+            )
+            batch_op.create_unique_constraint("uq_chat_telegram_chat_id", ["telegram_chat_id"])
+    op.create_index(
+        "ix_chat_telegram_chat_id_not_deleted",
+        "chat",
+        ["telegram_chat_id"],
+        postgresql_where=sa.text("deleted = false"),
+        sqlite_where=sa.text("deleted = false"),
+    )
@@ -0,0 +1,52 @@
+"""model fallbacks"""
+
+from typing import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "3a9f5c2e7b14"
+down_revision: str | Sequence[str] | None = "8e4f6a1d2b97"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+_NOT_DELETED = sa.text("deleted = false")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "model_fallback",
+        sa.Column("model_configuration_id", sa.Uuid(), nullable=False),
+        sa.Column("model_id", sa.Uuid(), nullable=False),
+        sa.Column("position", sa.Integer(), nullable=False),
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("deleted", sa.Boolean(), server_default=sa.false(), nullable=False),
+        sa.Column("deleted_on", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.text("(CURRENT_TIMESTAMP)"), nullable=False
+        ),
+        sa.Column(
+            "updated_at", sa.DateTime(timezone=True), server_default=sa.text("(CURRENT_TIMESTAMP)"), nullable=False
+        ),
+        sa.ForeignKeyConstraint(
+            ["model_configuration_id"],
+            ["model_configuration.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["model_id"],
+            ["model.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_model_fallback_configuration_position_not_deleted",
+        "model_fallback",
+        ["model_configuration_id", "position"],
+        postgresql_where=_NOT_DELETED,
+        sqlite_where=_NOT_DELETED,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_model_fallback_configuration_position_not_deleted", table_name="model_fallback")
+    op.drop_table("model_fallback")
@@ -0,0 +1,40 @@
+"""match partial index predicates to the soft-delete criteria"""
+
+from typing import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "c3d81f5e6a20"
+down_revision: str | Sequence[str] | None = "aa94b1af59cf"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Renders "deleted = false" on PostgreSQL and "deleted = 0" on SQLite, exactly like the soft-delete loader criteria.
+# SQLite only uses a partial index when the query repeats its predicate, so the old text("deleted = false") indexes
+# were never picked there.
+_NOT_DELETED = sa.column("deleted", sa.Boolean()) == sa.false()
+_LEGACY_NOT_DELETED = sa.text("deleted = false")
+
+_RECREATED: tuple[tuple[str, str, list[str]], ...] = (
+    ("ix_model_fallback_configuration_position_not_deleted", "model_fallback", ["model_configuration_id", "position"]),
+)
+_RESTORED: tuple[tuple[str, str, list[str]], ...] = (
+    ("ix_chat_configuration_chat_id_not_deleted", "chat_configuration", ["chat_id"]),
+    ("ix_model_default_active_not_deleted", "model", ["is_default", "active"]),
+    ("ix_user_username_not_deleted", "user", ["username"]),
+)
+
+
+def upgrade() -> None:
+    for name, table, _ in _RECREATED:
+        op.drop_index(name, table_name=table)
+    for name, table, columns in _RECREATED + _RESTORED:
+        op.create_index(name, table, columns, postgresql_where=_NOT_DELETED, sqlite_where=_NOT_DELETED)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(_RECREATED + _RESTORED):
+        op.drop_index(name, table_name=table)
+    for name, table, columns in _RECREATED:
+        op.create_index(name, table, columns, postgresql_where=_LEGACY_NOT_DELETED, sqlite_where=_LEGACY_NOT_DELETED)
@@ -0,0 +1,30 @@
+"""soft delete partial indexes"""
+
+from typing import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "5b7d0e3a9c41"
+down_revision: str | Sequence[str] | None = "023f0d8a8da9"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+_NOT_DELETED = sa.text("deleted = false")
+
+_INDEXES: tuple[tuple[str, str, list[str]], ...] = (
+    ("ix_chat_telegram_chat_id_not_deleted", "chat", ["telegram_chat_id"]),
+    ("ix_chat_configuration_chat_id_not_deleted", "chat_configuration", ["chat_id"]),
+    ("ix_model_default_active_not_deleted", "model", ["is_default", "active"]),
+    ("ix_user_username_not_deleted", "user", ["username"]),
+)
+
+
+def upgrade() -> None:
+    for name, table, columns in _INDEXES:
+        op.create_index(name, table, columns, postgresql_where=_NOT_DELETED, sqlite_where=_NOT_DELETED)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(_INDEXES):
+        op.drop_index(name, table_name=table)
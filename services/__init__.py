@@ -1,5 +1,6 @@
 """Service layer components supporting the admin panel."""
 
 from .authentication import AuthenticationError, AuthenticationService
+from .chat_admin import ChatAdminService
 
-__all__ = ["AuthenticationError", "AuthenticationService"]
+__all__ = ["AuthenticationError", "AuthenticationService", "ChatAdminService"]
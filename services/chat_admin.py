@@ -0,0 +1,123 @@
+"""Bulk chat administration for the admin panel."""
+
+from typing import Any, Self, Sequence, cast
+from uuid import UUID
+
+from injector import inject, provider, singleton
+from sqlalchemy import CursorResult, ScalarSelect, Update, false, select, update
+
+from database.connection import DatabaseConnection
+from database.models import Chat, ChatConfiguration, Model, ModelConfiguration, Provider
+from errors import ConfigError
+
+# Sampling fields cleared by :meth:`ChatAdminService.reset_sampling_params`; ``None`` falls back to provider settings.
+SAMPLING_FIELDS: tuple[str, ...] = (
+    "temperature",
+    "top_p",
+    "top_k",
+    "max_output_tokens",
+    "presence_penalty",
+    "frequency_penalty",
+    "stop_sequences",
+)
+
+
+class ChatAdminService:
+    """
+    Apply configuration changes to many chats at once.
+
+    Every operation is a single set-based ``UPDATE`` filtered by Telegram chat identifiers, so the number of database
+    round trips does not grow with the number of chats.
+    """
+
+    @inject
+    def __init__(self, db_connection: DatabaseConnection) -> None:
+        self._db_connection = db_connection
+
+    @classmethod
+    @provider
+    @singleton
+    def build(cls, db_connection: DatabaseConnection) -> Self:
+        return cls(db_connection)
+
+    async def set_allowed(self, chat_ids: Sequence[int], *, allowed: bool = True) -> int:
+        """
+        Approve or revoke access for the given chats.
+
+        :param chat_ids: Telegram identifiers of the chats to update.
+        :param allowed: New access flag.
+        :returns: Number of chat configurations updated.
+        """
+        stmt = (
+            update(ChatConfiguration)
+            .where(ChatConfiguration.chat_id.in_(self._chat_pks(chat_ids)))
+            .where(ChatConfiguration.deleted == false())
+            .values(allowed=allowed)
+        )
+        return await self._execute_update(stmt)
+
+    async def switch_model(self, chat_ids: Sequence[int], model_id: UUID) -> int:
+        """
+        Point the model configuration of the given chats at another model.
+
+        :param chat_ids: Telegram identifiers of the chats to update.
+        :param model_id: Identifier of the target model.
+        :raises ConfigError: If the model does not exist or it or its provider is inactive.
+        :returns: Number of model configurations updated.
+        """
+        async with self._db_connection.read_session(use_primary=True) as session:
+            model_stmt = (
+                select(Model.id)
+                .join(Provider)
+                .where(Model.id == model_id)
+                .where(Model.active.is_(True))
+                .where(Provider.active.is_(True))
+            )
+            if (await session.execute(model_stmt)).scalar_one_or_none() is None:
+                raise ConfigError(f"Model '{model_id}' does not exist or is inactive.")
+
+        stmt = (
+            update(ModelConfiguration)
+            .where(ModelConfiguration.id.in_(self._model_configuration_pks(chat_ids)))
+            .where(ModelConfiguration.deleted == false())
+            .values(model_id=model_id)
+        )
+        return await self._execute_update(stmt)
+
+    async def reset_sampling_params(self, chat_ids: Sequence[int]) -> int:
+        """
+        Clear per-chat sampling overrides so provider defaults apply again.
+
+        :param chat_ids: Telegram identifiers of the chats to update.
+        :returns: Number of model configurations updated.
+        """
+        stmt = (
+            update(ModelConfiguration)
+            .where(ModelConfiguration.id.in_(self._model_configuration_pks(chat_ids)))
+            .where(ModelConfiguration.deleted == false())
+            .values(dict.fromkeys(SAMPLING_FIELDS))
+        )
+        return await self._execute_update(stmt)
+
+    async def _execute_update(self, stmt: Update) -> int:
+        async with self._db_connection.write_session() as session:
+            # DML statements always produce a cursor result, which is what carries the matched row count.
+            result = cast(
+                CursorResult[Any], await session.execute(stmt, execution_options={"synchronize_session": False})
+            )
+            await session.commit()
+            return result.rowcount
+
+    @staticmethod
+    def _chat_pks(chat_ids: Sequence[int]) -> ScalarSelect[UUID]:
+        return (
+            select(Chat.id).where(Chat.telegram_chat_id.in_(chat_ids)).where(Chat.deleted == false()).scalar_subquery()
+        )
+
+    def _model_configuration_pks(self, chat_ids: Sequence[int]) -> ScalarSelect[UUID | None]:
+        return (
+            select(ChatConfiguration.model_configuration_id)
+            .where(ChatConfiguration.chat_id.in_(self._chat_pks(chat_ids)))
+            .where(ChatConfiguration.deleted == false())
+            .scalar_subquery()
+        )
@@ -1,13 +1,13 @@
-from sqlite3 import IntegrityError
-from typing import Self
+from typing import Any, Self
+from uuid import UUID, uuid4
 
 from injector import inject, provider, singleton
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from database.connection import DatabaseConnection
-from database.models import Chat, ChatConfiguration, Model, ModelConfiguration, Provider
+from database.connection import DatabaseConnection, insert_statement
+from database.models import Chat, ChatConfiguration, Model, ModelConfiguration, ModelFallback, Provider
 from errors import ConfigError
 
 
@@ -27,7 +27,7 @@ class ChatService:
 
     async def ensure_exists(
         self,
-        chat_id: str,
+        chat_id: int,
         *,
         title: str | None,
         chat_type: str | None,
@@ -40,7 +40,7 @@ class ChatService:
         :param chat_type: Telegram chat type (e.g. "private", "supergroup").
         :returns: The persisted :class:`ChatConfiguration` row or ``None`` if the lookup fails after conflict handling.
         """
-        async with self._db_connection.session_maker() as session:
+        async with self._db_connection.write_session() as session:
             instance = await self._get_by_chat_id(session, chat_id)
             if instance is not None:
                 chat = await self._ensure_chat_entity(
@@ -66,37 +66,48 @@ class ChatService:
             if model is None:
                 raise ConfigError("No active AI model is configured. Cannot create chat configuration.")
 
-            chat = Chat(
-                telegram_chat_id=chat_id,
-                title=title,
-                chat_type=chat_type or self.UNKNOWN_CHAT_TYPE,
-            )
-            session.add(chat)
-
+            chat_pk = await self._upsert_chat(session, chat_id, title=title, chat_type=chat_type)
             model_configuration = ModelConfiguration(model=model)
-            instance = ChatConfiguration(chat=chat, model_configuration=model_configuration)
-            session.add(instance)
-
-            try:
-                await session.commit()
-            except IntegrityError:
+            session.add(model_configuration)
+            await session.flush()
+
+            stmt = (
+                insert_statement(session, ChatConfiguration)
+                .values(id=uuid4(), chat_id=chat_pk, model_configuration_id=model_configuration.id)
+                .on_conflict_do_nothing(index_elements=[ChatConfiguration.chat_id])
+                .returning(ChatConfiguration.id)
+            )
+            inserted = (await session.execute(stmt)).scalar_one_or_none()
+            if inserted is None:
+                # A concurrent worker created the configuration first; drop our pending model configuration.
                 await session.rollback()
-                return await self._get_by_chat_id(session, chat_id)
+            else:
+                await session.commit()
 
             return await self._get_by_chat_id(session, chat_id)
 
-    async def is_allowed(self, chat_id: str) -> bool:
+    async def is_allowed(self, chat_id: int) -> bool:
         """
         Determine whether a chat has been granted access.
 
         :param chat_id: Identifier of the chat requesting access.
         :returns: ``True`` when the chat is authorised; otherwise ``False``.
         """
-        async with self._db_connection.session_maker() as session:
+        async with self._db_connection.read_session() as session:
             record = await self._get_by_chat_id(session, chat_id)
             return bool(record and record.allowed)
 
-    async def _get_by_chat_id(self, session: AsyncSession, chat_id: str) -> ChatConfiguration | None:
+    async def get(self, chat_id: int) -> ChatConfiguration | None:
+        """
+        Fetch the configuration of a chat without creating it.
+
+        :param chat_id: Telegram identifier of the chat.
+        :returns: The :class:`ChatConfiguration` with its chat and models loaded, or ``None`` when it does not exist.
+        """
+        async with self._db_connection.read_session() as session:
+            return await self._get_by_chat_id(session, chat_id)
+
+    async def _get_by_chat_id(self, session: AsyncSession, chat_id: int) -> ChatConfiguration | None:
         stmt = (
             select(ChatConfiguration)
             .join(Chat)
@@ -105,12 +116,46 @@ class ChatService:
                 selectinload(ChatConfiguration.model_configuration)
                 .selectinload(ModelConfiguration.model)
                 .selectinload(Model.provider),
+                selectinload(ChatConfiguration.model_configuration)
+                .selectinload(ModelConfiguration.fallbacks)
+                .selectinload(ModelFallback.model)
+                .selectinload(Model.provider),
             )
             .where(Chat.telegram_chat_id == chat_id)
         )
         result = await session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def _upsert_chat(
+        self,
+        session: AsyncSession,
+        chat_id: int,
+        *,
+        title: str | None,
+        chat_type: str | None,
+    ) -> UUID:
+        """
+        Insert the chat identity or refresh its metadata in a single statement.
+
+        :param session: Active session that owns the surrounding transaction.
+        :param chat_id: Telegram identifier of the chat.
+        :param title: Latest title reported by Telegram for the chat.
+        :param chat_type: Telegram chat type (e.g. "private", "supergroup").
+        :returns: Primary key of the inserted or existing chat row.
+        """
+        stmt = insert_statement(session, Chat).values(
+            id=uuid4(),
+            telegram_chat_id=chat_id,
+            title=title,
+            chat_type=chat_type or self.UNKNOWN_CHAT_TYPE,
+        )
+        updates: dict[str, Any] = {"title": func.coalesce(stmt.excluded.title, Chat.title)}
+        if chat_type is not None:
+            updates["chat_type"] = stmt.excluded.chat_type
+        upsert = stmt.on_conflict_do_update(index_elements=[Chat.telegram_chat_id], set_=updates).returning(Chat.id)
+        result = await session.execute(upsert)
+        return result.scalar_one()
+
     async def _sync_chat_metadata(
         self,
         session: AsyncSession,
@@ -136,7 +181,7 @@ class ChatService:
         session: AsyncSession,
         configuration: ChatConfiguration,
         *,
-        telegram_chat_id: str,
+        telegram_chat_id: int,
         title: str | None,
         chat_type: str | None,
     ) -> Chat:
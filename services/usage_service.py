@@ -0,0 +1,163 @@
+"""Persistence and reporting of AI usage."""
+
+from dataclasses import dataclass
+from datetime import date
+from itertools import batched
+from typing import Any, Final, Mapping, Self
+from uuid import uuid4
+
+from injector import inject, provider, singleton
+from sqlalchemy import case, func, select
+
+from ai_client.usage import UsageKey, UsageTotals
+from database.connection import DatabaseConnection, insert_statement
+from database.models import AiUsageRecord
+
+# Keeps multi-row inserts well below SQLite's bound parameter limit.
+_ROWS_PER_STATEMENT: Final[int] = 500
+
+
+@dataclass(frozen=True, slots=True)
+class ChatUsage:
+    """Usage of one chat summed over a period."""
+
+    telegram_chat_id: int
+    requests: int
+    prompt_tokens: int
+    cached_prompt_tokens: int
+    completion_tokens: int
+    cost: float
+    average_latency_seconds: float
+    max_latency_seconds: float
+
+
+class UsageService:
+    """
+    Store aggregated AI usage in the ``ai_usage`` table and report it per chat.
+
+    Totals are added with one ``INSERT ... ON CONFLICT DO UPDATE`` per batch of rows, so concurrent workers add to the
+    same chat/model/day row without reading it first.
+    """
+
+    @inject
+    def __init__(self, db_connection: DatabaseConnection) -> None:
+        self._db_connection = db_connection
+
+    @classmethod
+    @provider
+    @singleton
+    def build(cls, db_connection: DatabaseConnection) -> Self:
+        return cls(db_connection)
+
+    async def add(self, pending: Mapping[UsageKey, UsageTotals]) -> None:
+        """
+        Add usage totals to the stored rows, creating missing ones.
+
+        :param pending: Totals per chat, provider model and day, as drained from the usage recorder.
+        """
+        if not pending:
+            return
+        rows = [
+            {
+                "id": uuid4(),
+                "telegram_chat_id": key.chat_id,
+                "provider": key.provider,
+                "model": key.model,
+                "day": key.day,
+                "requests": totals.requests,
+                "prompt_tokens": totals.prompt_tokens,
+                "cached_prompt_tokens": totals.cached_prompt_tokens,
+                "completion_tokens": totals.completion_tokens,
+                "latency_seconds": totals.latency_seconds,
+                "max_latency_seconds": totals.max_latency_seconds,
+                "cost": totals.cost,
+            }
+            for key, totals in pending.items()
+        ]
+        async with self._db_connection.write_session() as session:
+            for batch in batched(rows, _ROWS_PER_STATEMENT, strict=False):
+                stmt = insert_statement(session, AiUsageRecord).values(list(batch))
+                excluded = stmt.excluded
+                updates: dict[str, Any] = {
+                    column: getattr(AiUsageRecord, column) + getattr(excluded, column)
+                    for column in (
+                        "requests",
+                        "prompt_tokens",
+                        "cached_prompt_tokens",
+                        "completion_tokens",
+                        "latency_seconds",
+                        "cost",
+                    )
+                }
+                updates["max_latency_seconds"] = case(
+                    (
+                        excluded.max_latency_seconds > AiUsageRecord.max_latency_seconds,
+                        excluded.max_latency_seconds,
+                    ),
+                    else_=AiUsageRecord.max_latency_seconds,
+                )
+                updates["updated_at"] = func.now()
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[
+                        AiUsageRecord.telegram_chat_id,
+                        AiUsageRecord.provider,
+                        AiUsageRecord.model,
+                        AiUsageRecord.day,
+                    ],
+                    set_=updates,
+                )
+                await session.execute(stmt)
+            await session.commit()
+
+    async def top_chats(self, since: date, limit: int) -> list[ChatUsage]:
+        """
+        List the chats with the highest cost (then token count) since a day.
+
+        :param since: First UTC day included.
+        :param limit: Maximum number of chats returned.
+        :returns: Per-chat usage, most expensive first.
+        """
+        requests = func.sum(AiUsageRecord.requests)
+        prompt_tokens = func.sum(AiUsageRecord.prompt_tokens)
+        completion_tokens = func.sum(AiUsageRecord.completion_tokens)
+        cost = func.sum(AiUsageRecord.cost)
+        stmt = (
+            select(
+                AiUsageRecord.telegram_chat_id,
+                requests,
+                prompt_tokens,
+                func.sum(AiUsageRecord.cached_prompt_tokens),
+                completion_tokens,
+                cost,
+                func.sum(AiUsageRecord.latency_seconds),
+                func.max(AiUsageRecord.max_latency_seconds),
+            )
+            .where(AiUsageRecord.day >= since)
+            .group_by(AiUsageRecord.telegram_chat_id)
+            .order_by(cost.desc(), (prompt_tokens + completion_tokens).desc())
+            .limit(limit)
+        )
+        async with self._db_connection.read_session() as session:
+            result = await session.execute(stmt)
+            return [
+                ChatUsage(
+                    telegram_chat_id=chat_id,
+                    requests=total_requests,
+                    prompt_tokens=total_prompt,
+                    cached_prompt_tokens=total_cached,
+                    completion_tokens=total_completion,
+                    cost=total_cost,
+                    average_latency_seconds=total_latency / total_requests if total_requests else 0.0,
+                    max_latency_seconds=max_latency,
+                )
+                for (
+                    chat_id,
+                    total_requests,
+                    total_prompt,
+                    total_cached,
+                    total_completion,
+                    total_cost,
+                    total_latency,
+                    max_latency,
+                ) in result.all()
+            ]
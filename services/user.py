@@ -29,7 +29,7 @@ class UserService:
         return await self._find_one(selection)
 
     async def _find_one(self, selection: Select[tuple[User]]) -> UserCredentials | None:
-        async with self._db_connection.session_maker() as session:
+        async with self._db_connection.read_session() as session:
             result = await session.execute(selection)
             user = result.scalar_one_or_none()
             if user is None:
@@ -0,0 +1,30 @@
+import os
+from typing import Self
+
+from injector import provider, singleton
+from pydantic_settings import SettingsConfigDict
+
+from settings.base import SettingsBase
+
+
+class AiBatchSettings(SettingsBase):
+    """
+    Batch submission of non-interactive AI requests populated from ``AI_BATCH__*`` environment variables.
+
+    Batches run as individual calls in the dispatcher's background priority class, with at most
+    ``queue_concurrency`` calls of all batches per provider in flight at a time.
+    """
+
+    model_config = SettingsConfigDict(
+        extra="ignore",
+        env_prefix="AI_BATCH__",
+        env_file=os.environ.get("AI_BATCH_DOT_ENV", ".env"),
+    )
+
+    queue_concurrency: int = 2
+
+    @classmethod
+    @provider
+    @singleton
+    def build(cls) -> Self:
+        return cls()
@@ -0,0 +1,59 @@
+import os
+from typing import Self
+
+from injector import provider, singleton
+from pydantic_settings import SettingsConfigDict
+
+from settings.base import SettingsBase
+
+
+class AiBudgetSettings(SettingsBase):
+    """
+    Prompt token budgeting populated from ``AI_BUDGET__*`` environment variables.
+
+    ``context_windows`` maps ``provider/model`` or bare model names to their context size in tokens; unknown models use
+    ``default_context_tokens``. ``max_input_tokens`` optionally caps the prompt below the context window to bound
+    spend. The ``*_chars_per_token`` ratios calibrate the character heuristic used to estimate token counts. Old turns
+    are dropped in blocks of ``trim_block_messages`` so that the prompt prefix stays stable between calls.
+    """
+
+    model_config = SettingsConfigDict(
+        extra="ignore",
+        env_prefix="AI_BUDGET__",
+        env_file=os.environ.get("AI_BUDGET_DOT_ENV", ".env"),
+    )
+
+    enabled: bool = True
+    default_context_tokens: int = 128_000
+    context_windows: dict[str, int] = {
+        "grok/grok-4-fast-reasoning": 2_000_000,
+        "grok/grok-4-fast-non-reasoning": 2_000_000,
+        "grok/grok-4": 256_000,
+        "grok/grok-3": 131_072,
+        "grok/grok-3-mini": 131_072,
+    }
+    max_input_tokens: int | None = None
+    safety_margin: float = 0.05
+    ascii_chars_per_token: float = 4.0
+    non_ascii_chars_per_token: float = 2.0
+    message_overhead_tokens: int = 4
+    trim_block_messages: int = 8
+
+    def context_tokens(self, provider_name: str, model: str) -> int:
+        """
+        Resolve the context window of a model.
+
+        :param provider_name: Registry name of the provider.
+        :param model: Provider model identifier.
+        :returns: Context size in tokens.
+        """
+        return self.context_windows.get(
+            f"{provider_name}/{model}",
+            self.context_windows.get(model, self.default_context_tokens),
+        )
+
+    @classmethod
+    @provider
+    @singleton
+    def build(cls) -> Self:
+        return cls()
@@ -0,0 +1,42 @@
+import os
+from typing import Self
+
+from injector import provider, singleton
+from pydantic_settings import SettingsConfigDict
+
+from settings.base import SettingsBase
+
+
+class AiCacheSettings(SettingsBase):
+    """
+    Completion cache configuration populated from ``AI_CACHE__*`` environment variables.
+
+    Only deterministic requests (``temperature == 0``) are cached unless ``cache_nonzero_temperature`` is enabled,
+    because sampling with temperature is expected to vary between calls. Concurrent identical requests are coalesced
+    into one provider call within a process, and across processes through a Valkey lock when
+    ``coalesce_across_processes`` is enabled.
+    """
+
+    model_config = SettingsConfigDict(
+        extra="ignore",
+        env_prefix="AI_CACHE__",
+        env_file=os.environ.get("AI_CACHE_DOT_ENV", ".env"),
+    )
+
+    enabled: bool = True
+    ttl: int = 300
+    local_max_entries: int = 1024
+    valkey_enabled: bool = True
+    cache_nonzero_temperature: bool = False
+
+    coalesce_enabled: bool = True
+    coalesce_across_processes: bool = False
+    coalesce_lock_ttl: float = 120.0
+    coalesce_result_ttl: int = 30
+    coalesce_poll_interval: float = 0.1
+
+    @classmethod
+    @provider
+    @singleton
+    def build(cls) -> Self:
+        return cls()
@@ -0,0 +1,33 @@
+import os
+from typing import Self
+
+from injector import provider, singleton
+from pydantic_settings import SettingsConfigDict
+
+from settings.base import SettingsBase
+
+
+class AiDispatchSettings(SettingsBase):
+    """
+    Priority scheduling of AI provider calls populated from ``AI_DISPATCH__*`` environment variables.
+
+    ``weights`` maps priority classes (``interactive``, ``summary``, ``background``) to their share of a saturated
+    provider; chats within a class share it equally. ``max_in_flight`` caps the calls admitted per provider and
+    defaults to the provider's ``max_concurrency`` limiter setting; providers without either cap are not queued.
+    """
+
+    model_config = SettingsConfigDict(
+        extra="ignore",
+        env_prefix="AI_DISPATCH__",
+        env_file=os.environ.get("AI_DISPATCH_DOT_ENV", ".env"),
+    )
+
+    enabled: bool = True
+    weights: dict[str, float] = {"interactive": 16.0, "summary": 2.0, "background": 1.0}
+    max_in_flight: dict[str, int] = {}
+
+    @classmethod
+    @provider
+    @singleton
+    def build(cls) -> Self:
+        return cls()
@@ -0,0 +1,49 @@
+import os
+from typing import Literal, Self
+
+from injector import provider, singleton
+from pydantic_settings import SettingsConfigDict
+
+from .base_settings import GeneralAiSettings
+
+
+class FakeAiSettings(GeneralAiSettings):
+    """
+    Local fake provider for load tests, populated from ``AI_MODEL__FAKE__*`` environment variables.
+
+    The provider is registered under ``provider_name`` only when ``enabled`` is set; limits, resilience policies and
+    metrics always use the name ``fake``. Each call waits a first-token
+    latency drawn from ``latency_distribution`` (``constant``: always ``latency``; ``uniform``: ``latency`` plus or
+    minus ``latency_jitter``; ``exponential``: mean ``latency``; ``lognormal``: median ``latency`` with sigma
+    ``latency_jitter``), then streams the reply at ``tokens_per_second`` (unset streams it at once). Replies echo the
+    last user message or return ``fixed_response``. A share of ``error_rate`` calls fails, with a retryable
+    :class:`ConnectionError` when ``error_retryable`` is set and a non-retryable error otherwise. ``random_seed`` makes
+    latencies and injected errors reproducible.
+    """
+
+    model_config = SettingsConfigDict(
+        extra="ignore",
+        env_prefix="AI_MODEL__FAKE__",
+        env_file=os.environ.get("FAKE_AI_DOT_ENV", ".env"),
+    )
+
+    enabled: bool = False
+    provider_name: str = "fake"
+    default_model: str | None = "fake"
+    system_message: str | None = None
+
+    latency_distribution: Literal["constant", "uniform", "exponential", "lognormal"] = "constant"
+    latency: float = 0.2
+    latency_jitter: float = 0.0
+    tokens_per_second: float | None = 50.0
+    response_mode: Literal["echo", "fixed"] = "echo"
+    fixed_response: str = "This is a fake reply."
+    error_rate: float = 0.0
+    error_retryable: bool = True
+    random_seed: int | None = None
+
+    @classmethod
+    @provider
+    @singleton
+    def build(cls) -> Self:
+        return cls()
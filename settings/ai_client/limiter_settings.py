@@ -0,0 +1,71 @@
+import os
+from typing import Literal, Self
+
+from injector import provider, singleton
+from pydantic import BaseModel
+from pydantic_settings import SettingsConfigDict
+
+from settings.base import SettingsBase
+
+
+class ProviderLimits(BaseModel):
+    """
+    Limits applied to one provider or one provider model; ``None`` disables the respective limit.
+    """
+
+    max_concurrency: int | None = None
+    requests_per_minute: float | None = None
+    tokens_per_minute: float | None = None
+
+    def merged_with(self, override: "ProviderLimits | None") -> "ProviderLimits":
+        if override is None:
+            return self
+        return self.model_copy(update=override.model_dump(exclude_none=True))
+
+
+class AiLimiterSettings(SettingsBase):
+    """
+    Rate limiting of AI provider calls populated from ``AI_LIMITER__*`` environment variables.
+
+    ``AI_LIMITER__LIMITS`` is a JSON object keyed by ``provider`` or ``provider/model``. Provider entries override
+    ``AI_LIMITER__DEFAULT`` and are shared by all models of the provider; model entries add a separate, stricter layer
+    for that model only. With ``backend="valkey"`` the request and token buckets are shared
+    by all worker processes, while the concurrency cap stays per process.
+    """
+
+    model_config = SettingsConfigDict(
+        extra="ignore",
+        env_prefix="AI_LIMITER__",
+        env_file=os.environ.get("AI_LIMITER_DOT_ENV", ".env"),
+    )
+
+    enabled: bool = True
+    backend: Literal["local", "valkey"] = "local"
+    queue_timeout: float = 30.0
+    default: ProviderLimits = ProviderLimits(max_concurrency=16)
+    limits: dict[str, ProviderLimits] = {}
+
+    def provider_limits(self, provider_name: str) -> ProviderLimits:
+        """
+        Resolve the limits shared by every model of a provider.
+
+        :param provider_name: Registry name of the provider.
+        :returns: Default limits overlaid with the provider entry.
+        """
+        return self.default.merged_with(self.limits.get(provider_name))
+
+    def model_limits(self, provider_name: str, model: str) -> ProviderLimits | None:
+        """
+        Return the additional limits configured for a single provider model.
+
+        :param provider_name: Registry name of the provider.
+        :param model: Provider model identifier.
+        :returns: The ``provider/model`` entry, or ``None`` when the model has no dedicated limits.
+        """
+        return self.limits.get(f"{provider_name}/{model}")
+
+    @classmethod
+    @provider
+    @singleton
+    def build(cls) -> Self:
+        return cls()
@@ -0,0 +1,74 @@
+import os
+from typing import Self
+
+from injector import provider, singleton
+from pydantic import AliasChoices, Field
+from pydantic_settings import SettingsConfigDict
+
+from .base_settings import DEFAULT_SYSTEM_MESSAGE, GeneralAiSettings
+
+
+def _openai_compatible_env(suffix: str) -> str:
+    return f"AI_MODEL__OPENAI_COMPATIBLE__{suffix}"
+
+
+def _openai_compatible_alias(suffix: str) -> AliasChoices:
+    return AliasChoices(_openai_compatible_env(suffix), f"AI_MODEL__{suffix}")
+
+
+# Single-model servers (llama.cpp, Ollama with one model loaded) ignore the requested name; others need a real one.
+OPENAI_COMPATIBLE_DEFAULT_MODEL = "default"
+
+
+class OpenAiCompatibleSettings(GeneralAiSettings):
+    """
+    Configuration of a server that speaks the OpenAI chat completions API, e.g. a self-hosted vLLM or llama.cpp.
+
+    ``base_url`` points at the API root (``http://localhost:8000/v1``); the client stays unusable until it is set.
+    Server, credentials and default model are read from ``AI_MODEL__OPENAI_COMPATIBLE__*`` only, so the keys and
+    models of other providers never leak to it; sampling parameters fall back to the shared ``AI_MODEL__*`` values.
+    All calls share one HTTP/2 connection pool of at most ``max_connections`` connections, keeping up to
+    ``max_keepalive_connections`` idle connections open for ``keepalive_expiry`` seconds.
+    """
+
+    model_config = SettingsConfigDict(
+        extra="ignore",
+        env_file=os.environ.get("OPENAI_COMPATIBLE_DOT_ENV", ".env"),
+    )
+
+    base_url: str | None = Field(default=None, validation_alias=_openai_compatible_env("BASE_URL"))
+    http2: bool = Field(default=True, validation_alias=_openai_compatible_env("HTTP2"))
+    max_connections: int = Field(default=32, validation_alias=_openai_compatible_env("MAX_CONNECTIONS"))
+    max_keepalive_connections: int = Field(
+        default=16, validation_alias=_openai_compatible_env("MAX_KEEPALIVE_CONNECTIONS")
+    )
+    keepalive_expiry: float = Field(default=60.0, validation_alias=_openai_compatible_env("KEEPALIVE_EXPIRY"))
+    connect_timeout: float = Field(default=5.0, validation_alias=_openai_compatible_env("CONNECT_TIMEOUT"))
+
+    default_model: str = Field(
+        default=OPENAI_COMPATIBLE_DEFAULT_MODEL, validation_alias=_openai_compatible_env("DEFAULT_MODEL")
+    )
+    api_key: str | None = Field(default=None, validation_alias=_openai_compatible_env("API_KEY"))
+    system_message: str | None = Field(
+        default=DEFAULT_SYSTEM_MESSAGE, validation_alias=_openai_compatible_alias("SYSTEM_MESSAGE")
+    )
+    temperature: float | None = Field(default=None, validation_alias=_openai_compatible_alias("TEMPERATURE"))
+    top_p: float | None = Field(default=None, validation_alias=_openai_compatible_alias("TOP_P"))
+    top_k: int | None = Field(default=None, validation_alias=_openai_compatible_alias("TOP_K"))
+    max_output_tokens: int | None = Field(default=None, validation_alias=_openai_compatible_alias("MAX_OUTPUT_TOKENS"))
+    presence_penalty: float | None = Field(default=None, validation_alias=_openai_compatible_alias("PRESENCE_PENALTY"))
+    frequency_penalty: float | None = Field(
+        default=None, validation_alias=_openai_compatible_alias("FREQUENCY_PENALTY")
+    )
+    repetition_penalty: float | None = Field(
+        default=None, validation_alias=_openai_compatible_alias("REPETITION_PENALTY")
+    )
+    stop_sequences: list[str] | None = Field(default=None, validation_alias=_openai_compatible_alias("STOP_SEQUENCES"))
+    seed: int | None = Field(default=None, validation_alias=_openai_compatible_alias("SEED"))
+    response_format: str | None = Field(default=None, validation_alias=_openai_compatible_alias("RESPONSE_FORMAT"))
+
+    @classmethod
+    @provider
+    @singleton
+    def build(cls) -> Self:
+        return cls()
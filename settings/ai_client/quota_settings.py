@@ -0,0 +1,50 @@
+import os
+from typing import Literal, Self
+
+from injector import provider, singleton
+from pydantic import BaseModel
+from pydantic_settings import SettingsConfigDict
+
+from settings.base import SettingsBase
+
+
+class QuotaLimits(BaseModel):
+    """
+    Request quotas of one chat and of each user; ``None`` disables the respective quota.
+    """
+
+    chat_requests_per_hour: float | None = None
+    user_requests_per_hour: float | None = None
+
+    def merged_with(self, override: "QuotaLimits | None") -> "QuotaLimits":
+        if override is None:
+            return self
+        return self.model_copy(update=override.model_dump(exclude_unset=True))
+
+
+class AiQuotaSettings(SettingsBase):
+    """
+    Per-chat and per-user quotas of AI requests populated from ``AI_QUOTA__*`` environment variables.
+
+    Each quota is a token bucket holding an hour's worth of requests and refilling continuously. A chat can override
+    ``AI_QUOTA__DEFAULT`` with a ``quota`` object in ``ModelConfiguration.extras`` using the same keys; an explicit
+    ``null`` there disables that quota for the chat. Summaries cost ``summary_cost`` requests. With
+    ``backend="valkey"`` the buckets are shared by all worker processes.
+    """
+
+    model_config = SettingsConfigDict(
+        extra="ignore",
+        env_prefix="AI_QUOTA__",
+        env_file=os.environ.get("AI_QUOTA_DOT_ENV", ".env"),
+    )
+
+    enabled: bool = True
+    backend: Literal["local", "valkey"] = "valkey"
+    default: QuotaLimits = QuotaLimits(chat_requests_per_hour=120, user_requests_per_hour=30)
+    summary_cost: float = 5.0
+
+    @classmethod
+    @provider
+    @singleton
+    def build(cls) -> Self:
+        return cls()
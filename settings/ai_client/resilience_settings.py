@@ -0,0 +1,63 @@
+import os
+from typing import Self
+
+from injector import provider, singleton
+from pydantic import BaseModel
+from pydantic_settings import SettingsConfigDict
+
+from settings.base import SettingsBase
+
+
+class ResiliencePolicy(BaseModel):
+    """
+    Deadline, retry, and circuit breaker parameters applied to the calls of one provider.
+    """
+
+    attempt_timeout: float = 60.0
+    deadline: float = 120.0
+    max_attempts: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 8.0
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+    half_open_max_calls: int = 1
+
+    def merged_with(self, override: "ResiliencePolicy | None") -> "ResiliencePolicy":
+        if override is None:
+            return self
+        return self.model_copy(update=override.model_dump(exclude_unset=True))
+
+
+class AiResilienceSettings(SettingsBase):
+    """
+    Resilience of AI provider calls populated from ``AI_RESILIENCE__*`` environment variables.
+
+    ``attempt_timeout`` bounds a single attempt (for streams, the gap between two chunks) and ``deadline`` bounds the
+    whole call including retries. ``AI_RESILIENCE__PROVIDERS`` is a JSON object keyed by provider name whose entries
+    override individual fields of ``AI_RESILIENCE__DEFAULT``.
+    """
+
+    model_config = SettingsConfigDict(
+        extra="ignore",
+        env_prefix="AI_RESILIENCE__",
+        env_file=os.environ.get("AI_RESILIENCE_DOT_ENV", ".env"),
+    )
+
+    enabled: bool = True
+    default: ResiliencePolicy = ResiliencePolicy()
+    providers: dict[str, ResiliencePolicy] = {}
+
+    def policy_for(self, provider_name: str) -> ResiliencePolicy:
+        """
+        Resolve the policy of a provider.
+
+        :param provider_name: Registry name of the provider.
+        :returns: Default policy overlaid with the provider entry.
+        """
+        return self.default.merged_with(self.providers.get(provider_name))
+
+    @classmethod
+    @provider
+    @singleton
+    def build(cls) -> Self:
+        return cls()
@@ -0,0 +1,41 @@
+import os
+from typing import Self
+
+from injector import provider, singleton
+from pydantic_settings import SettingsConfigDict
+
+from settings.base import SettingsBase
+
+
+class AiRouterSettings(SettingsBase):
+    """
+    Provider routing and hedging populated from ``AI_ROUTER__*`` environment variables.
+
+    A route is considered unhealthy when its circuit is open or, once ``min_samples`` calls were observed, its error
+    rate over the last ``stats_window`` calls exceeds ``max_error_rate``. Among healthy routes the first configured
+    one whose p95 latency is within ``latency_tolerance`` times the best p95 is preferred; a route with fewer than
+    ``min_samples`` latency samples counts as the slowest. Samples older than ``stats_max_age`` seconds are dropped,
+    and a route configured ahead of the preferred one receives one call every ``probe_interval`` seconds (``None``
+    disables probing) so that a demoted primary can recover. ``hedge_delay`` enables hedging: when the first request
+    has not finished after that many seconds, the next route is raced against it.
+    """
+
+    model_config = SettingsConfigDict(
+        extra="ignore",
+        env_prefix="AI_ROUTER__",
+        env_file=os.environ.get("AI_ROUTER_DOT_ENV", ".env"),
+    )
+
+    hedge_delay: float | None = None
+    stats_window: int = 100
+    min_samples: int = 10
+    max_error_rate: float = 0.5
+    latency_tolerance: float = 1.5
+    stats_max_age: float = 600.0
+    probe_interval: float | None = 30.0
+
+    @classmethod
+    @provider
+    @singleton
+    def build(cls) -> Self:
+        return cls()
@@ -0,0 +1,47 @@
+import os
+from typing import Self
+
+from injector import provider, singleton
+from pydantic_settings import SettingsConfigDict
+
+from settings.base import SettingsBase
+
+
+class AiSummarySettings(SettingsBase):
+    """
+    Chat history summarization populated from ``AI_SUMMARY__*`` environment variables.
+
+    Histories longer than ``chunk_tokens`` are split into chunks of at most that many tokens, which are summarized
+    with up to ``max_parallel_chunks`` concurrent requests before the partial summaries are combined. ``max_messages``
+    caps the history length a single summarize command may request. With ``rolling_enabled`` the history is cut into
+    fixed blocks of ``block_messages`` updates; summaries of complete blocks are stored and reused by later requests.
+
+    With ``precompute_enabled`` a background scheduler checks every ``precompute_interval`` seconds for chats that
+    requested at least ``precompute_min_requests`` summaries within ``precompute_lookback`` seconds and have been idle
+    for ``precompute_idle_seconds``. Their summaries are prepared ahead of time, spending at most
+    ``precompute_calls_per_hour`` provider calls per hour and worker process.
+    """
+
+    model_config = SettingsConfigDict(
+        extra="ignore",
+        env_prefix="AI_SUMMARY__",
+        env_file=os.environ.get("AI_SUMMARY_DOT_ENV", ".env"),
+    )
+
+    max_messages: int = 5000
+    chunk_tokens: int = 8000
+    max_parallel_chunks: int = 4
+    rolling_enabled: bool = True
+    block_messages: int = 50
+    precompute_enabled: bool = False
+    precompute_interval: float = 60.0
+    precompute_idle_seconds: float = 300.0
+    precompute_min_requests: int = 2
+    precompute_lookback: float = 86_400.0
+    precompute_calls_per_hour: int = 60
+
+    @classmethod
+    @provider
+    @singleton
+    def build(cls) -> Self:
+        return cls()
@@ -0,0 +1,54 @@
+import os
+from typing import Self
+
+from injector import provider, singleton
+from pydantic import BaseModel
+from pydantic_settings import SettingsConfigDict
+
+from settings.base import SettingsBase
+
+
+class TokenPrices(BaseModel):
+    """
+    Price in USD per million tokens; cached prompt tokens are charged at the prompt price unless set.
+    """
+
+    prompt: float = 0.0
+    cached_prompt: float | None = None
+    completion: float = 0.0
+
+
+class AiUsageSettings(SettingsBase):
+    """
+    Usage and cost accounting of AI calls populated from ``AI_USAGE__*`` environment variables.
+
+    Usage is aggregated in memory per chat, provider, model and UTC day and, with ``persist_enabled``, written to the
+    ``ai_usage`` table every ``flush_interval`` seconds. ``prices`` is a JSON object keyed by ``provider`` or
+    ``provider/model`` (the latter wins); calls of unpriced models cost nothing.
+    """
+
+    model_config = SettingsConfigDict(
+        extra="ignore",
+        env_prefix="AI_USAGE__",
+        env_file=os.environ.get("AI_USAGE_DOT_ENV", ".env"),
+    )
+
+    persist_enabled: bool = True
+    flush_interval: float = 30.0
+    prices: dict[str, TokenPrices] = {}
+
+    def prices_for(self, provider_name: str, model: str) -> TokenPrices | None:
+        """
+        Resolve the prices of a provider model.
+
+        :param provider_name: Registry name of the provider.
+        :param model: Provider model identifier.
+        :returns: The ``provider/model`` entry, else the ``provider`` entry, else ``None``.
+        """
+        return self.prices.get(f"{provider_name}/{model}") or self.prices.get(provider_name)
+
+    @classmethod
+    @provider
+    @singleton
+    def build(cls) -> Self:
+        return cls()
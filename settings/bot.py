@@ -12,6 +12,8 @@ class TelegramSettings(SettingsBase):
 
     telegram_token: str | None = None
     telegram_bot_name: str | None = None
+    # Minimum delay between progressive edits of a streamed reply; Telegram throttles frequent edits.
+    telegram_stream_edit_interval: float = 1.5
 
     @classmethod
     @provider
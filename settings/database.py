@@ -1,22 +1,30 @@
 import os
 from pathlib import Path
-from typing import Self
+from typing import Any, Final, Self
 
 from injector import provider, singleton
 from pydantic import field_validator
 
 from .base import SettingsBase
 
+SQLITE_DRIVER: Final[str] = "sqlite+aiosqlite"
+POSTGRESQL_DRIVER: Final[str] = "postgresql+asyncpg"
+
 
 class DatabaseSettings(SettingsBase):
     """
     Configuration for the application's relational database.
 
-    SQLite (via ``sqlite+aiosqlite``) is the only supported backend at the moment; alternative databases are rejected.
-    The ``DATABASE_URL`` environment variable, when present, must already point to an async SQLite DSN and takes
-    precedence over ``DATABASE_PATH``. When both variables are supplied, ``DATABASE_URL`` wins and the path value is
-    ignored. If neither is provided, a default SQLite database is created at ``database_path`` relative to the project
-    root.
+    Two async backends are supported: SQLite (via ``sqlite+aiosqlite``) and PostgreSQL (via ``postgresql+asyncpg``);
+    other drivers are rejected. The ``DATABASE_URL`` environment variable, when present, takes precedence over
+    ``DATABASE_PATH``. When both variables are supplied, ``DATABASE_URL`` wins and the path value is ignored. If neither
+    is provided, a default SQLite database is created at ``database_path`` relative to the project root.
+
+    Pool sizing options only apply to PostgreSQL; SQLite keeps SQLAlchemy's default pool because it allows a single
+    writer anyway.
+
+    ``DATABASE_REPLICA_URLS`` (a JSON list) enables read routing: reads are spread round-robin across healthy replicas
+    while writes stay on the primary.
     """
 
     class Config:
@@ -24,37 +32,88 @@ class DatabaseSettings(SettingsBase):
 
     database_url: str | None = None
     database_path: Path = Path("askbro.db")
+    database_pool_size: int = 5
+    database_max_overflow: int = 10
+    database_pool_timeout: float = 30.0
+    database_pool_recycle: int = 1800
+    database_pool_pre_ping: bool = True
+    database_replica_urls: list[str] = []
+    database_replica_health_check_interval: float = 30.0
+    database_replica_health_check_timeout: float = 2.0
+    database_read_your_writes_window: float = 5.0
 
     @property
     def sqlalchemy_async_url(self) -> str:
         """
-        Return the async SQLAlchemy connection URL, always using ``sqlite+aiosqlite``.
+        Return the async SQLAlchemy connection URL, defaulting to ``sqlite+aiosqlite``.
 
         :returns: Async SQLAlchemy DSN suitable for :func:`sqlalchemy.ext.asyncio.create_async_engine`.
         """
         if self.database_url:
             return self.database_url
         db_path = self.database_path.expanduser().resolve()
-        return f"sqlite+aiosqlite:///{db_path}"
+        return f"{SQLITE_DRIVER}:///{db_path}"
+
+    @property
+    def is_sqlite(self) -> bool:
+        """
+        Tell whether the configured connection URL targets SQLite.
+
+        :returns: ``True`` for ``sqlite+aiosqlite`` URLs, including the default database path.
+        """
+        return self.sqlalchemy_async_url.startswith(f"{SQLITE_DRIVER}://")
+
+    @property
+    def engine_options(self) -> dict[str, Any]:
+        """
+        Build keyword arguments for :func:`sqlalchemy.ext.asyncio.create_async_engine`.
+
+        :returns: Pool configuration matching the selected backend.
+        """
+        options: dict[str, Any] = {"pool_pre_ping": self.database_pool_pre_ping}
+        if self.is_sqlite:
+            return options
+        options.update(
+            pool_size=self.database_pool_size,
+            max_overflow=self.database_max_overflow,
+            pool_timeout=self.database_pool_timeout,
+            pool_recycle=self.database_pool_recycle,
+        )
+        return options
 
     @field_validator("database_url")
     @classmethod
-    def _validate_async_sqlite(cls, value: str | None) -> str | None:
+    def _validate_async_driver(cls, value: str | None) -> str | None:
         """
-        Ensure provided DSNs already target the async SQLite driver.
+        Ensure provided DSNs already target one of the supported async drivers.
 
         :param value: Custom database URL read from configuration.
         :returns: The validated connection string or ``None`` when unspecified.
-        :raises ValueError: If the URL does not use ``sqlite+aiosqlite``.
+        :raises ValueError: If the URL uses neither ``sqlite+aiosqlite`` nor ``postgresql+asyncpg``.
         """
         if value is None:
             return None
-        if not value.startswith("sqlite+aiosqlite://"):
-            raise ValueError("database_url must use the sqlite+aiosqlite driver")
-        return value
+        return _ensure_supported_driver(value)
+
+    @field_validator("database_replica_urls")
+    @classmethod
+    def _validate_replica_drivers(cls, value: list[str]) -> list[str]:
+        """
+        Apply the same driver restrictions as ``database_url`` to every replica DSN.
+
+        :param value: Replica URLs read from configuration.
+        :returns: The validated list of connection strings.
+        """
+        return [_ensure_supported_driver(url) for url in value]
 
     @classmethod
     @provider
     @singleton
     def build(cls) -> Self:
         return cls()
+
+
+def _ensure_supported_driver(url: str) -> str:
+    if not url.startswith((f"{SQLITE_DRIVER}://", f"{POSTGRESQL_DRIVER}://")):
+        raise ValueError(f"database URLs must use the {SQLITE_DRIVER} or {POSTGRESQL_DRIVER} driver")
+    return url
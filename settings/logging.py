@@ -19,6 +19,8 @@ class LoggingSettings(SettingsBase):
     level: LogLevel = "INFO"
     format: str = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
     datefmt: str = "%Y-%m-%dT%H:%M:%S%z"
+    # Seconds between metrics snapshots written to the log; ``0`` disables reporting.
+    metrics_interval: float = 60.0
 
     @classmethod
     @provider
@@ -0,0 +1,27 @@
+__all__ = ["build_fake_client"]
+
+from typing import Any
+
+from injector import Injector
+
+from ai_client.fake import FakeAiClient
+from settings.ai_client.cache_settings import AiCacheSettings
+from settings.ai_client.fake_settings import FakeAiSettings
+
+
+def build_fake_client[T: FakeAiClient](client_type: type[T], injector: Injector | None = None, **settings: Any) -> T:
+    """
+    Build a :class:`FakeAiClient` (or a subclass) wired with the real cache, limiter, coalescer and resilience services.
+
+    Every call gets its own injector unless one is passed, so tests do not share breakers, metrics or caches. The
+    completion cache stays in-process.
+
+    :param client_type: Client class to build.
+    :param injector: Injector to resolve the collaborators from, e.g. one with extra bindings.
+    :param settings: Overrides of :class:`FakeAiSettings`; deterministic ``temperature=0`` by default.
+    :returns: The fake client.
+    """
+    injector = injector or Injector()
+    injector.binder.bind(FakeAiSettings, to=FakeAiSettings(**{"temperature": 0.0, **settings}))
+    injector.binder.bind(AiCacheSettings, to=AiCacheSettings(valkey_enabled=False))
+    return injector.get(client_type)
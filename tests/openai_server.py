@@ -0,0 +1,190 @@
+__all__ = ["StubOpenAiServer", "StubRequest", "StubResponse", "self_signed_certificate"]
+
+import asyncio
+import contextlib
+import json
+import shutil
+import ssl
+import subprocess
+import unittest
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+_REASONS = {200: "OK", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+@dataclass(frozen=True, slots=True)
+class StubResponse:
+    """
+    Scripted reply of :class:`StubOpenAiServer`: a JSON body, or server-sent events when ``events`` is set.
+    """
+
+    status: int = 200
+    body: dict[str, Any] = field(default_factory=dict)
+    events: list[dict[str, Any]] | None = None
+
+    def encode(self) -> tuple[str, list[bytes]]:
+        """
+        :returns: Content type and body chunks; every event is its own chunk, followed by ``data: [DONE]``.
+        """
+        if self.events is None:
+            return "application/json", [json.dumps(self.body).encode()]
+        chunks = [f"data: {json.dumps(event)}\n\n".encode() for event in self.events]
+        return "text/event-stream", [*chunks, b"data: [DONE]\n\n"]
+
+
+@dataclass(frozen=True, slots=True)
+class StubRequest:
+    """Request received by :class:`StubOpenAiServer`."""
+
+    path: str
+    headers: dict[str, str]
+    body: dict[str, Any]
+    http_version: str
+
+
+class StubOpenAiServer:
+    """
+    Minimal OpenAI chat completions server on localhost that replays scripted responses in order.
+
+    Plain connections speak HTTP/1.1 with keep-alive and chunked responses. With ``tls`` the server offers ``h2`` over
+    ALPN and serves HTTP/2 connections through the ``h2`` package, which ``httpx[http2]`` installs.
+    """
+
+    def __init__(self, *responses: StubResponse, tls: ssl.SSLContext | None = None) -> None:
+        self.requests: list[StubRequest] = []
+        self._responses = list(responses)
+        self._tls = tls
+        self._server: asyncio.Server | None = None
+
+    async def start(self) -> str:
+        """
+        Start listening on a free port.
+
+        :returns: Base URL of the API root.
+        """
+        self._server = await asyncio.start_server(self._serve, "127.0.0.1", 0, ssl=self._tls)
+        port = self._server.sockets[0].getsockname()[1]
+        return f"{'https' if self._tls else 'http'}://127.0.0.1:{port}/v1"
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            self._server.close_clients()
+            await self._server.wait_closed()
+            self._server = None
+
+    def _respond(self, request: StubRequest) -> StubResponse:
+        self.requests.append(request)
+        if not self._responses:
+            return StubResponse(status=500, body={"error": "no scripted response left"})
+        return self._responses.pop(0)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        ssl_object = writer.get_extra_info("ssl_object")
+        try:
+            # Clients hang up between requests whenever they like.
+            with contextlib.suppress(ConnectionError, asyncio.IncompleteReadError):
+                if ssl_object is not None and ssl_object.selected_alpn_protocol() == "h2":
+                    await self._serve_http2(reader, writer)
+                else:
+                    await self._serve_http1(reader, writer)
+        finally:
+            writer.close()
+
+    async def _serve_http1(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        while request_line := await reader.readline():
+            path = request_line.decode().split()[1]
+            headers: dict[str, str] = {}
+            while (line := await reader.readline()) not in (b"\r\n", b""):
+                name, _, value = line.decode().partition(":")
+                headers[name.strip().lower()] = value.strip()
+            payload = await reader.readexactly(int(headers.get("content-length", 0)))
+            response = self._respond(StubRequest(path, headers, json.loads(payload or b"{}"), "HTTP/1.1"))
+
+            content_type, chunks = response.encode()
+            reason = _REASONS.get(response.status, "Status")
+            writer.write(
+                f"HTTP/1.1 {response.status} {reason}\r\ncontent-type: {content_type}\r\n"
+                "transfer-encoding: chunked\r\n\r\n".encode()
+            )
+            for chunk in chunks:
+                writer.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+                await writer.drain()
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+
+    async def _serve_http2(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        from h2.config import H2Configuration
+        from h2.connection import H2Connection
+        from h2.events import ConnectionTerminated, DataReceived, RequestReceived, StreamEnded
+
+        connection = H2Connection(H2Configuration(client_side=False, header_encoding="utf-8"))
+        connection.initiate_connection()
+        writer.write(connection.data_to_send())
+        requests: dict[int, tuple[dict[str, str], bytearray]] = {}
+        while data := await reader.read(65536):
+            for event in connection.receive_data(data):
+                if isinstance(event, RequestReceived) and event.stream_id is not None:
+                    requests[event.stream_id] = ({str(k): str(v) for k, v in event.headers or ()}, bytearray())
+                elif isinstance(event, DataReceived) and event.stream_id is not None and event.data is not None:
+                    requests[event.stream_id][1].extend(event.data)
+                    connection.acknowledge_received_data(event.flow_controlled_length or 0, event.stream_id)
+                elif isinstance(event, StreamEnded) and event.stream_id is not None:
+                    headers, payload = requests.pop(event.stream_id)
+                    request = StubRequest(headers[":path"], headers, json.loads(payload or b"{}"), "HTTP/2")
+                    response = self._respond(request)
+                    content_type, chunks = response.encode()
+                    connection.send_headers(
+                        event.stream_id, [(":status", str(response.status)), ("content-type", content_type)]
+                    )
+                    for chunk in chunks:
+                        connection.send_data(event.stream_id, chunk)
+                    connection.end_stream(event.stream_id)
+                elif isinstance(event, ConnectionTerminated):
+                    return
+            writer.write(connection.data_to_send())
+            await writer.drain()
+
+
+def self_signed_certificate(directory: Path) -> tuple[ssl.SSLContext, Path]:
+    """
+    Create a certificate for ``127.0.0.1`` with the ``openssl`` binary from ``PATH``.
+
+    :param directory: Directory the certificate and key files are written to.
+    :raises unittest.SkipTest: If ``openssl`` is not installed.
+    :returns: Server context offering ``h2`` and ``http/1.1`` over ALPN, and the certificate file for clients to trust.
+    """
+    openssl = shutil.which("openssl")
+    if openssl is None:
+        raise unittest.SkipTest("openssl is not on PATH.")
+    certificate_file, key_file = directory / "server.pem", directory / "server.key"
+    subprocess.run(  # noqa: S603 - binary resolved from PATH, arguments built here
+        [
+            openssl,
+            "req",
+            "-x509",
+            "-newkey",
+            "ec",
+            "-pkeyopt",
+            "ec_paramgen_curve:prime256v1",
+            "-nodes",
+            "-days",
+            "1",
+            "-subj",
+            "/CN=127.0.0.1",
+            "-addext",
+            "subjectAltName=IP:127.0.0.1",
+            "-keyout",
+            str(key_file),
+            "-out",
+            str(certificate_file),
+        ],
+        check=True,
+        capture_output=True,
+    )
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(certificate_file, key_file)
+    context.set_alpn_protocols(["h2", "http/1.1"])
+    return context, certificate_file
@@ -0,0 +1,117 @@
+__all__ = ["PostgresServer"]
+
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import unittest
+import uuid
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+
+_ENV_URL = "TEST_POSTGRES_URL"
+
+
+class PostgresServer:
+    """
+    Local PostgreSQL server shared by the database tests of one module.
+
+    ``TEST_POSTGRES_URL`` (a ``postgresql+asyncpg`` DSN with rights to create databases) points the tests at an
+    existing server. Without it a throwaway cluster is started with ``initdb``/``pg_ctl`` from ``PATH`` on a free
+    port; PostgreSQL refuses to run as root, so the tests are skipped there and when the binaries are missing.
+    """
+
+    def __init__(self) -> None:
+        self._url: str | None = None
+        self._data_dir: Path | None = None
+
+    def start(self) -> str:
+        """
+        Make a server available.
+
+        :raises unittest.SkipTest: If no server is configured and none can be started.
+        :returns: Async SQLAlchemy DSN of the maintenance database.
+        """
+        configured = os.environ.get(_ENV_URL)
+        if configured:
+            self._url = configured
+            return configured
+        initdb, pg_ctl = shutil.which("initdb"), shutil.which("pg_ctl")
+        if initdb is None or pg_ctl is None:
+            raise unittest.SkipTest(f"PostgreSQL binaries are not on PATH and {_ENV_URL} is not set.")
+        if os.geteuid() == 0:
+            raise unittest.SkipTest(f"PostgreSQL cannot run as root; set {_ENV_URL} instead.")
+
+        self._data_dir = Path(tempfile.mkdtemp(prefix="askbro-pg-"))
+        port = _free_port()
+        subprocess.run(  # noqa: S603 - binaries resolved from PATH, arguments built here
+            [initdb, "-D", str(self._data_dir), "-U", "postgres", "--auth=trust", "-E", "UTF8"],
+            check=True,
+            capture_output=True,
+        )
+        options = f"-p {port} -k {self._data_dir} -c listen_addresses=127.0.0.1 -c fsync=off"
+        subprocess.run(  # noqa: S603 - binaries resolved from PATH, arguments built here
+            [pg_ctl, "-D", str(self._data_dir), "-l", str(self._data_dir / "server.log"), "-o", options, "-w", "start"],
+            check=True,
+            capture_output=True,
+        )
+        self._url = f"postgresql+asyncpg://postgres@127.0.0.1:{port}/postgres"
+        return self._url
+
+    def stop(self) -> None:
+        """
+        Stop and remove the cluster started by :meth:`start`; a configured server is left alone.
+        """
+        if self._data_dir is None:
+            return
+        pg_ctl = shutil.which("pg_ctl")
+        if pg_ctl is not None:
+            subprocess.run(  # noqa: S603 - binaries resolved from PATH, arguments built here
+                [pg_ctl, "-D", str(self._data_dir), "-m", "immediate", "stop"], capture_output=True
+            )
+        shutil.rmtree(self._data_dir, ignore_errors=True)
+        self._data_dir = None
+
+    async def create_database(self) -> str:
+        """
+        Create an empty database so that every test starts from a clean schema.
+
+        :returns: Async SQLAlchemy DSN of the new database.
+        """
+        name = f"test_{uuid.uuid4().hex}"
+        await self._execute(f'CREATE DATABASE "{name}"')
+        return make_url(self._require_url()).set(database=name).render_as_string(hide_password=False)
+
+    async def drop_database(self, database_url: str) -> None:
+        """
+        Drop a database created by :meth:`create_database`.
+
+        :param database_url: DSN returned by :meth:`create_database`.
+        """
+        name = make_url(database_url).database
+        await self._execute(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)')
+
+    async def _execute(self, statement: str) -> None:
+        # CREATE/DROP DATABASE cannot run inside a transaction block.
+        engine = create_async_engine(self._require_url(), isolation_level="AUTOCOMMIT")
+        try:
+            async with engine.connect() as connection:
+                await connection.execute(text(statement))
+        finally:
+            await engine.dispose()
+
+    def _require_url(self) -> str:
+        if self._url is None:
+            raise RuntimeError("PostgresServer.start() has not been called.")
+        return self._url
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port: int = probe.getsockname()[1]
+        return port
@@ -0,0 +1,53 @@
+import unittest
+
+from injector import Injector
+
+from ai_client.dispatcher import AiCallContext, AiDispatcher, AiPriority
+from ai_client.fake import FakeAiClient
+from ai_client.messages import AiMessage, AiRole, MessageChain
+from database.models import ModelConfiguration
+from tests.fake_client import build_fake_client
+from utils.metrics import MetricsRegistry
+
+
+class BatchError(Exception):
+    """Failure of one batch request."""
+
+
+class RecordingFakeAiClient(FakeAiClient):
+    """Fake client that records the dispatcher context of its calls and fails chains asking for it."""
+
+    contexts: list[AiCallContext] = []
+
+    async def _answer(self, message_chain: MessageChain, model_config: ModelConfiguration | None = None) -> str:
+        self.contexts.append(AiDispatcher.current())
+        if message_chain[-1].content == "fail":
+            raise BatchError()
+        return await super()._answer(message_chain, model_config)
+
+
+def chain(content: str) -> MessageChain:
+    return [AiMessage(role=AiRole.USER, content=content)]
+
+
+class SubmitBatchTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        RecordingFakeAiClient.contexts = []
+        self.injector = Injector()
+        self.client = build_fake_client(RecordingFakeAiClient, self.injector, latency=0.0)
+
+    async def test_calls_run_in_background_class(self) -> None:
+        job = self.client.submit_batch([chain("one"), chain("two"), chain("three")], chat_id=7)
+
+        results = await job.results()
+
+        self.assertEqual([result.text for result in results], ["one", "two", "three"])
+        self.assertEqual(set(RecordingFakeAiClient.contexts), {AiCallContext(AiPriority.BACKGROUND, 7)})
+        metrics = self.injector.get(MetricsRegistry)
+        self.assertEqual(metrics.counter("ai.batch_results", provider="fake", result="ok").value, 3)
+
+    async def test_errors_are_collected_per_request(self) -> None:
+        results = await self.client.submit_batch([chain("fail"), chain("ok")]).results()
+
+        self.assertIsInstance(results[0].error, BatchError)
+        self.assertEqual(results[1].text, "ok")
@@ -0,0 +1,125 @@
+import asyncio
+import unittest
+from typing import AsyncGenerator, AsyncIterator
+
+from injector import Injector
+
+from ai_client.coalescer import RequestCoalescer
+from ai_client.fake import FakeAiClient
+from ai_client.messages import AiMessage, AiRole
+from cache.valkey import ValkeyCache
+from settings.ai_client.cache_settings import AiCacheSettings
+from settings.cache import CacheSettings
+from tests.fake_client import build_fake_client
+from utils.metrics import MetricsRegistry
+
+PROVIDER = "test"
+KEY = "completion"
+
+
+class ProviderError(Exception):
+    """Failure raised by the fake upstream stream."""
+
+
+class Upstream:
+    """Fake provider stream that yields one delta each time the test releases it."""
+
+    def __init__(self, *deltas: str, error: Exception | None = None) -> None:
+        self.deltas = deltas
+        self.error = error
+        self.opened = 0
+        self.closed = False
+        self.release = asyncio.Semaphore(0)
+
+    async def __call__(self) -> AsyncGenerator[str]:
+        self.opened += 1
+        try:
+            for delta in self.deltas:
+                await self.release.acquire()
+                yield delta
+            if self.error is not None:
+                raise self.error
+        finally:
+            self.closed = True
+
+    def release_all(self) -> None:
+        for _ in self.deltas:
+            self.release.release()
+
+
+async def collect(deltas: AsyncIterator[str]) -> str:
+    return "".join([delta async for delta in deltas])
+
+
+class StreamCoalescingTest(unittest.IsolatedAsyncioTestCase):
+    """
+    Concurrent identical streams share one upstream stream and see every delta.
+    """
+
+    def setUp(self) -> None:
+        self.metrics = MetricsRegistry()
+        self.coalescer = RequestCoalescer(AiCacheSettings(), ValkeyCache(CacheSettings()), self.metrics)
+
+    async def test_followers_share_the_upstream(self) -> None:
+        upstream = Upstream("a", "b", "c")
+        leader = asyncio.create_task(collect(self.coalescer.stream(PROVIDER, KEY, upstream)))
+        upstream.release.release()
+        await asyncio.sleep(0.01)
+        # Joins after the first delta and still receives the whole reply.
+        follower = asyncio.create_task(collect(self.coalescer.stream(PROVIDER, KEY, upstream)))
+        await asyncio.sleep(0.01)
+        upstream.release.release()
+        upstream.release.release()
+
+        self.assertEqual(await asyncio.gather(leader, follower), ["abc", "abc"])
+        self.assertEqual(upstream.opened, 1)
+        self.assertEqual(self.metrics.counter("ai.coalesce", provider=PROVIDER, scope="local").value, 1)
+
+    async def test_error_reaches_every_subscriber(self) -> None:
+        upstream = Upstream("a", error=ProviderError())
+        subscribers = [asyncio.create_task(collect(self.coalescer.stream(PROVIDER, KEY, upstream))) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        upstream.release_all()
+
+        results = await asyncio.gather(*subscribers, return_exceptions=True)
+        self.assertTrue(all(isinstance(result, ProviderError) for result in results))
+        self.assertEqual(upstream.opened, 1)
+
+    async def test_upstream_survives_while_someone_reads(self) -> None:
+        upstream = Upstream("a", "b")
+        leaving = self.coalescer.stream(PROVIDER, KEY, upstream)
+        staying = asyncio.create_task(collect(self.coalescer.stream(PROVIDER, KEY, upstream)))
+        upstream.release.release()
+        self.assertEqual(await anext(leaving), "a")
+        await leaving.aclose()
+        upstream.release.release()
+
+        self.assertEqual(await staying, "ab")
+
+    async def test_upstream_cancelled_when_everyone_leaves(self) -> None:
+        upstream = Upstream("a", "b")
+        deltas = self.coalescer.stream(PROVIDER, KEY, upstream)
+        upstream.release.release()
+        self.assertEqual(await anext(deltas), "a")
+        await deltas.aclose()
+        await asyncio.sleep(0.01)
+
+        self.assertTrue(upstream.closed)
+        # The next identical request starts a fresh upstream stream.
+        upstream.release_all()
+        self.assertEqual(await collect(self.coalescer.stream(PROVIDER, KEY, upstream)), "ab")
+        self.assertEqual(upstream.opened, 2)
+
+
+class ClientStreamCoalescingTest(unittest.IsolatedAsyncioTestCase):
+    async def test_identical_client_streams_share_one_call(self) -> None:
+        injector = Injector()
+        client = build_fake_client(FakeAiClient, injector, latency=0.02, tokens_per_second=200.0)
+        chain = [AiMessage(role=AiRole.USER, content="one shared reply")]
+
+        replies = await asyncio.gather(*(collect(client.stream(chain)) for _ in range(3)))
+
+        self.assertEqual(replies, ["one shared reply"] * 3)
+        metrics = injector.get(MetricsRegistry)
+        self.assertEqual(metrics.counter("ai.coalesce", provider="fake", scope="leader").value, 1)
+        self.assertEqual(metrics.counter("ai.coalesce", provider="fake", scope="local").value, 2)
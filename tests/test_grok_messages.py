@@ -0,0 +1,42 @@
+import unittest
+from unittest.mock import patch
+
+from injector import Injector
+
+from ai_client.dispatcher import AiDispatcher, AiPriority
+from ai_client.grok import GrokAiClient
+from ai_client.messages import AiMessage, AiRole
+
+
+def messages(count: int, chars: int = 10) -> list[AiMessage]:
+    return [AiMessage(role=AiRole.USER, content=f"{position}".ljust(chars, "x")) for position in range(count)]
+
+
+class MessageCacheTest(unittest.TestCase):
+    """
+    Converted messages of interactive calls are reused; summaries do not evict them.
+    """
+
+    def setUp(self) -> None:
+        self.client = Injector().get(GrokAiClient)
+
+    def test_interactive_messages_are_reused(self) -> None:
+        chain = messages(3)
+        first = self.client.convert_messages(chain)
+        self.assertEqual([id(item) for item in self.client.convert_messages(chain)], [id(item) for item in first])
+
+    def test_summary_reads_without_storing(self) -> None:
+        chain = messages(3)
+        cached = self.client.convert_messages(chain)
+        with AiDispatcher.context(AiPriority.SUMMARY):
+            converted = self.client.convert_messages([*chain, *messages(50)[3:]])
+
+        self.assertEqual([id(item) for item in converted[:3]], [id(item) for item in cached])
+        self.assertEqual(len(self.client._message_cache), 3)
+
+    def test_cache_is_bounded_by_text_size(self) -> None:
+        with patch.object(GrokAiClient, "_MESSAGE_CACHE_CHARS", 250):
+            self.client.convert_messages(messages(5, chars=100))
+
+        self.assertEqual(len(self.client._message_cache), 2)
+        self.assertEqual(self.client._message_cache_chars, 200)
@@ -0,0 +1,35 @@
+import unittest
+from uuid import uuid4
+
+from injector import Injector
+
+from ai_client.base import BaseAiClient
+from ai_client.grok import GrokAiClient
+from ai_client.model_params import BaseModelParams
+from database.models import Model, ModelConfiguration
+
+
+class ParamsCacheTest(unittest.TestCase):
+    """
+    Cached provider parameters follow every edit of the configuration, however quickly it follows the previous one.
+    """
+
+    def setUp(self) -> None:
+        self.client = Injector().get(GrokAiClient)
+        model = Model(id=uuid4(), name="grok-4-fast-reasoning", display_name="Grok 4 Fast")
+        self.configuration = ModelConfiguration(id=uuid4(), model_id=model.id, model=model, temperature=0.5)
+
+    def test_edit_changes_the_parameters(self) -> None:
+        self.assertEqual(self.client.provider_kwargs(self.configuration)["temperature"], 0.5)
+        # No flush in between, so ``updated_at`` stays the same.
+        self.configuration.temperature = 0.1
+        self.configuration.stop_sequences = ["END"]
+
+        kwargs = self.client.provider_kwargs(self.configuration)
+
+        self.assertEqual((kwargs["temperature"], kwargs["stop_sequences"]), (0.1, ["END"]))
+
+    def test_key_covers_every_configured_parameter(self) -> None:
+        columns = {attribute.key for attribute in ModelConfiguration.__mapper__.column_attrs}
+        keyed = {*BaseAiClient._PARAM_FIELDS, "system_message", "stop_sequences"}
+        self.assertEqual(keyed, columns & set(BaseModelParams.model_fields))
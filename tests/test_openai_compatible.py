@@ -0,0 +1,131 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any, AsyncIterator
+from unittest.mock import patch
+
+from injector import Injector
+
+from ai_client.messages import AiMessage, AiRole
+from ai_client.openai_compatible import OpenAiCompatibleAiClient
+from settings.ai_client.cache_settings import AiCacheSettings
+from settings.ai_client.openai_compatible_settings import OpenAiCompatibleSettings
+from settings.ai_client.resilience_settings import AiResilienceSettings, ResiliencePolicy
+from tests.openai_server import StubOpenAiServer, StubResponse, self_signed_certificate
+from utils.metrics import MetricsRegistry
+
+MODEL = "stub-model"
+CHAIN = [AiMessage(role=AiRole.USER, content="Hello")]
+USAGE = {"prompt_tokens": 12, "completion_tokens": 3, "prompt_tokens_details": {"cached_tokens": 8}}
+
+
+def completion(content: str, usage: dict[str, Any] | None = None) -> StubResponse:
+    body: dict[str, Any] = {"choices": [{"index": 0, "message": {"role": "assistant", "content": content}}]}
+    if usage is not None:
+        body["usage"] = usage
+    return StubResponse(body=body)
+
+
+def stream(*deltas: str, usage: dict[str, Any] | None = None) -> StubResponse:
+    events: list[dict[str, Any]] = [{"choices": [{"index": 0, "delta": {"content": delta}}]} for delta in deltas]
+    if usage is not None:
+        events.append({"choices": [], "usage": usage})
+    return StubResponse(events=events)
+
+
+async def collect(deltas: AsyncIterator[str]) -> str:
+    return "".join([delta async for delta in deltas])
+
+
+class OpenAiCompatibleClientTest(unittest.IsolatedAsyncioTestCase):
+    """
+    The OpenAI-compatible client against a local stub server speaking the chat completions API.
+    """
+
+    async def start(self, *responses: StubResponse, http2: bool = False, **server: Any) -> OpenAiCompatibleAiClient:
+        self.server = StubOpenAiServer(*responses, **server)
+        base_url = await self.server.start()
+        self.addAsyncCleanup(self.server.stop)
+
+        self.injector = Injector()
+        settings = OpenAiCompatibleSettings().model_copy(
+            update={"base_url": base_url, "http2": http2, "default_model": MODEL, "system_message": None}
+        )
+        policy = ResiliencePolicy(max_attempts=3, backoff_base=0.0, attempt_timeout=5.0, deadline=10.0)
+        self.injector.binder.bind(OpenAiCompatibleSettings, to=settings)
+        self.injector.binder.bind(AiResilienceSettings, to=AiResilienceSettings(default=policy))
+        self.injector.binder.bind(AiCacheSettings, to=AiCacheSettings(enabled=False, valkey_enabled=False))
+        client = self.injector.get(OpenAiCompatibleAiClient)
+        self.addAsyncCleanup(client.aclose)
+        return client
+
+    def counter(self, name: str) -> float:
+        provider = OpenAiCompatibleAiClient.get_name()
+        return self.injector.get(MetricsRegistry).counter(name, provider=provider, model=MODEL).value
+
+    async def test_plain_reply(self) -> None:
+        client = await self.start(completion("Hi there"))
+
+        self.assertEqual(await client.generate(CHAIN), "Hi there")
+
+        request = self.server.requests[0]
+        self.assertEqual(request.path, "/v1/chat/completions")
+        self.assertEqual(request.body["model"], MODEL)
+        self.assertEqual(request.body["messages"], [{"role": "user", "content": "Hello"}])
+        self.assertNotIn("stream", request.body)
+
+    async def test_streamed_reply(self) -> None:
+        client = await self.start(stream("Hi", " there", "!"))
+
+        deltas = [delta async for delta in client.generate_stream(CHAIN)]
+
+        self.assertEqual(deltas, ["Hi", " there", "!"])
+        body = self.server.requests[0].body
+        self.assertEqual((body["stream"], body["stream_options"]), (True, {"include_usage": True}))
+
+    async def test_usage_is_recorded(self) -> None:
+        client = await self.start(completion("Hi", usage=USAGE), stream("Hi", usage=USAGE))
+
+        await client.generate(CHAIN)
+        await collect(client.generate_stream(CHAIN))
+
+        self.assertEqual(self.counter("ai.prompt_tokens"), 24)
+        self.assertEqual(self.counter("ai.cached_prompt_tokens"), 16)
+        self.assertEqual(self.counter("ai.completion_tokens"), 6)
+
+    async def test_retries_on_503(self) -> None:
+        client = await self.start(StubResponse(status=503), StubResponse(status=503), completion("Recovered"))
+
+        self.assertEqual(await client.generate(CHAIN), "Recovered")
+        self.assertEqual(len(self.server.requests), 3)
+
+    async def test_stream_retries_on_503(self) -> None:
+        client = await self.start(StubResponse(status=503), stream("Recovered"))
+
+        self.assertEqual(await collect(client.generate_stream(CHAIN)), "Recovered")
+        self.assertEqual(len(self.server.requests), 2)
+
+    async def test_aclose_reopens_the_pool(self) -> None:
+        client = await self.start(completion("one"), completion("two"))
+
+        self.assertEqual(await client.generate(CHAIN), "one")
+        pool = client._client
+        await client.aclose()
+
+        self.assertTrue(pool is not None and pool.is_closed)
+        self.assertEqual(await client.generate(CHAIN), "two")
+
+    @unittest.skipUnless(importlib.util.find_spec("h2"), "HTTP/2 needs the h2 package of httpx[http2].")
+    async def test_http2(self) -> None:
+        directory = tempfile.TemporaryDirectory(prefix="askbro-h2-")
+        self.addCleanup(directory.cleanup)
+        tls, certificate = self_signed_certificate(Path(directory.name))
+        with patch.dict(os.environ, {"SSL_CERT_FILE": str(certificate)}):
+            client = await self.start(completion("one"), stream("t", "wo"), http2=True, tls=tls)
+            # Opening the pool reads the trusted certificates.
+            self.assertEqual(await client.generate(CHAIN), "one")
+        self.assertEqual(await collect(client.generate_stream(CHAIN)), "two")
+
+        self.assertEqual([request.http_version for request in self.server.requests], ["HTTP/2", "HTTP/2"])
@@ -0,0 +1,118 @@
+import asyncio
+import os
+import subprocess
+import sys
+import unittest
+import uuid
+from pathlib import Path
+
+from sqlalchemy import func, select, text
+
+from database.connection import _NOT_DELETED_CRITERIA, DatabaseConnection
+from database.models import Chat, ChatConfiguration, ModelFallback
+from services.chat_service import ChatService
+from settings.database import DatabaseSettings
+from tests.postgres import PostgresServer
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SERVER = PostgresServer()
+
+
+def setUpModule() -> None:
+    SERVER.start()
+
+
+def tearDownModule() -> None:
+    SERVER.stop()
+
+
+def run_alembic(database_url: str, *args: str) -> None:
+    subprocess.run(  # noqa: S603 - runs this interpreter's alembic with fixed arguments
+        [sys.executable, "-m", "alembic", *args],
+        cwd=ROOT_DIR,
+        env={**os.environ, "DATABASE_URL": database_url},
+        check=True,
+        capture_output=True,
+    )
+
+
+class PostgresTestCase(unittest.IsolatedAsyncioTestCase):
+    """
+    Run each test against a freshly migrated PostgreSQL database.
+    """
+
+    async def asyncSetUp(self) -> None:
+        self.database_url = await SERVER.create_database()
+        await asyncio.to_thread(run_alembic, self.database_url, "upgrade", "head")
+        self.connection = DatabaseConnection(DatabaseSettings(database_url=self.database_url))
+
+    async def asyncTearDown(self) -> None:
+        await self.connection.dispose()
+        await SERVER.drop_database(self.database_url)
+
+
+class MigrationsTest(PostgresTestCase):
+    async def test_boolean_defaults(self) -> None:
+        async with self.connection.engine.connect() as connection:
+            result = await connection.execute(
+                text(
+                    "SELECT table_name, column_name, column_default FROM information_schema.columns "
+                    "WHERE table_schema = 'public' AND data_type = 'boolean'"
+                )
+            )
+            defaults = {(row.table_name, row.column_name): row.column_default for row in result}
+
+        self.assertEqual(defaults[("chat_configuration", "allowed")], "false")
+        self.assertEqual(defaults[("model", "active")], "true")
+        self.assertEqual(defaults[("provider", "is_default")], "false")
+        self.assertEqual({defaults[(table, "deleted")] for table, _ in defaults}, {"false"})
+
+    async def test_downgrade_to_base(self) -> None:
+        await asyncio.to_thread(run_alembic, self.database_url, "downgrade", "base")
+        async with self.connection.engine.connect() as connection:
+            tables = await connection.scalars(
+                text("SELECT tablename FROM pg_tables WHERE schemaname = 'public' AND tablename <> 'alembic_version'")
+            )
+            self.assertEqual(list(tables), [])
+
+    async def test_soft_delete_criteria_uses_partial_index(self) -> None:
+        stmt = (
+            select(ModelFallback)
+            .where(ModelFallback.model_configuration_id == uuid.uuid4())
+            .options(_NOT_DELETED_CRITERIA)
+        )
+        async with self.connection.engine.connect() as connection:
+            sql = str(stmt.compile(connection, compile_kwargs={"literal_binds": True}))
+            await connection.execute(text("SET enable_seqscan = off"))
+            plan = "\n".join(await connection.scalars(text(f"EXPLAIN {sql}")))
+
+        self.assertIn("ix_model_fallback_configuration_position_not_deleted", plan)
+
+
+class ChatServiceTest(PostgresTestCase):
+    """
+    Exercise the PostgreSQL ``ON CONFLICT`` upserts against the default model seeded by the migrations.
+    """
+
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        self.service = ChatService(self.connection)
+
+    async def test_ensure_exists_creates_denied_configuration(self) -> None:
+        record = await self.service.ensure_exists(-100123, title="Team", chat_type="supergroup")
+
+        assert record is not None
+        self.assertFalse(record.allowed)
+        self.assertEqual(record.chat.telegram_chat_id, -100123)
+        assert record.model_configuration is not None
+        self.assertEqual(record.model_configuration.model.name, "grok-4-mini")
+
+    async def test_concurrent_ensure_exists_upserts_once(self) -> None:
+        records = await asyncio.gather(
+            *(self.service.ensure_exists(42, title=f"Chat {index}", chat_type="private") for index in range(5))
+        )
+
+        self.assertEqual(len({record.id for record in records if record is not None}), 1)
+        async with self.connection.read_session() as session:
+            self.assertEqual(await session.scalar(select(func.count()).select_from(Chat)), 1)
+            self.assertEqual(await session.scalar(select(func.count()).select_from(ChatConfiguration)), 1)
@@ -0,0 +1,191 @@
+import asyncio
+import time
+import unittest
+from typing import Any, AsyncGenerator
+from unittest import mock
+
+from injector import Injector
+
+from ai_client.fake import FakeAiClient, FakeAiError
+from ai_client.messages import AiMessage, AiRole
+from ai_client.resilience import AiResilience, CircuitOpenError, CircuitState
+from settings.ai_client.resilience_settings import AiResilienceSettings, ResiliencePolicy
+from tests.fake_client import build_fake_client
+from utils.metrics import MetricsRegistry
+
+PROVIDER = "test"
+
+
+class ProviderError(Exception):
+    """Transient provider failure used to open the circuit."""
+
+
+def is_retryable(exc: BaseException) -> bool:
+    return isinstance(exc, ProviderError)
+
+
+async def fail() -> str:
+    raise ProviderError
+
+
+async def succeed() -> str:
+    return "ok"
+
+
+class HalfOpenProbeTest(unittest.IsolatedAsyncioTestCase):
+    """
+    A half-open probe that ends without proving or disproving provider health must hand its slot back.
+    """
+
+    async def asyncSetUp(self) -> None:
+        policy = ResiliencePolicy(max_attempts=1, failure_threshold=1, reset_timeout=0.0, half_open_max_calls=1)
+        self.resilience = AiResilience(AiResilienceSettings(default=policy), MetricsRegistry())
+        with self.assertRaises(ProviderError):
+            await self.resilience.call(PROVIDER, fail, is_retryable)
+        self.assertIs(self.resilience._get_breaker(PROVIDER).state, CircuitState.OPEN)
+
+    async def assert_probe_released(self) -> None:
+        self.assertIs(self.resilience._get_breaker(PROVIDER).state, CircuitState.HALF_OPEN)
+        self.assertEqual(await self.resilience.call(PROVIDER, succeed, is_retryable), "ok")
+        self.assertIs(self.resilience._get_breaker(PROVIDER).state, CircuitState.CLOSED)
+
+    async def test_cancelled_call(self) -> None:
+        started = asyncio.Event()
+
+        async def hang() -> str:
+            started.set()
+            await asyncio.Event().wait()
+            return "unreachable"
+
+        task = asyncio.create_task(self.resilience.call(PROVIDER, hang, is_retryable))
+        await started.wait()
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        await self.assert_probe_released()
+
+    async def test_closed_stream(self) -> None:
+        async def chunks() -> AsyncGenerator[str]:
+            yield "first"
+            yield "second"
+
+        stream = self.resilience.stream(PROVIDER, chunks, is_retryable)
+        self.assertEqual(await anext(stream), "first")
+        await stream.aclose()
+        await self.assert_probe_released()
+
+    async def test_non_retryable_error_after_output(self) -> None:
+        async def chunks() -> AsyncGenerator[str]:
+            yield "first"
+            raise ValueError("malformed chunk")
+
+        with self.assertRaises(ValueError):
+            async for _ in self.resilience.stream(PROVIDER, chunks, is_retryable):
+                pass
+        await self.assert_probe_released()
+
+
+class FlakyFakeAiClient(FakeAiClient):
+    """Fake provider whose first ``failures`` calls fail with a transient error."""
+
+    failures = 0
+    calls = 0
+
+    def _inject_error(self) -> None:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("transient failure")
+        super()._inject_error()
+
+
+class FakeProviderResilienceTest(unittest.IsolatedAsyncioTestCase):
+    """
+    The resilience policy as applied to a provider client, exercised with :class:`FakeAiClient`.
+    """
+
+    CHAIN = [AiMessage(role=AiRole.USER, content="ping")]
+
+    def build(self, policy: ResiliencePolicy, **settings: Any) -> FlakyFakeAiClient:
+        self.injector = Injector()
+        self.injector.binder.bind(AiResilienceSettings, to=AiResilienceSettings(default=policy))
+        return build_fake_client(FlakyFakeAiClient, self.injector, **{"latency": 0.0, **settings})
+
+    def counter(self, name: str) -> float:
+        return self.injector.get(MetricsRegistry).counter(name, provider="fake").value
+
+    async def test_retries_with_exponential_backoff(self) -> None:
+        client = self.build(ResiliencePolicy(max_attempts=4, backoff_base=0.01, backoff_max=0.03))
+        client.failures = 3
+        ceilings: list[float] = []
+
+        def no_jitter(low: float, high: float) -> float:
+            ceilings.append(high)
+            return low
+
+        with mock.patch("ai_client.resilience.random.uniform", side_effect=no_jitter):
+            self.assertEqual(await client.generate(self.CHAIN), "ping")
+
+        self.assertEqual(client.calls, 4)
+        self.assertEqual(ceilings, [0.01, 0.02, 0.03])
+        self.assertEqual(self.counter("ai.retries"), 3)
+
+    async def test_gives_up_after_max_attempts(self) -> None:
+        client = self.build(ResiliencePolicy(max_attempts=3, backoff_base=0.0, failure_threshold=10))
+        client.failures = 5
+
+        with self.assertRaises(ConnectionError):
+            await client.generate(self.CHAIN)
+        self.assertEqual(client.calls, 3)
+
+    async def test_deadline_bounds_all_attempts(self) -> None:
+        policy = ResiliencePolicy(attempt_timeout=0.05, deadline=0.12, max_attempts=100, backoff_base=0.0)
+        client = self.build(policy, latency=1.0)
+
+        started = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            await client.generate(self.CHAIN)
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertLessEqual(self.counter("ai.retries"), 3)
+
+    async def test_deadline_applies_after_stream_output(self) -> None:
+        # Every chunk arrives within the attempt timeout, but the whole reply would take about a second.
+        policy = ResiliencePolicy(attempt_timeout=0.5, deadline=0.2, max_attempts=1)
+        client = self.build(policy, tokens_per_second=20.0)
+        chunks: list[str] = []
+
+        started = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            async for chunk in client.generate_stream([AiMessage(role=AiRole.USER, content="word " * 20)]):
+                chunks.append(chunk)
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertTrue(chunks)
+
+    async def test_breaker_opens_after_failure_threshold(self) -> None:
+        client = self.build(ResiliencePolicy(max_attempts=1, failure_threshold=3, reset_timeout=60.0))
+        client.failures = 10
+
+        for _ in range(3):
+            with self.assertRaises(ConnectionError):
+                await client.generate(self.CHAIN)
+        self.assertFalse(client.is_available())
+        with self.assertRaises(CircuitOpenError):
+            await client.generate(self.CHAIN)
+        self.assertEqual(client.calls, 3)
+        self.assertEqual(self.counter("ai.circuit_rejected"), 1)
+
+    async def test_non_retryable_errors_propagate_at_once(self) -> None:
+        client = self.build(
+            ResiliencePolicy(max_attempts=3, failure_threshold=1), error_rate=1.0, error_retryable=False
+        )
+
+        for _ in range(2):
+            with self.assertRaises(FakeAiError):
+                await client.generate(self.CHAIN)
+        self.assertEqual(client.calls, 2)
+        self.assertEqual(self.counter("ai.retries"), 0)
+        # Invalid requests say nothing about provider health, so the circuit stays closed.
+        self.assertTrue(client.is_available())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import asyncio
+import unittest
+from typing import Any, cast
+from unittest.mock import patch
+
+from ai_client.messages import AiMessage, AiRole
+from ai_client.router import AiRoute, AiRouter
+from settings.ai_client.router_settings import AiRouterSettings
+from utils.metrics import MetricsRegistry
+
+MIN_SAMPLES = 3
+
+
+class StubClient:
+    """Provider client stub answering after a fixed delay."""
+
+    def __init__(self, name: str, delay: float = 0.0) -> None:
+        self.name = name
+        self.delay = delay
+
+    def get_name(self) -> str:
+        return self.name
+
+    def resolve_model_name(self, model_configuration: object) -> str:
+        del model_configuration
+        return "model"
+
+    def is_available(self) -> bool:
+        return True
+
+    async def generate(self, message_chain: object, model_configuration: object) -> str:
+        del message_chain, model_configuration
+        await asyncio.sleep(self.delay)
+        return self.name
+
+
+class Clock:
+    """Replacement for ``time.monotonic`` advanced by the test."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def build_router(**settings: Any) -> AiRouter:
+    settings.setdefault("min_samples", MIN_SAMPLES)
+    return AiRouter(cast(Any, None), AiRouterSettings(**settings), MetricsRegistry(), cast(Any, None))
+
+
+def route(name: str, delay: float = 0.0) -> AiRoute:
+    return AiRoute(cast(Any, StubClient(name, delay)), cast(Any, None))
+
+
+class RouteRecoveryTest(unittest.TestCase):
+    """
+    A demoted primary is reconsidered once its samples expire and receives periodic probe calls.
+    """
+
+    def setUp(self) -> None:
+        self.clock = Clock()
+        patcher = patch("ai_client.router.time.monotonic", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.primary, self.fallback = route("primary"), route("fallback")
+        self.routes = [self.primary, self.fallback]
+
+    def names(self, router: AiRouter) -> list[str]:
+        return [item.client.get_name() for item in router.order(self.routes)]
+
+    def test_errors_expire(self) -> None:
+        router = build_router(stats_max_age=60.0, probe_interval=None)
+        for _ in range(MIN_SAMPLES):
+            router._record(self.primary, None)
+        self.assertEqual(self.names(router), ["fallback", "primary"])
+
+        self.clock.now += 61.0
+        self.assertEqual(self.names(router), ["primary", "fallback"])
+
+    def test_slow_primary_is_probed(self) -> None:
+        router = build_router(stats_max_age=3600.0, probe_interval=30.0)
+        for _ in range(MIN_SAMPLES):
+            router._record(self.primary, 10.0)
+            router._record(self.fallback, 1.0)
+        self.assertEqual(self.names(router), ["fallback", "primary"])
+
+        self.clock.now += 31.0
+        self.assertEqual(self.names(router), ["primary", "fallback"])
+        # One probe per interval; the fallback stays preferred in between.
+        self.assertEqual(self.names(router), ["fallback", "primary"])
+        self.assertEqual(router._metrics.counter("ai.route_probes", route=self.primary.key).value, 1)
+
+    def test_preferred_primary_is_not_probed(self) -> None:
+        router = build_router(probe_interval=30.0)
+        self.clock.now += 31.0
+        self.assertEqual(self.names(router), ["primary", "fallback"])
+        self.assertEqual(router._metrics.counter("ai.route_probes", route=self.primary.key).value, 0)
+
+
+class HedgeLoserTest(unittest.IsolatedAsyncioTestCase):
+    async def test_cancelled_loser_records_latency(self) -> None:
+        router = build_router(hedge_delay=0.01, min_samples=1, probe_interval=None)
+        slow, fast = route("slow", delay=10.0), route("fast")
+        chain = [AiMessage(role=AiRole.USER, content="hi")]
+
+        self.assertEqual(await router.generate([slow, fast], chain), "fast")
+
+        self.assertEqual(router._metrics.counter("ai.route_calls", route=slow.key, result="cancelled").value, 1)
+        self.assertGreaterEqual(router._p95(slow), 0.01)
+        # The lower bound is a latency sample only; it does not count as an error.
+        self.assertTrue(router._is_healthy(slow))
@@ -0,0 +1,59 @@
+import unittest
+from datetime import timedelta
+from typing import Any, cast
+
+from telegram import Message
+from telegram.error import BadRequest, RetryAfter
+
+from bot_runtime.streaming_reply import StreamingReply
+from utils.metrics import MetricsRegistry
+
+NO_DELAY = timedelta(0)
+
+
+class FakeMessage:
+    """Message stub whose ``edit_text`` raises the queued errors before succeeding."""
+
+    def __init__(self, *errors: Exception) -> None:
+        self.errors = list(errors)
+        self.edits: list[str] = []
+
+    async def edit_text(self, text: str) -> None:
+        self.edits.append(text)
+        if self.errors:
+            raise self.errors.pop(0)
+
+
+class ForcedEditTest(unittest.IsolatedAsyncioTestCase):
+    """
+    A forced edit retried after ``RetryAfter`` gets the same error handling as the first attempt.
+    """
+
+    def reply(self) -> StreamingReply:
+        return StreamingReply(
+            cast(Message, FakeMessage()), edit_interval=0.0, metrics=MetricsRegistry(), provider="test"
+        )
+
+    async def edit(self, message: FakeMessage) -> None:
+        await self.reply()._edit(cast(Any, message), "text", force=True)
+
+    async def test_not_modified_after_retry(self) -> None:
+        message = FakeMessage(RetryAfter(NO_DELAY), BadRequest("Message is not modified"))
+        await self.edit(message)
+        self.assertEqual(len(message.edits), 2)
+
+    async def test_repeated_retry_after(self) -> None:
+        message = FakeMessage(RetryAfter(NO_DELAY), RetryAfter(NO_DELAY))
+        await self.edit(message)
+        self.assertEqual(len(message.edits), 3)
+
+    async def test_gives_up_after_attempts(self) -> None:
+        message = FakeMessage(*(RetryAfter(NO_DELAY) for _ in range(StreamingReply.FORCED_EDIT_ATTEMPTS)))
+        with self.assertRaises(RetryAfter):
+            await self.edit(message)
+        self.assertEqual(len(message.edits), StreamingReply.FORCED_EDIT_ATTEMPTS)
+
+    async def test_other_bad_request_after_retry(self) -> None:
+        message = FakeMessage(RetryAfter(NO_DELAY), BadRequest("Message to edit not found"))
+        with self.assertRaises(BadRequest):
+            await self.edit(message)
@@ -0,0 +1,60 @@
+import asyncio
+import unittest
+from typing import Any, Mapping, cast
+
+from ai_client.usage import AiUsage, UsageKey, UsageRecorder, UsageTotals
+from bot_runtime.usage_flusher import UsageFlusher
+from settings.ai_client.usage_settings import AiUsageSettings
+from utils.metrics import MetricsRegistry
+
+
+class FlakyUsageService:
+    """Usage service stub that fails the first writes with an arbitrary error."""
+
+    def __init__(self, failures: int) -> None:
+        self.failures = failures
+        self.written: list[dict[UsageKey, UsageTotals]] = []
+
+    async def add(self, pending: Mapping[UsageKey, UsageTotals]) -> None:
+        if self.failures > 0:
+            self.failures -= 1
+            raise ValueError("unexpected payload")
+        self.written.append(dict(pending))
+
+
+class UsageFlusherTest(unittest.IsolatedAsyncioTestCase):
+    """
+    A failed write keeps the drained totals and the background loop alive, whatever the error.
+    """
+
+    async def asyncSetUp(self) -> None:
+        self.settings = AiUsageSettings(flush_interval=0.01)
+        self.recorder = UsageRecorder(self.settings, MetricsRegistry())
+        await self.recorder.record("fake", "fake", AiUsage(prompt_tokens=10, completion_tokens=2), latency=0.1)
+
+    def flusher(self, service: FlakyUsageService) -> UsageFlusher:
+        return UsageFlusher(self.settings, self.recorder, cast(Any, service))
+
+    async def test_failed_write_restores_totals(self) -> None:
+        service = FlakyUsageService(failures=1)
+        flusher = self.flusher(service)
+
+        self.assertEqual(await flusher.flush(), 0)
+        self.assertEqual(await flusher.flush(), 1)
+
+        (totals,) = service.written[0].values()
+        self.assertEqual((totals.requests, totals.prompt_tokens), (1, 10))
+
+    async def test_loop_survives_failed_rounds(self) -> None:
+        service = FlakyUsageService(failures=2)
+        flusher = self.flusher(service)
+
+        flusher.start()
+        for _ in range(100):
+            if service.written:
+                break
+            await asyncio.sleep(0.01)
+        await flusher.stop()
+
+        self.assertEqual(len(service.written), 1)
+        self.assertEqual(self.recorder.drain(), {})
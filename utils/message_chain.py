@@ -1,9 +1,12 @@
+from dataclasses import replace
 from datetime import datetime, timezone
 from typing import Any, Callable, Sequence
 
 from telegram import Bot, Message, User
 
-from ai_client.base import AiClientRegistry, AiMessage, AiRole, BaseAiClient
+from ai_client.base import AiClientRegistry, BaseAiClient
+from ai_client.messages import AiMessage, AiRole
+from ai_client.summarizer import HistoryBlock
 from cache.telegram_update_storage import TelegramUpdateRecord
 from database.models import ChatConfiguration
 from errors import ConfigError
@@ -15,6 +18,8 @@ __all__ = [
     "user_id",
     "is_same_user",
     "build_message_chain",
+    "build_history_blocks",
+    "compact_message_chain",
     "reply_chain_to_records",
 ]
 
@@ -71,6 +76,7 @@ def build_message_chain(
     bot: Bot,
     *,
     prefix: Sequence[AiMessage] | None = None,
+    compact: bool = True,
 ) -> list[AiMessage]:
     """
     Convert chat messages into a sequence of :class:`AiMessage` entries suitable for AI providers.
@@ -78,17 +84,89 @@ def build_message_chain(
     :param records: Cached Telegram updates ordered from newest to oldest.
     :param bot: Telegram bot instance used to detect assistant messages.
     :param prefix: Optional conversation prefix to prepend to the chain.
-    :returns: A list of :class:`AiMessage`.
+    :param compact: Whether to pass the chain through :func:`compact_message_chain`.
+    :returns: A list of :class:`AiMessage` in chronological order, so the newest message comes last.
     """
 
     def is_bot(user: UserLike) -> bool:
         return is_same_user(bot, user)
 
     result: list[AiMessage] = list(prefix) if prefix else []
-    for record in records:
+    for record in reversed(records):
         message = _record_to_message(record=record, is_bot=is_bot)
         if message is not None:
             result.append(message)
+    if compact:
+        return compact_message_chain(result)
+    return result
+
+
+def build_history_blocks(
+    records: Sequence[TelegramUpdateRecord],
+    bot: Bot,
+    block_messages: int | None,
+) -> list[HistoryBlock]:
+    """
+    Group cached updates into fixed blocks of their chat index for rolling summaries.
+
+    Blocks are aligned on the ``position`` of the updates, so a block keeps its boundaries while the chat grows. A block
+    is complete when all of its ``block_messages`` updates are present; records without a position form an incomplete
+    block of their own.
+
+    :param records: Cached Telegram updates ordered from newest to oldest.
+    :param bot: Telegram bot instance used to detect assistant messages.
+    :param block_messages: Number of updates per block, or ``None`` to return the whole history as one incomplete block.
+    :returns: Blocks in chronological order, each with a compacted message chain.
+    """
+    if block_messages is None:
+        return [HistoryBlock(messages=build_message_chain(records, bot), complete=False)]
+
+    groups: dict[int | None, list[TelegramUpdateRecord]] = {}
+    for record in records:
+        index = record.position // block_messages if record.position is not None else None
+        groups.setdefault(index, []).append(record)
+    return [
+        HistoryBlock(
+            messages=build_message_chain(group, bot),
+            complete=index is not None and len(group) == block_messages,
+        )
+        for index, group in sorted(groups.items(), key=lambda item: -1 if item[0] is None else item[0])
+    ]
+
+
+def compact_message_chain(messages: Sequence[AiMessage]) -> list[AiMessage]:
+    """
+    Merge consecutive messages of the same role and author into one message and drop repeated text.
+
+    Group chats produce bursts of short messages from one person; sending them as one message saves the per-message
+    overhead and the repeated author name. Within a merged run, text identical to an earlier part of the run (resent
+    messages, album captions repeated on every item) is kept only once. System messages are never merged.
+
+    :param messages: Chronologically ordered messages.
+    :returns: Compacted messages in the same order.
+    """
+    result: list[AiMessage] = []
+    parts: list[str] = []
+    for message in messages:
+        content = message.content.strip()
+        if not content:
+            continue
+        previous = result[-1] if result else None
+        if (
+            previous is not None
+            and message.role is not AiRole.SYSTEM
+            and previous.role is message.role
+            and previous.name == message.name
+        ):
+            if content not in parts:
+                parts.append(content)
+            continue
+        if previous is not None and len(parts) > 1:
+            result[-1] = replace(previous, content="\n".join(parts))
+        result.append(replace(message, content=content))
+        parts = [content]
+    if result and len(parts) > 1:
+        result[-1] = replace(result[-1], content="\n".join(parts))
     return result
 
 
@@ -0,0 +1,121 @@
+__all__ = ["Counter", "Summary", "MetricsRegistry"]
+
+from collections import deque
+from threading import Lock
+from typing import Any
+
+from injector import singleton
+
+type Labels = tuple[tuple[str, str], ...]
+
+
+class Counter:
+    """Monotonically increasing value."""
+
+    def __init__(self) -> None:
+        self._value = 0.0
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._value += amount
+
+
+class Summary:
+    """
+    Track count and sum of observations plus quantiles over a window of the most recent samples.
+    """
+
+    def __init__(self, window: int = 1024) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+        self._count = 0
+        self._total = 0.0
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def total(self) -> float:
+        return self._total
+
+    def observe(self, value: float) -> None:
+        self._samples.append(value)
+        self._count += 1
+        self._total += value
+
+    def quantile(self, q: float) -> float | None:
+        """
+        Return the ``q`` quantile of the recent samples.
+
+        :param q: Quantile in ``[0, 1]``.
+        :returns: Sample value at the quantile, or ``None`` when nothing was observed yet.
+        """
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+        return ordered[index]
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "count": self._count,
+            "sum": self._total,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+        }
+
+
+@singleton
+class MetricsRegistry:
+    """
+    In-process registry of named counters and summaries.
+
+    Metrics are keyed by name plus keyword labels, e.g. ``summary("ai.time_to_first_token", provider="grok")``.
+    :meth:`snapshot` renders everything into plain data for logging or exposition. The class is singleton-scoped so
+    every injected consumer shares the same registry.
+    """
+
+    def __init__(self) -> None:
+        self._counters: dict[tuple[str, Labels], Counter] = {}
+        self._summaries: dict[tuple[str, Labels], Summary] = {}
+        self._lock = Lock()
+
+    def counter(self, name: str, **labels: str) -> Counter:
+        key = (name, self._labels(labels))
+        with self._lock:
+            return self._counters.setdefault(key, Counter())
+
+    def summary(self, name: str, **labels: str) -> Summary:
+        key = (name, self._labels(labels))
+        with self._lock:
+            return self._summaries.setdefault(key, Summary())
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Render all metrics as ``{"name{label=value}": value}`` pairs.
+
+        :returns: Counters as numbers and summaries as dictionaries.
+        """
+        with self._lock:
+            counters = list(self._counters.items())
+            summaries = list(self._summaries.items())
+        result: dict[str, Any] = {}
+        for (name, labels), counter in counters:
+            result[self._render_key(name, labels)] = counter.value
+        for (name, labels), summary in summaries:
+            result[self._render_key(name, labels)] = summary.as_dict()
+        return result
+
+    @staticmethod
+    def _labels(labels: dict[str, str]) -> Labels:
+        return tuple(sorted(labels.items()))
+
+    @staticmethod
+    def _render_key(name: str, labels: Labels) -> str:
+        if not labels:
+            return name
+        rendered = ",".join(f"{key}={value}" for key, value in labels)
+        return f"{name}{{{rendered}}}"